@@ -0,0 +1,34 @@
+"""add halfvec and binary-quantized ANN indexes on items.embedding
+
+Revision ID: 0004_compact_vector_indexes
+Revises: 0003_user_type
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0004_compact_vector_indexes"
+down_revision = "0003_user_type"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expression indexes over the existing full-precision column: building them
+    # backfills every stored vector, and new writes are covered automatically.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_embedding_halfvec_hnsw "
+            "ON items USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_embedding_bit_hnsw "
+            "ON items USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS items_embedding_bit_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS items_embedding_halfvec_hnsw")
@@ -0,0 +1,48 @@
+"""add item_chunks table with per-chunk embeddings
+
+Revision ID: 0005_item_chunks
+Revises: 0004_compact_vector_indexes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_item_chunks"
+down_revision = "0004_compact_vector_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_chunks",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column(
+            "item_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("start_char", sa.Integer(), nullable=False),
+        sa.Column("end_char", sa.Integer(), nullable=False),
+        sa.Column("embedding", Vector(384), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("item_id", "chunk_index"),
+    )
+    op.create_index("ix_item_chunks_item_id", "item_chunks", ["item_id"])
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS item_chunks_embedding_hnsw "
+        "ON item_chunks USING hnsw (embedding vector_cosine_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS item_chunks_embedding_hnsw")
+    op.drop_index("ix_item_chunks_item_id", table_name="item_chunks")
+    op.drop_table("item_chunks")
@@ -0,0 +1,54 @@
+"""add generated tsvector column with GIN index and optional trigram index on items
+
+Revision ID: 0006_items_full_text
+Revises: 0005_item_chunks
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0006_items_full_text"
+down_revision = "0005_item_chunks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table once; new writes keep it
+    # up to date without application changes.
+    op.execute(
+        "ALTER TABLE items ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+    )
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN undefined_file OR feature_not_supported OR insufficient_privilege THEN
+            RAISE NOTICE 'pg_trgm unavailable, skipping trigram index';
+        END $$;
+        """
+    )
+    has_trgm = op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+    ).scalar()
+    # Built concurrently so writes keep flowing while the GIN indexes fill in.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_content_tsv_gin "
+            "ON items USING gin (content_tsv)"
+        )
+        if has_trgm:
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_content_trgm "
+                "ON items USING gin (content gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS items_content_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS items_content_tsv_gin")
+    op.execute("ALTER TABLE items DROP COLUMN IF EXISTS content_tsv")
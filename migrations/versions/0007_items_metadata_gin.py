@@ -0,0 +1,29 @@
+"""add jsonb_path_ops GIN index on items.metadata
+
+Revision ID: 0007_items_metadata_gin
+Revises: 0006_items_full_text
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0007_items_metadata_gin"
+down_revision = "0006_items_full_text"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops only supports containment (@>), which is all search filters use,
+    # and is smaller and faster than the default jsonb_ops opclass.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_metadata_path_ops_gin "
+            "ON items USING gin (metadata jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS items_metadata_path_ops_gin")
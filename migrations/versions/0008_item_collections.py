@@ -0,0 +1,179 @@
+"""item collections: list-partitioned items with per-partition vector indexes
+
+The conversion runs in one transaction under ACCESS EXCLUSIVE on ``items``. The
+table is not rewritten: dropping the ``embedding`` typmod needs no coercion and the
+new column has a constant default. The new primary key is still built, and both
+CHECKs are validated with a scan, under that lock, so expect a pause of a few
+seconds per million rows. The vector indexes are dropped up front instead of being
+rebuilt by the type change, and rebuilt with CREATE INDEX CONCURRENTLY once the
+transaction has committed. Until then, vector searches scan ``items_default``.
+
+Revision ID: 0008_item_collections
+Revises: 0007_items_metadata_gin
+Create Date: 2024-01-08 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+from ai_accel_api_platform.settings import get_settings
+
+revision = "0008_item_collections"
+down_revision = "0007_items_metadata_gin"
+branch_labels = None
+depends_on = None
+
+# Vector indexes of the default partition, by name suffix.
+VECTOR_INDEXES = {
+    "embedding_hnsw": "USING hnsw ((embedding::vector(384)) vector_cosine_ops)",
+    "embedding_halfvec_hnsw": "USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)",
+    "embedding_bit_hnsw": (
+        "USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)"
+    ),
+}
+# Other indexes kept by the existing table and renamed after its new partition name.
+RENAMED_INDEXES = ("content_tsv_gin", "content_trgm", "metadata_path_ops_gin")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "collections",
+        sa.Column("name", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("embedding_model", sa.Text(), nullable=False),
+        sa.Column("embedding_dim", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    # Existing items were embedded by the configured model.
+    op.execute(
+        sa.text(
+            "INSERT INTO collections (name, embedding_model, embedding_dim) "
+            "VALUES ('default', :model, 384)"
+        ).bindparams(model=get_settings().embedding_model)
+    )
+
+    # Partitions of one table can hold different dimensions, so the parent column is
+    # an unconstrained ``vector``. Each partition pins its dimension with a CHECK and
+    # indexes ``embedding::vector(dim)``, which is the expression searches order by.
+    # Every index on ``embedding`` would be rebuilt by the type change under the
+    # table lock; they are dropped here and rebuilt concurrently at the end.
+    for index in VECTOR_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS items_{index}")
+    op.execute("DROP INDEX IF EXISTS items_embedding_ivfflat")
+    op.execute("ALTER TABLE items ALTER COLUMN embedding TYPE vector")
+    op.execute("ALTER TABLE items ADD COLUMN collection text NOT NULL DEFAULT 'default'")
+
+    op.execute("ALTER TABLE item_chunks ADD COLUMN collection text NOT NULL DEFAULT 'default'")
+    op.execute("ALTER TABLE item_chunks DROP CONSTRAINT IF EXISTS item_chunks_item_id_fkey")
+    op.execute(
+        "ALTER TABLE item_chunks DROP CONSTRAINT IF EXISTS item_chunks_item_id_chunk_index_key"
+    )
+
+    # The existing table becomes the 'default' partition. Its CHECK lets ATTACH skip
+    # the validation scan, and its key is widened to match the parent's.
+    op.execute("ALTER TABLE items RENAME TO items_default")
+    op.execute("ALTER TABLE items_default DROP CONSTRAINT items_pkey")
+    op.execute("ALTER TABLE items_default ADD PRIMARY KEY (collection, id)")
+    op.execute(
+        "ALTER TABLE items_default ADD CONSTRAINT items_default_collection "
+        "CHECK (collection = 'default')"
+    )
+    op.execute(
+        "ALTER TABLE items_default ADD CONSTRAINT items_default_embedding_dim "
+        "CHECK (vector_dims(embedding) = 384)"
+    )
+    for suffix in RENAMED_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS items_{suffix} RENAME TO items_default_{suffix}")
+
+    op.execute(
+        """
+        CREATE TABLE items (
+            id uuid NOT NULL,
+            collection text NOT NULL DEFAULT 'default',
+            content text NOT NULL,
+            metadata jsonb,
+            embedding vector,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz DEFAULT now(),
+            content_tsv tsvector
+                GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED,
+            PRIMARY KEY (collection, id)
+        ) PARTITION BY LIST (collection)
+        """
+    )
+    op.execute("ALTER TABLE items ATTACH PARTITION items_default FOR VALUES IN ('default')")
+    op.execute("ALTER TABLE items_default DROP CONSTRAINT items_default_collection")
+
+    # Non-vector indexes are declared on the parent, so every new partition gets them;
+    # the matching indexes that already exist on items_default are attached, not rebuilt.
+    op.execute("CREATE INDEX items_content_tsv_gin ON items USING gin (content_tsv)")
+    op.execute("CREATE INDEX items_metadata_path_ops_gin ON items USING gin (metadata jsonb_path_ops)")
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF to_regclass('items_default_content_trgm') IS NOT NULL THEN
+                EXECUTE 'CREATE INDEX items_content_trgm ON items USING gin (content gin_trgm_ops)';
+            END IF;
+        END $$;
+        """
+    )
+
+    op.execute(
+        "ALTER TABLE item_chunks ADD CONSTRAINT item_chunks_item_fkey "
+        "FOREIGN KEY (collection, item_id) REFERENCES items (collection, id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE item_chunks ADD CONSTRAINT item_chunks_collection_item_id_chunk_index_key "
+        "UNIQUE (collection, item_id, chunk_index)"
+    )
+
+    with op.get_context().autocommit_block():
+        for index, definition in VECTOR_INDEXES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS items_default_{index} "
+                f"ON items_default {definition}"
+            )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE item_chunks DROP CONSTRAINT item_chunks_item_fkey")
+    op.execute(
+        "ALTER TABLE item_chunks DROP CONSTRAINT item_chunks_collection_item_id_chunk_index_key"
+    )
+    # Items of any other collection are dropped with their partitions.
+    op.execute("DELETE FROM item_chunks WHERE collection <> 'default'")
+    op.execute("ALTER TABLE items DETACH PARTITION items_default")
+    op.execute("DROP TABLE items")
+    op.execute("ALTER TABLE items_default RENAME TO items")
+    for suffix in RENAMED_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS items_default_{suffix} RENAME TO items_{suffix}")
+    for index in VECTOR_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS items_default_{index}")
+    op.execute("ALTER TABLE items DROP CONSTRAINT items_default_embedding_dim")
+    op.execute("ALTER TABLE items DROP CONSTRAINT items_default_pkey")
+    op.execute("ALTER TABLE items DROP COLUMN collection")
+    op.execute("ALTER TABLE items ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE items ALTER COLUMN embedding TYPE vector(384)")
+
+    op.execute("ALTER TABLE item_chunks DROP COLUMN collection")
+    op.execute(
+        "ALTER TABLE item_chunks ADD CONSTRAINT item_chunks_item_id_chunk_index_key "
+        "UNIQUE (item_id, chunk_index)"
+    )
+    op.execute(
+        "ALTER TABLE item_chunks ADD CONSTRAINT item_chunks_item_id_fkey "
+        "FOREIGN KEY (item_id) REFERENCES items (id) ON DELETE CASCADE"
+    )
+    op.drop_table("collections")
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_embedding_hnsw "
+            "ON items USING hnsw (embedding vector_cosine_ops)"
+        )
+        for index in ("embedding_halfvec_hnsw", "embedding_bit_hnsw"):
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS items_{index} "
+                f"ON items {VECTOR_INDEXES[index]}"
+            )
@@ -0,0 +1,24 @@
+"""tag each item vector with the model that produced it
+
+Revision ID: 0009_item_embedding_model
+Revises: 0008_item_collections
+Create Date: 2024-01-09 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0009_item_embedding_model"
+down_revision = "0008_item_collections"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable without a default, so adding it does not rewrite the table. Rows
+    # written before this migration keep NULL: their model is the collection's.
+    op.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS embedding_model text")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE items DROP COLUMN IF EXISTS embedding_model")
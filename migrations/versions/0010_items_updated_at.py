@@ -0,0 +1,46 @@
+"""index items.updated_at for incremental change polling
+
+Revision ID: 0010_items_updated_at
+Revises: 0009_item_embedding_model
+Create Date: 2024-01-10 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_items_updated_at"
+down_revision = "0009_item_embedding_model"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The hot index polls ``updated_at >= watermark`` every few seconds from every API
+    # process. A partitioned index cannot be built concurrently, so the parent index
+    # is created empty (ON ONLY), each partition's index is built concurrently and
+    # attached, and partitions created later get the index automatically.
+    op.execute("CREATE INDEX IF NOT EXISTS items_updated_at ON ONLY items (updated_at)")
+    partitions = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'items'::regclass"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_updated_at "
+                f"ON {partition} (updated_at)"
+            )
+            op.execute(f"ALTER INDEX items_updated_at ATTACH PARTITION {partition}_updated_at")
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it.
+    op.execute("DROP INDEX IF EXISTS items_updated_at")
@@ -0,0 +1,25 @@
+"""default items.updated_at to the statement's wall clock, not the transaction start
+
+Revision ID: 0011_items_updated_at_clock
+Revises: 0010_items_updated_at
+Create Date: 2024-01-11 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0011_items_updated_at_clock"
+down_revision = "0010_items_updated_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # now() is the transaction start, which can be seconds before the commit when a
+    # write embeds inside its transaction; pollers comparing updated_at with a
+    # watermark would miss such rows. Recurses to every partition; catalog-only.
+    op.execute("ALTER TABLE items ALTER COLUMN updated_at SET DEFAULT clock_timestamp()")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE items ALTER COLUMN updated_at SET DEFAULT now()")
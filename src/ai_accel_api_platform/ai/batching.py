@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+import structlog
+from starlette.concurrency import run_in_threadpool
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class _PendingBatch[T, R]:
+    items: list[T]
+    future: asyncio.Future[list[R]]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher[T, R]:
+    """Coalesces concurrent calls into one threadpool call per batch.
+
+    Callers submit lists of items and get back exactly their own results. A batch is
+    flushed once it holds ``max_batch_size`` items or the oldest caller has waited
+    ``max_wait_ms``, whichever happens first. Requests that are already at least one
+    full batch skip the queue.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        on_flush: Callable[[int, float], None] | None = None,
+    ) -> None:
+        self._process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000.0
+        self._on_flush = on_flush
+        self._queue: asyncio.Queue[_PendingBatch[T, R]] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._carry: _PendingBatch[T, R] | None = None
+
+    async def submit(self, items: list[T]) -> list[R]:
+        if not items:
+            return []
+        if len(items) >= self.max_batch_size:
+            return list(await run_in_threadpool(self._process, items))
+
+        queue = self._ensure_worker()
+        future: asyncio.Future[list[R]] = asyncio.get_running_loop().create_future()
+        await queue.put(_PendingBatch(items=items, future=future))
+        return await future
+
+    def _ensure_worker(self) -> asyncio.Queue[_PendingBatch[T, R]]:
+        loop = asyncio.get_running_loop()
+        if (
+            self._queue is None
+            or self._worker is None
+            or self._worker.done()
+            or self._loop is not loop
+        ):
+            self._queue = asyncio.Queue()
+            self._carry = None
+            self._loop = loop
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[_PendingBatch[T, R]]) -> None:
+        while True:
+            first = self._carry if self._carry is not None else await queue.get()
+            self._carry = None
+            batch = [first]
+            size = len(first.items)
+            deadline = first.enqueued_at + self.max_wait_seconds
+
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    pending = (
+                        queue.get_nowait()
+                        if timeout <= 0
+                        else await asyncio.wait_for(queue.get(), timeout=timeout)
+                    )
+                except (TimeoutError, asyncio.QueueEmpty):
+                    break
+                if size + len(pending.items) > self.max_batch_size:
+                    self._carry = pending
+                    break
+                batch.append(pending)
+                size += len(pending.items)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_PendingBatch[T, R]]) -> None:
+        live = [pending for pending in batch if not pending.future.done()]
+        if not live:
+            return
+
+        flat = [item for pending in live for item in pending.items]
+        if self._on_flush is not None:
+            self._on_flush(len(flat), time.perf_counter() - live[0].enqueued_at)
+        try:
+            results = await run_in_threadpool(self._process, flat)
+        except Exception as exc:
+            logger.warning("micro_batch_failed", size=len(flat), error=str(exc))
+            for pending in live:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+
+        offset = 0
+        for pending in live:
+            count = len(pending.items)
+            if not pending.future.done():
+                pending.future.set_result(list(results[offset : offset + count]))
+            offset += count
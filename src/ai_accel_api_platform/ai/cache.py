@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy as np
+import structlog
+from redis import Redis
+
+from ai_accel_api_platform.core.utils import pack_float32, unpack_float32
+from ai_accel_api_platform.telemetry.metrics import CACHE_REQUESTS
+
+logger = structlog.get_logger(__name__)
+
+_REDIS_RETRY_SECONDS = 30.0
+
+
+class VectorCache:
+    """Two-tier cache of float32 vectors: a bounded in-process LRU backed by Redis.
+
+    Values are stored in Redis as packed little-endian float32 bytes. Redis failures
+    never fail the caller; the L2 tier is skipped for a short back-off instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: int,
+        redis_factory: Callable[[], Redis[bytes]] | None = None,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._redis_factory = redis_factory
+        self._redis_retry_at = 0.0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: list[str]) -> list[np.ndarray | None]:
+        found: list[np.ndarray | None] = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                found.append(value)
+        l1_hits = sum(value is not None for value in found)
+
+        missing = [index for index, value in enumerate(found) if value is None]
+        l2_hits = 0
+        redis = self._get_redis() if missing else None
+        if redis is not None:
+            try:
+                raw_values = redis.mget([keys[index] for index in missing])
+            except Exception as exc:
+                self._redis_failed(exc)
+                raw_values = [None] * len(missing)
+            promoted: dict[str, np.ndarray] = {}
+            for index, raw in zip(missing, raw_values, strict=True):
+                if raw is not None:
+                    found[index] = promoted[keys[index]] = unpack_float32(raw)
+            l2_hits = len(promoted)
+            self._store_local(promoted)
+
+        CACHE_REQUESTS.labels(self.name, "l1_hit").inc(l1_hits)
+        CACHE_REQUESTS.labels(self.name, "l2_hit").inc(l2_hits)
+        CACHE_REQUESTS.labels(self.name, "miss").inc(len(keys) - l1_hits - l2_hits)
+        return found
+
+    def set_many(self, entries: dict[str, np.ndarray]) -> None:
+        if not entries:
+            return
+        self._store_local(entries)
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for key, value in entries.items():
+                pipe.set(key, pack_float32(value), ex=self.ttl_seconds)
+            pipe.execute()
+        except Exception as exc:
+            self._redis_failed(exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, entries: dict[str, np.ndarray]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = np.asarray(value, dtype=np.float32)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self) -> Redis[bytes] | None:
+        if self._redis_factory is None or time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            return self._redis_factory()
+        except Exception as exc:
+            self._redis_failed(exc)
+            return None
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+        logger.warning("vector_cache_redis_unavailable", cache=self.name, error=str(exc))
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, cast
+
+import numpy as np
+import structlog
+from starlette.concurrency import run_in_threadpool
+
+from ai_accel_api_platform.ai.embeddings import embed_array, embed_array_async
+from ai_accel_api_platform.core.chunks import Chunk, ChunkedEmbedding
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+_WORD = re.compile(r"\S+")
+
+_tokenizer: Any | None = None
+_tokenizer_loaded = False
+_tokenizer_lock = threading.Lock()
+
+
+def _load_tokenizer() -> Any | None:
+    settings = get_settings()
+    try:
+        from transformers import AutoTokenizer
+
+        return cast(Any, AutoTokenizer).from_pretrained(
+            settings.embedding_model,
+            cache_dir=settings.model_cache_dir or None,
+            local_files_only=settings.model_local_files_only,
+        )
+    except Exception as exc:
+        logger.warning("chunk_tokenizer_unavailable", error=str(exc), fallback="whitespace")
+        return None
+
+
+def get_chunk_tokenizer() -> Any | None:
+    """Tokenizer of the embedding model, loaded on its own so no model weights are needed."""
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        with _tokenizer_lock:
+            if not _tokenizer_loaded:
+                _tokenizer = _load_tokenizer()
+                _tokenizer_loaded = True
+    return _tokenizer
+
+
+def _token_spans(text: str, tokenizer: Any | None) -> list[tuple[int, int]]:
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(
+                text,
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            return [(int(start), int(end)) for start, end in encoded["offset_mapping"]]
+        except Exception as exc:
+            logger.warning("chunk_offsets_unavailable", error=str(exc), fallback="whitespace")
+    return [(match.start(), match.end()) for match in _WORD.finditer(text)]
+
+
+def chunk_text(
+    text: str, max_tokens: int, overlap_tokens: int, tokenizer: Any | None = None
+) -> list[Chunk]:
+    """Split ``text`` into windows of at most ``max_tokens`` tokens.
+
+    Consecutive windows share ``overlap_tokens`` tokens. Chunk text is sliced from the
+    original string using the tokenizer's character offsets, so whitespace and casing
+    are preserved.
+    """
+    max_tokens = max(1, max_tokens)
+    spans = _token_spans(text, tokenizer)
+    if len(spans) <= max_tokens:
+        return [Chunk(index=0, text=text, start=0, end=len(text))]
+
+    stride = max(1, max_tokens - max(0, overlap_tokens))
+    chunks: list[Chunk] = []
+    for first in range(0, len(spans), stride):
+        window = spans[first : first + max_tokens]
+        start, end = window[0][0], window[-1][1]
+        chunks.append(Chunk(index=len(chunks), text=text[start:end], start=start, end=end))
+        if first + max_tokens >= len(spans):
+            break
+    return chunks
+
+
+def split_document(text: str) -> list[Chunk]:
+    settings = get_settings()
+    return chunk_text(
+        text,
+        settings.chunk_max_tokens,
+        settings.chunk_overlap_tokens,
+        get_chunk_tokenizer(),
+    )
+
+
+def pool_chunk_vectors(vectors: np.ndarray) -> np.ndarray:
+    """Normalized mean of the chunk vectors, used as the item-level embedding."""
+    pooled = np.asarray(vectors, dtype=np.float32).mean(axis=0)
+    norm = float(np.linalg.norm(pooled))
+    return cast(np.ndarray, pooled / norm) if norm > 0 else pooled
+
+
+def _pool_documents(documents: list[list[Chunk]], vectors: np.ndarray) -> list[ChunkedEmbedding]:
+    results: list[ChunkedEmbedding] = []
+    offset = 0
+    for chunks in documents:
+        rows = vectors[offset : offset + len(chunks)]
+        results.append(ChunkedEmbedding(chunks, rows, pool_chunk_vectors(rows)))
+        offset += len(chunks)
+    return results
+
+
+def embed_documents(texts: list[str]) -> list[ChunkedEmbedding]:
+    """Chunk several documents and embed all of their chunks in one batched call."""
+    documents = [split_document(text) for text in texts]
+    vectors = embed_array([chunk.text for chunks in documents for chunk in chunks])
+    return _pool_documents(documents, vectors)
+
+
+async def embed_documents_async(texts: list[str]) -> list[ChunkedEmbedding]:
+    documents = await run_in_threadpool(lambda: [split_document(text) for text in texts])
+    vectors = await embed_array_async([chunk.text for chunks in documents for chunk in chunks])
+    return _pool_documents(documents, vectors)
+
+
+def embed_document(text: str) -> ChunkedEmbedding:
+    return embed_documents([text])[0]
+
+
+async def embed_document_async(text: str) -> ChunkedEmbedding:
+    return (await embed_documents_async([text]))[0]
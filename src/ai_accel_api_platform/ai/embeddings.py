@@ -8,14 +8,29 @@ import numpy as np
 import structlog
 import torch
 from sentence_transformers import SentenceTransformer
+from starlette.concurrency import run_in_threadpool
 
+from ai_accel_api_platform.ai.batching import MicroBatcher
+from ai_accel_api_platform.ai.cache import VectorCache
+from ai_accel_api_platform.ai.model_client import get_model_server_client
+from ai_accel_api_platform.ai.onnx_backend import OnnxEmbedder, load_onnx_embedder
 from ai_accel_api_platform.core.device import get_best_device
+from ai_accel_api_platform.core.utils import cache_key
+from ai_accel_api_platform.db.session import get_sync_redis_raw
 from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.telemetry.metrics import (
+    EMBED_BATCH_SIZE,
+    EMBED_PADDING_EFFICIENCY,
+    EMBED_QUEUE_WAIT,
+    EMBED_TOKENS,
+)
 
 logger = structlog.get_logger(__name__)
 
-_embedder: SentenceTransformer | None = None
+_embedder: SentenceTransformer | OnnxEmbedder | None = None
 _embedder_lock = threading.Lock()
+_batcher: MicroBatcher[str, np.ndarray] | None = None
+_cache: VectorCache | None = None
 
 
 def _maybe_quantize(
@@ -53,17 +68,40 @@ def _maybe_compile(model: SentenceTransformer, enable: bool) -> SentenceTransfor
     return model
 
 
-def _load_model() -> SentenceTransformer:
+def _load_model() -> SentenceTransformer | OnnxEmbedder:
     settings = get_settings()
+    if settings.embed_backend == "onnx":
+        try:
+            onnx_model = load_onnx_embedder(
+                settings.embedding_model,
+                settings.embed_onnx_cache_dir,
+                settings.embed_onnx_quantize,
+            )
+            logger.info(
+                "embedding_model_loaded",
+                model=settings.embedding_model,
+                device="cpu",
+                backend="onnx",
+                quantized=settings.embed_onnx_quantize,
+            )
+            return onnx_model
+        except Exception as exc:
+            logger.warning("onnx_backend_failed", error=str(exc), fallback="torch")
+
     device, device_type = get_best_device(prefer_gpu=settings.prefer_gpu)
-    model = SentenceTransformer(settings.embedding_model, device=str(device))
+    model = SentenceTransformer(
+        settings.embedding_model,
+        device=str(device),
+        cache_folder=settings.model_cache_dir or None,
+        local_files_only=settings.model_local_files_only,
+    )
     model = _maybe_quantize(model, settings.embed_quantize, device_type)
     model = _maybe_compile(model, settings.embed_compile)
     logger.info("embedding_model_loaded", model=settings.embedding_model, device=device_type)
     return model
 
 
-def get_embedder() -> SentenceTransformer:
+def get_embedder() -> SentenceTransformer | OnnxEmbedder:
     global _embedder
     if _embedder is None:
         with _embedder_lock:
@@ -72,16 +110,190 @@ def get_embedder() -> SentenceTransformer:
     return _embedder
 
 
-def embed_texts(texts: Iterable[str]) -> list[list[float]]:
-    settings = get_settings()
-    model = get_embedder()
+def plan_length_buckets(
+    lengths: list[int], token_budget: int, max_batch_size: int
+) -> list[list[int]]:
+    """Group text indices of similar token length into batches.
+
+    Indices are taken longest first and a batch is closed once adding another text
+    would pad it past ``token_budget`` tokens or past ``max_batch_size`` texts.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index], reverse=True)
+    buckets: list[list[int]] = []
+    current: list[int] = []
+    for index in order:
+        padded_length = max(1, lengths[current[0]] if current else lengths[index])
+        if current and (
+            len(current) >= max_batch_size or padded_length * (len(current) + 1) > token_budget
+        ):
+            buckets.append(current)
+            current = []
+        current.append(index)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _token_lengths(model: SentenceTransformer | OnnxEmbedder, texts: list[str]) -> list[int] | None:
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return None
+    max_length = getattr(model, "max_seq_length", None) or tokenizer.model_max_length
+    encoded = tokenizer(
+        texts,
+        add_special_tokens=True,
+        truncation=True,
+        max_length=max_length,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def _record_padding(lengths: list[int], buckets: list[list[int]]) -> None:
+    real = sum(lengths)
+    padded = sum(max(lengths[index] for index in bucket) * len(bucket) for bucket in buckets)
+    EMBED_TOKENS.labels("real").inc(real)
+    EMBED_TOKENS.labels("padded").inc(padded)
+    if padded:
+        EMBED_PADDING_EFFICIENCY.observe(real / padded)
+
+
+def _encode_batch(
+    model: SentenceTransformer | OnnxEmbedder, texts: list[str], batch_size: int
+) -> np.ndarray:
     with torch.no_grad():
         embeddings: Any = model.encode(
-            list(texts),
-            batch_size=settings.embed_batch_size,
+            texts,
+            batch_size=batch_size,
             convert_to_numpy=True,
             normalize_embeddings=True,
         )
-    if isinstance(embeddings, np.ndarray):
-        return cast(list[list[float]], embeddings.tolist())
-    return [cast(list[float], emb.tolist()) for emb in cast(Iterable[np.ndarray], embeddings)]
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def encode_local(texts: list[str]) -> np.ndarray:
+    """Encode with the in-process model, bypassing the cache and model server."""
+    settings = get_settings()
+    model = get_embedder()
+    lengths = _token_lengths(model, texts) if settings.embed_length_bucketing else None
+    if lengths is None or len(texts) < 2:
+        return _encode_batch(model, texts, settings.embed_batch_size)
+
+    buckets = plan_length_buckets(lengths, settings.embed_token_budget, settings.embed_batch_size)
+    _record_padding(lengths, buckets)
+    parts = [
+        (bucket, _encode_batch(model, [texts[index] for index in bucket], len(bucket)))
+        for bucket in buckets
+    ]
+    result = np.empty((len(texts), parts[0][1].shape[1]), dtype=np.float32)
+    for bucket, vectors in parts:
+        result[bucket] = vectors
+    return result
+
+
+def _encode(texts: list[str]) -> np.ndarray:
+    client = get_model_server_client()
+    if client is not None:
+        return client.embed(texts)
+    return encode_local(texts)
+
+
+def warm_up(texts: list[str]) -> None:
+    """Encode ``texts`` on the serving path, skipping the cache, to load the model."""
+    _encode(texts)
+
+
+def get_embedding_cache() -> VectorCache | None:
+    global _cache
+    settings = get_settings()
+    if not settings.embed_cache:
+        return None
+    if _cache is None:
+        _cache = VectorCache(
+            "embedding",
+            max_entries=settings.embed_cache_size,
+            ttl_seconds=settings.embed_cache_ttl_seconds,
+            redis_factory=get_sync_redis_raw if settings.embed_cache_redis else None,
+        )
+    return _cache
+
+
+def embedding_variant() -> str:
+    """Backend and quantization producing the vectors; they differ numerically per variant."""
+    settings = get_settings()
+    if settings.embed_backend == "onnx":
+        return "onnx-int8" if settings.embed_onnx_quantize else "onnx"
+    return "torch-int8" if settings.embed_quantize else "torch"
+
+
+def embedding_cache_key(model_name: str, variant: str, normalize: bool, text: str) -> str:
+    return cache_key("emb", [model_name, variant, "1" if normalize else "0", text])
+
+
+def embed_array(texts: Iterable[str]) -> np.ndarray:
+    """Embed texts as a float32 matrix, one row per input text."""
+    text_list = list(texts)
+    unique = list(dict.fromkeys(text_list))
+    vectors: dict[str, np.ndarray] = {}
+
+    cache = get_embedding_cache()
+    keys: dict[str, str] = {}
+    if cache is not None and unique:
+        model_name, variant = get_settings().embedding_model, embedding_variant()
+        keys = {text: embedding_cache_key(model_name, variant, True, text) for text in unique}
+        for text, hit in zip(unique, cache.get_many(list(keys.values())), strict=True):
+            if hit is not None:
+                vectors[text] = hit
+
+    missing = [text for text in unique if text not in vectors]
+    if missing:
+        fresh = dict(zip(missing, _encode(missing), strict=True))
+        vectors.update(fresh)
+        if cache is not None:
+            cache.set_many({keys[text]: vector for text, vector in fresh.items()})
+
+    if not text_list:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([vectors[text] for text in text_list]).astype(np.float32, copy=False)
+
+
+def embed_texts(texts: Iterable[str]) -> list[list[float]]:
+    return cast(list[list[float]], embed_array(texts).tolist())
+
+
+def _record_batch(size: int, waited_seconds: float) -> None:
+    EMBED_BATCH_SIZE.observe(size)
+    EMBED_QUEUE_WAIT.observe(waited_seconds)
+
+
+def _embed_rows(texts: list[str]) -> list[np.ndarray]:
+    return list(embed_array(texts))
+
+
+def get_embedding_batcher() -> MicroBatcher[str, np.ndarray]:
+    global _batcher
+    if _batcher is None:
+        settings = get_settings()
+        _batcher = MicroBatcher(
+            _embed_rows,
+            max_batch_size=settings.embed_max_batch_size,
+            max_wait_ms=settings.embed_max_wait_ms,
+            on_flush=_record_batch,
+        )
+    return _batcher
+
+
+async def embed_array_async(texts: Iterable[str]) -> np.ndarray:
+    """Embed from async code, sharing one ``encode`` call with concurrent requests."""
+    text_list = list(texts)
+    if not get_settings().embed_microbatch:
+        return await run_in_threadpool(embed_array, text_list)
+    rows = await get_embedding_batcher().submit(text_list)
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack(rows)
+
+
+async def embed_texts_async(texts: Iterable[str]) -> list[list[float]]:
+    return cast(list[list[float]], (await embed_array_async(texts)).tolist())
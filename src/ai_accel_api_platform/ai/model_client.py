@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+from typing import Any
+
+import numpy as np
+import orjson
+
+from ai_accel_api_platform.core.errors import ModelServerError
+from ai_accel_api_platform.settings import get_settings
+
+# Every message is one frame: header length and body length (network order), a JSON
+# header, then a raw body. Responses carry float32 rows in the body.
+FRAME_PREFIX = struct.Struct("!II")
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+_client: ModelServerClient | None = None
+_client_lock = threading.Lock()
+
+
+def encode_frame(header: dict[str, Any], body: bytes = b"") -> bytes:
+    raw_header: bytes = orjson.dumps(header)
+    return FRAME_PREFIX.pack(len(raw_header), len(body)) + raw_header + body
+
+
+def parse_prefix(prefix: bytes) -> tuple[int, int]:
+    header_len, body_len = FRAME_PREFIX.unpack(prefix)
+    if header_len + body_len > MAX_FRAME_BYTES:
+        raise ModelServerError("frame_too_large")
+    return header_len, body_len
+
+
+def decode_array(header: dict[str, Any], body: bytes) -> np.ndarray:
+    if not header.get("ok"):
+        raise ModelServerError(str(header.get("error", "model_server_failed")))
+    shape = tuple(int(dim) for dim in header["shape"])
+    return np.frombuffer(body, dtype="<f4").reshape(shape)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("model_server_closed_connection")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+class ModelServerClient:
+    """Blocking client for the model server; keeps one connection per thread."""
+
+    def __init__(self, socket_path: str, timeout_seconds: float) -> None:
+        self.socket_path = socket_path
+        self.timeout_seconds = timeout_seconds
+        self._local = threading.local()
+        self._sockets: set[socket.socket] = set()
+        self._sockets_lock = threading.Lock()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return self._call({"op": "embed", "texts": texts})
+
+    def rerank(self, pairs: list[tuple[str, str]]) -> np.ndarray:
+        return self._call({"op": "rerank", "pairs": pairs})
+
+    def _call(self, request: dict[str, Any]) -> np.ndarray:
+        frame = encode_frame(request)
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(frame)
+                header_len, body_len = parse_prefix(_recv_exactly(sock, FRAME_PREFIX.size))
+                header = orjson.loads(_recv_exactly(sock, header_len))
+                body = _recv_exactly(sock, body_len)
+                return decode_array(header, body)
+            except OSError as exc:
+                self._reset()
+                if attempt:
+                    raise ModelServerError(f"model_server_unreachable: {exc}") from exc
+        raise ModelServerError("model_server_unreachable")
+
+    def _connection(self) -> socket.socket:
+        sock: socket.socket | None = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout_seconds)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+            with self._sockets_lock:
+                self._sockets.add(sock)
+        return sock
+
+    def _reset(self) -> None:
+        sock: socket.socket | None = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            with self._sockets_lock:
+                self._sockets.discard(sock)
+            sock.close()
+
+    def close(self) -> None:
+        with self._sockets_lock:
+            sockets, self._sockets = self._sockets, set()
+        for sock in sockets:
+            sock.close()
+
+
+def get_model_server_client() -> ModelServerClient | None:
+    global _client
+    settings = get_settings()
+    if not settings.model_server_socket:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ModelServerClient(
+                    settings.model_server_socket, settings.model_server_timeout_seconds
+                )
+    return _client
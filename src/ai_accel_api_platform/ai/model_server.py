@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+from typing import Any
+
+import numpy as np
+import orjson
+import structlog
+
+from ai_accel_api_platform.ai.batching import MicroBatcher
+from ai_accel_api_platform.ai.embeddings import encode_local, get_embedder
+from ai_accel_api_platform.ai.model_client import FRAME_PREFIX, encode_frame, parse_prefix
+from ai_accel_api_platform.ai.rerank import predict_local
+from ai_accel_api_platform.ai.warmup import warm_up_models
+from ai_accel_api_platform.logging import configure_logging
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/ai-accel-model.sock"
+
+
+class ModelServer:
+    """Owns the embedding and rerank models and serves them over a Unix socket.
+
+    Requests from every connected API and worker process share one micro-batcher per
+    model, so batching is pooled across processes.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self._embed = MicroBatcher[str, np.ndarray](
+            lambda texts: list(encode_local(texts)), max_batch_size, max_wait_ms
+        )
+        self._rerank = MicroBatcher[tuple[str, str], float](
+            lambda pairs: predict_local(pairs).tolist(), max_batch_size, max_wait_ms
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    prefix = await reader.readexactly(FRAME_PREFIX.size)
+                except asyncio.IncompleteReadError:
+                    break
+                header_len, body_len = parse_prefix(prefix)
+                request = orjson.loads(await reader.readexactly(header_len))
+                if body_len:
+                    await reader.readexactly(body_len)
+                writer.write(await self._dispatch(request))
+                await writer.drain()
+        except Exception as exc:
+            logger.warning("model_server_connection_failed", error=str(exc))
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _dispatch(self, request: dict[str, Any]) -> bytes:
+        try:
+            op = request.get("op")
+            if op == "embed":
+                rows = await self._embed.submit([str(text) for text in request["texts"]])
+                result = np.stack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+            elif op == "rerank":
+                pairs = [(str(query), str(content)) for query, content in request["pairs"]]
+                result = np.asarray(await self._rerank.submit(pairs), dtype=np.float32)
+            else:
+                raise ValueError(f"unknown_op: {op}")
+        except Exception as exc:
+            return encode_frame({"ok": False, "error": str(exc)})
+        payload = np.ascontiguousarray(result, dtype="<f4")
+        return encode_frame({"ok": True, "shape": list(payload.shape)}, payload.tobytes())
+
+
+async def serve(socket_path: str) -> None:
+    settings = get_settings()
+    if settings.warmup_on_startup:
+        await asyncio.to_thread(warm_up_models, encode_local, predict_local)
+    else:
+        await asyncio.to_thread(get_embedder)
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)
+    model_server = ModelServer(settings.embed_max_batch_size, settings.embed_max_wait_ms)
+    server = await asyncio.start_unix_server(model_server.handle, path=socket_path)
+    logger.info("model_server_started", socket=socket_path)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    configure_logging()
+    settings = get_settings()
+    asyncio.run(serve(settings.model_server_socket or DEFAULT_SOCKET_PATH))
+
+
+if __name__ == "__main__":
+    main()
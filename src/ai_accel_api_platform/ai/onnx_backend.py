@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import structlog
+import torch
+from sentence_transformers import SentenceTransformer
+
+logger = structlog.get_logger(__name__)
+
+_MODEL_FILE = "model.onnx"
+_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+_CONFIG_FILE = "onnx_config.json"
+_OPSET_VERSION = 17
+
+
+class _HiddenStates(torch.nn.Module):
+    def __init__(self, model: torch.nn.Module, input_names: list[str]) -> None:
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        outputs = self.model(**dict(zip(self.input_names, inputs, strict=True)))
+        hidden: torch.Tensor = outputs.last_hidden_state
+        return hidden
+
+
+class OnnxEmbedder:
+    """ONNX Runtime stand-in for ``SentenceTransformer.encode``.
+
+    Runs the exported transformer graph and applies the model's pooling (and
+    normalization, if the pipeline has it) in NumPy.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        tokenizer: Any,
+        input_names: list[str],
+        pooling: str,
+        normalize: bool,
+        max_seq_length: int,
+    ) -> None:
+        self.session = session
+        self.tokenizer = tokenizer
+        self.input_names = input_names
+        self.pooling = pooling
+        self.normalize = normalize
+        self.max_seq_length = max_seq_length
+
+    def encode(
+        self,
+        sentences: list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+        order = np.argsort([-len(text) for text in sentences], kind="stable")
+        chunks: list[np.ndarray] = []
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[index] for index in order[start : start + batch_size]]
+            chunks.append(self._encode_batch(batch))
+        embeddings = np.empty((len(sentences), chunks[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(chunks)
+        if self.normalize or normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {name: np.asarray(encoded[name], dtype=np.int64) for name in self.input_names}
+        hidden = np.asarray(self.session.run(None, feeds)[0], dtype=np.float32)
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        if self.pooling == "max":
+            return cast(np.ndarray, np.where(mask > 0, hidden, -1e9).max(axis=1))
+        summed = (hidden * mask).sum(axis=1)
+        return cast(np.ndarray, summed / np.clip(mask.sum(axis=1), 1e-9, None))
+
+
+def _cache_path(cache_dir: str, model_name: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name.strip("/"))
+    return Path(cache_dir) / slug
+
+
+def _pooling_mode(model: SentenceTransformer) -> str:
+    for module in model:
+        if type(module).__name__ != "Pooling":
+            continue
+        config: dict[str, Any] = cast(Any, module).get_config_dict()
+        mode = config.get("pooling_mode")
+        if isinstance(mode, str) and mode in {"cls", "max", "mean"}:
+            return mode
+        if config.get("pooling_mode_cls_token"):
+            return "cls"
+        if config.get("pooling_mode_max_tokens"):
+            return "max"
+        if config.get("pooling_mode_mean_tokens"):
+            return "mean"
+    raise ValueError("unsupported_pooling")
+
+
+def export_onnx(model: SentenceTransformer, target: Path) -> None:
+    unsupported = [
+        type(module).__name__
+        for module in model
+        if type(module).__name__ not in {"Transformer", "Pooling", "Normalize"}
+    ]
+    if unsupported:
+        raise ValueError(f"unsupported_modules: {unsupported}")
+
+    target.mkdir(parents=True, exist_ok=True)
+    tokenizer = model.tokenizer
+    sample = tokenizer(["warm up export"], padding=True, return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample
+    ]
+    transformer = cast(torch.nn.Module, model[0].auto_model)
+    wrapper = _HiddenStates(transformer, input_names).eval()
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper.cpu(),
+            tuple(sample[name].cpu() for name in input_names),
+            str(target / _MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=_OPSET_VERSION,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(str(target))
+    config = {
+        "input_names": input_names,
+        "pooling": _pooling_mode(model),
+        "normalize": any(type(module).__name__ == "Normalize" for module in model),
+        "max_seq_length": int(model.max_seq_length or tokenizer.model_max_length),
+    }
+    # Written last so an interrupted export is redone on the next start.
+    (target / _CONFIG_FILE).write_text(json.dumps(config))
+    logger.info("onnx_export_completed", path=str(target))
+
+
+def load_onnx_embedder(model_name: str, cache_dir: str, quantize: bool) -> OnnxEmbedder:
+    import onnxruntime
+    from transformers import AutoTokenizer
+
+    target = _cache_path(cache_dir, model_name)
+    if not (target / _CONFIG_FILE).exists():
+        export_onnx(SentenceTransformer(model_name, device="cpu"), target)
+    config = json.loads((target / _CONFIG_FILE).read_text())
+
+    model_file = target / _MODEL_FILE
+    if quantize:
+        quantized_file = target / _QUANTIZED_MODEL_FILE
+        if not quantized_file.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(str(model_file), str(quantized_file), weight_type=QuantType.QInt8)
+            logger.info("onnx_quantization_completed", path=str(quantized_file))
+        model_file = quantized_file
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(
+        str(model_file), options, providers=["CPUExecutionProvider"]
+    )
+    return OnnxEmbedder(
+        session=session,
+        tokenizer=cast(Any, AutoTokenizer).from_pretrained(str(target)),
+        input_names=list(config["input_names"]),
+        pooling=str(config["pooling"]),
+        normalize=bool(config["normalize"]),
+        max_seq_length=int(config["max_seq_length"]),
+    )
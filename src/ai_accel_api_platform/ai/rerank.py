@@ -1,27 +1,45 @@
 from __future__ import annotations
 
+import hashlib
 import threading
+import time
 from collections.abc import Iterable
 from typing import cast
 
+import numpy as np
 import structlog
 import torch
 from sentence_transformers import CrossEncoder
+from starlette.concurrency import run_in_threadpool
 
+from ai_accel_api_platform.ai.batching import MicroBatcher
+from ai_accel_api_platform.ai.cache import VectorCache
+from ai_accel_api_platform.ai.model_client import get_model_server_client
 from ai_accel_api_platform.core.device import get_best_device
+from ai_accel_api_platform.core.utils import cache_key
+from ai_accel_api_platform.db.session import get_sync_redis_raw
 from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.telemetry.metrics import RERANK_BATCH_SIZE, RERANK_LATENCY
 
 logger = structlog.get_logger(__name__)
 
 _reranker: CrossEncoder | None = None
 _reranker_lock = threading.Lock()
+_batcher: MicroBatcher[tuple[str, str], float] | None = None
+_cache: VectorCache | None = None
 
 
 def _load_reranker() -> CrossEncoder:
     settings = get_settings()
     device, device_type = get_best_device(prefer_gpu=settings.prefer_gpu)
     model: CrossEncoder = cast(
-        CrossEncoder, CrossEncoder(settings.rerank_model, device=str(device))
+        CrossEncoder,
+        CrossEncoder(
+            settings.rerank_model,
+            device=str(device),
+            cache_folder=settings.model_cache_dir or None,
+            local_files_only=settings.model_local_files_only,
+        ),
     )
     logger.info("reranker_loaded", model=settings.rerank_model, device=device_type)
     return model
@@ -36,20 +54,174 @@ def get_reranker() -> CrossEncoder:
     return _reranker
 
 
+def predict_local(pairs: list[tuple[str, str]]) -> np.ndarray:
+    """Score pairs with the in-process cross-encoder, bypassing the model server."""
+    model = get_reranker()
+    with torch.no_grad():
+        scores = model.predict(pairs, batch_size=get_settings().rerank_batch_size)
+    return np.asarray(scores, dtype=np.float32).reshape(-1)
+
+
+def _predict(pairs: list[tuple[str, str]]) -> np.ndarray:
+    client = get_model_server_client()
+    if client is not None:
+        return client.rerank(pairs)
+    return predict_local(pairs)
+
+
+def warm_up(pairs: list[tuple[str, str]]) -> None:
+    """Score ``pairs`` on the serving path, skipping the cache, to load the model."""
+    _predict(pairs)
+
+
+def _score_pairs(pairs: list[tuple[str, str]]) -> list[float]:
+    return cast(list[float], _predict(pairs).tolist())
+
+
+def get_rerank_batcher() -> MicroBatcher[tuple[str, str], float]:
+    global _batcher
+    if _batcher is None:
+        settings = get_settings()
+        _batcher = MicroBatcher(
+            _score_pairs,
+            max_batch_size=settings.rerank_batch_size,
+            max_wait_ms=settings.rerank_max_wait_ms,
+            on_flush=lambda size, _waited: RERANK_BATCH_SIZE.observe(size),
+        )
+    return _batcher
+
+
+def get_rerank_cache() -> VectorCache | None:
+    global _cache
+    settings = get_settings()
+    if not settings.rerank_cache:
+        return None
+    if _cache is None:
+        _cache = VectorCache(
+            "rerank",
+            max_entries=settings.rerank_cache_size,
+            ttl_seconds=settings.rerank_cache_ttl_seconds,
+            redis_factory=get_sync_redis_raw if settings.rerank_cache_redis else None,
+        )
+    return _cache
+
+
+def rerank_cache_key(model_name: str, query: str, item_id: str, content: str) -> str:
+    """Key a pair score on the query exactly as scored and the item's id and content hash.
+
+    Scores stay valid across unrelated writes and are invalidated only when the
+    item's own content changes. The cross-encoder is case-sensitive, so the query is
+    not normalized.
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return cache_key("rerank", [model_name, query, item_id, content_hash])
+
+
+def _candidate_pairs[T](query: str, results: list[tuple[T, float]]) -> list[tuple[str, str]]:
+    limit = max(0, get_settings().rerank_max_candidates)
+    return [(query, getattr(item, "content", "")) for item, _ in results[:limit]]
+
+
+def _pair_keys[T](
+    query: str, results: list[tuple[T, float]], pairs: list[tuple[str, str]]
+) -> list[str | None]:
+    model_name = get_settings().rerank_model
+    keys: list[str | None] = []
+    for (item, _), (_, content) in zip(results, pairs, strict=False):
+        item_id = getattr(item, "id", None)
+        keys.append(
+            None if item_id is None else rerank_cache_key(model_name, query, str(item_id), content)
+        )
+    return keys
+
+
+def _cached_scores(keys: list[str | None]) -> list[float | None]:
+    cache = get_rerank_cache()
+    scores: list[float | None] = [None] * len(keys)
+    lookup = [index for index, key in enumerate(keys) if key is not None]
+    if cache is None or not lookup:
+        return scores
+    hits = cache.get_many([cast(str, keys[index]) for index in lookup])
+    for index, hit in zip(lookup, hits, strict=True):
+        if hit is not None:
+            scores[index] = float(hit[0])
+    return scores
+
+
+def _store_scores(keys: list[str | None], scores: dict[int, float]) -> None:
+    cache = get_rerank_cache()
+    if cache is None:
+        return
+    cache.set_many(
+        {
+            key: np.asarray([score], dtype=np.float32)
+            for index, score in scores.items()
+            if (key := keys[index]) is not None
+        }
+    )
+
+
+def _fill_scores(
+    cached: list[float | None], missing: list[int], fresh: Iterable[float]
+) -> list[float]:
+    scores = list(cached)
+    for index, score in zip(missing, fresh, strict=True):
+        scores[index] = float(score)
+    return [float(score or 0.0) for score in scores]
+
+
+def _apply_scores[T](
+    results: list[tuple[T, float]], scores: Iterable[float]
+) -> list[tuple[T, float]]:
+    """Sort the reranked head by cross-encoder score; the uncapped tail keeps its order.
+
+    Tail scores are on another scale, so the tail is rescored one unit apart below the
+    head's lowest score and the returned scores decrease monotonically.
+    """
+    head = [(item, float(score)) for (item, _), score in zip(results, scores, strict=False)]
+    head.sort(key=lambda item: item[1], reverse=True)
+    if not head:
+        return results
+    floor = head[-1][1]
+    tail = [(item, floor - rank) for rank, (item, _) in enumerate(results[len(head) :], 1)]
+    return head + tail
+
+
 def rerank_results[T](query: str, results: Iterable[tuple[T, float]]) -> list[tuple[T, float]]:
     settings = get_settings()
     results_list = list(results)
     if not settings.enable_rerank or not results_list:
         return results_list
 
-    model = get_reranker()
-    pairs = [(query, getattr(item, "content", "")) for item, _ in results_list]
+    started = time.perf_counter()
+    pairs = _candidate_pairs(query, results_list)
+    keys = _pair_keys(query, results_list, pairs)
+    cached = _cached_scores(keys)
+    missing = [index for index, score in enumerate(cached) if score is None]
+    fresh = _predict([pairs[index] for index in missing]).tolist() if missing else []
+    _store_scores(keys, dict(zip(missing, fresh, strict=True)))
+    reranked = _apply_scores(results_list, _fill_scores(cached, missing, fresh))
+    RERANK_LATENCY.observe(time.perf_counter() - started)
+    return reranked
 
-    with torch.no_grad():
-        scores = model.predict(pairs)
 
-    reranked = [
-        (item, float(score)) for (item, _), score in zip(results_list, scores, strict=False)
-    ]
-    reranked.sort(key=lambda item: item[1], reverse=True)
+async def rerank_results_async[T](
+    query: str, results: Iterable[tuple[T, float]]
+) -> list[tuple[T, float]]:
+    """Rerank from async code; scoring runs in the threadpool, batched across requests."""
+    settings = get_settings()
+    results_list = list(results)
+    if not settings.enable_rerank or not results_list:
+        return results_list
+
+    started = time.perf_counter()
+    pairs = _candidate_pairs(query, results_list)
+    keys = _pair_keys(query, results_list, pairs)
+    cached = await run_in_threadpool(_cached_scores, keys)
+    missing = [index for index, score in enumerate(cached) if score is None]
+    fresh = await get_rerank_batcher().submit([pairs[index] for index in missing])
+    if fresh:
+        await run_in_threadpool(_store_scores, keys, dict(zip(missing, fresh, strict=True)))
+    reranked = _apply_scores(results_list, _fill_scores(cached, missing, fresh))
+    RERANK_LATENCY.observe(time.perf_counter() - started)
     return reranked
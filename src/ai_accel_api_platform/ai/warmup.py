@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+import structlog
+
+from ai_accel_api_platform.ai import embeddings, rerank
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Word counts of the synthetic warm-up texts: short queries, typical passages, and
+# inputs long enough to hit the model's truncation length.
+WARMUP_WORD_COUNTS = (8, 64, 512)
+
+_ready = threading.Event()
+_task: asyncio.Task[None] | None = None
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def mark_ready() -> None:
+    _ready.set()
+
+
+def reset() -> None:
+    _ready.clear()
+
+
+def warmup_texts(batch_size: int) -> list[list[str]]:
+    return [[" ".join(["warmup"] * words)] * max(1, batch_size) for words in WARMUP_WORD_COUNTS]
+
+
+def warm_up_models(
+    encode: Callable[[list[str]], object] = embeddings.warm_up,
+    predict: Callable[[list[tuple[str, str]]], object] = rerank.warm_up,
+) -> None:
+    """Load the models and run one batch per representative shape.
+
+    The defaults go through the model server when one is configured and always
+    bypass the embedding cache, so every batch reaches the model.
+    """
+    settings = get_settings()
+    started = time.perf_counter()
+    for batch in warmup_texts(settings.embed_batch_size):
+        encode(batch)
+        if settings.enable_rerank:
+            predict([("warmup query", text) for text in batch])
+    logger.info("model_warmup_completed", seconds=round(time.perf_counter() - started, 3))
+
+
+async def _run_warmup() -> None:
+    try:
+        await asyncio.to_thread(warm_up_models)
+    except Exception as exc:
+        # Requests fall back to lazy loading; staying unready would wedge the rollout.
+        logger.warning("model_warmup_failed", error=str(exc))
+    mark_ready()
+
+
+def start_warmup() -> None:
+    """Warm up in the background when enabled; readiness is reported immediately otherwise."""
+    global _task
+    if not get_settings().warmup_on_startup:
+        mark_ready()
+        return
+    reset()
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run_warmup())
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import Depends
+from fastapi import Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ai_accel_api_platform.core.security import (
@@ -11,9 +11,14 @@ from ai_accel_api_platform.core.security import (
     decode_subject_from_token,
     oauth2_scheme,
 )
+from ai_accel_api_platform.db.collections import CollectionInfo, get_collection
 from ai_accel_api_platform.db.models import User
 from ai_accel_api_platform.db.repositories import get_user_by_username
-from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.db.session import (
+    get_read_sessionmaker,
+    get_session,
+    get_sessionmaker,
+)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -21,8 +26,50 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_db_session(
+    response: Response,
+    read_consistency: Annotated[
+        Literal["strong", "eventual"] | None, Header(alias="X-Read-Consistency")
+    ] = None,
+    max_staleness: Annotated[float | None, Header(alias="X-Max-Staleness", ge=0)] = None,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes, served by a replica when one is fresh enough.
+
+    ``X-Read-Consistency: strong`` always reads the primary (read-your-writes);
+    ``X-Max-Staleness`` tightens the allowed replica lag in seconds. The chosen
+    source is reported in ``X-Read-Source`` and, with the requested consistency, kept
+    in ``session.info`` for routes that cache results.
+    """
+    if read_consistency == "strong":
+        sessionmaker, source = get_sessionmaker(), "primary"
+    else:
+        sessionmaker, source = await get_read_sessionmaker(max_staleness)
+    response.headers["X-Read-Source"] = source
+    session = sessionmaker()
+    session.info["read_source"] = source
+    session.info["read_consistency"] = read_consistency
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_served_collection(session: AsyncSession, name: str) -> CollectionInfo:
+    """Collection ``name``, if it exists and this deployment embeds with its model."""
+    collection = await get_collection(session, name)
+    if collection is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if not collection.served:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Collection uses {collection.embedding_model} "
+            f"({collection.embedding_dim} dims), which this deployment does not serve",
+        )
+    return collection
+
+
 async def get_current_user(
-    session: Annotated[AsyncSession, Depends(get_db_session)],
+    session: Annotated[AsyncSession, Depends(get_read_db_session)],
     token: Annotated[str, Depends(oauth2_scheme)],
 ) -> User:
     username = decode_subject_from_token(token)
@@ -4,6 +4,7 @@ from fastapi import APIRouter
 
 from ai_accel_api_platform.api.v1 import (
     routes_auth,
+    routes_collections,
     routes_embeddings,
     routes_health,
     routes_items,
@@ -14,6 +15,7 @@ from ai_accel_api_platform.api.v1 import (
 router = APIRouter()
 router.include_router(routes_health.router, tags=["health"])
 router.include_router(routes_items.router, tags=["items"])
+router.include_router(routes_collections.router, tags=["collections"])
 router.include_router(routes_embeddings.router, tags=["embeddings"])
 router.include_router(routes_search.router, tags=["search"])
 router.include_router(routes_auth.router, tags=["auth"])
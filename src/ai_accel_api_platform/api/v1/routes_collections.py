@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_accel_api_platform.api.deps import get_current_user, get_db_session
+from ai_accel_api_platform.core.schemas import CollectionCreate, CollectionRead
+from ai_accel_api_platform.db.collections import (
+    CollectionInfo,
+    create_collection,
+    list_collections,
+)
+from ai_accel_api_platform.db.models import User
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+
+
+def _read(collection: CollectionInfo) -> CollectionRead:
+    return CollectionRead(
+        name=collection.name,
+        embedding_model=collection.embedding_model,
+        embedding_dim=collection.embedding_dim,
+        served=collection.served,
+    )
+
+
+@router.get("/collections", response_model=list[CollectionRead])
+async def read_collections(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> list[CollectionRead]:
+    return [_read(collection) for collection in await list_collections(session)]
+
+
+@router.post("/collections", response_model=CollectionRead, status_code=201)
+async def create_collection_route(
+    payload: CollectionCreate,
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    user: Annotated[User, Depends(get_current_user)],
+) -> CollectionRead:
+    """Create a collection and its ``items`` partition with dedicated vector indexes.
+
+    The model and dimension default to this deployment's; a collection using another
+    model is served by a deployment configured with that ``EMBEDDING_MODEL``.
+    """
+    settings = get_settings()
+    try:
+        collection = await create_collection(
+            session,
+            payload.name,
+            payload.embedding_model or settings.embedding_model,
+            payload.embedding_dim or settings.embedding_dim,
+        )
+    except (ValueError, IntegrityError) as exc:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Collection already exists") from exc
+    logger.info(
+        "collection_created",
+        collection=collection.name,
+        model=collection.embedding_model,
+        dim=collection.embedding_dim,
+        user=user.username,
+    )
+    return _read(collection)
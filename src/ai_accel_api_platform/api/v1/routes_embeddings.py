@@ -1,16 +1,109 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import struct
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+import orjson
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from starlette.concurrency import run_in_threadpool
 
-from ai_accel_api_platform.ai.embeddings import embed_texts
-from ai_accel_api_platform.core.schemas import EmbeddingRequest, EmbeddingResponse
+from ai_accel_api_platform.ai.embeddings import embed_array, embed_array_async
+from ai_accel_api_platform.core.schemas import (
+    EmbeddingPackedResponse,
+    EmbeddingRequest,
+    EmbeddingResponse,
+    VectorFormat,
+)
+from ai_accel_api_platform.core.utils import b64_float32, encode_matrix
+from ai_accel_api_platform.settings import get_settings
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+RECORD_STREAM_MEDIA_TYPE = "application/x-embedding-records"
+# Each binary record is (start index, row count, dim) followed by row count * dim
+# little-endian float32 values.
+RECORD_HEADER = struct.Struct("<III")
+
+BINARY_MEDIA_TYPES: dict[str, str] = {
+    "f32": "application/octet-stream",
+    "f16": "application/x-float16",
+    "npy": "application/x-npy",
+}
+
+
+def _negotiate_format(fmt: VectorFormat | None, accept: str) -> VectorFormat:
+    if fmt is not None:
+        return fmt
+    if BINARY_MEDIA_TYPES["npy"] in accept:
+        return "npy"
+    if BINARY_MEDIA_TYPES["f16"] in accept:
+        return "f16"
+    if BINARY_MEDIA_TYPES["f32"] in accept:
+        return "f32"
+    return "json"
+
 
-@router.post("/embeddings", response_model=EmbeddingResponse)
-async def create_embeddings(payload: EmbeddingRequest) -> EmbeddingResponse:
+async def _stream_embeddings(texts: list[str], binary: bool) -> AsyncIterator[bytes]:
+    chunk_size = max(1, get_settings().embed_stream_chunk_size)
+    for start in range(0, len(texts), chunk_size):
+        vectors = await run_in_threadpool(embed_array, texts[start : start + chunk_size])
+        if binary:
+            count, dim = vectors.shape
+            yield RECORD_HEADER.pack(start, count, dim) + vectors.astype("<f4").tobytes()
+        else:
+            yield b"".join(
+                orjson.dumps(
+                    {"index": start + offset, "embedding": row},
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+                )
+                for offset, row in enumerate(vectors)
+            )
+
+
+@router.post(
+    "/embeddings",
+    response_model=EmbeddingResponse | EmbeddingPackedResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in BINARY_MEDIA_TYPES.values()},
+            "description": "Embeddings as JSON floats, base64 float32, or a binary matrix",
+        }
+    },
+)
+async def create_embeddings(
+    payload: EmbeddingRequest,
+    stream: Annotated[bool, Query()] = False,
+    fmt: Annotated[VectorFormat | None, Query(alias="format")] = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> EmbeddingResponse | EmbeddingPackedResponse | Response:
     texts = payload.texts if payload.texts else [payload.text or ""]
-    embeddings = await run_in_threadpool(embed_texts, texts)
-    return EmbeddingResponse(embeddings=embeddings)
+
+    accept = accept or ""
+    if RECORD_STREAM_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            _stream_embeddings(texts, binary=True), media_type=RECORD_STREAM_MEDIA_TYPE
+        )
+    if stream or NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            _stream_embeddings(texts, binary=False), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    vectors = await embed_array_async(texts)
+    resolved = _negotiate_format(fmt, accept)
+    if resolved == "json":
+        return EmbeddingResponse(embeddings=vectors.tolist())
+    dim = int(vectors.shape[1]) if vectors.ndim == 2 else 0
+    if resolved == "base64":
+        return EmbeddingPackedResponse(dim=dim, embeddings=[b64_float32(row) for row in vectors])
+    return Response(
+        content=encode_matrix(vectors, resolved),
+        media_type=BINARY_MEDIA_TYPES[resolved],
+        headers={
+            "X-Embedding-Count": str(len(vectors)),
+            "X-Embedding-Dim": str(dim),
+            "X-Embedding-Dtype": "float16" if resolved == "f16" else "float32",
+        },
+    )
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 
+from ai_accel_api_platform.ai.warmup import is_ready
 from ai_accel_api_platform.core.device import get_device_info
-from ai_accel_api_platform.core.schemas import HealthResponse
+from ai_accel_api_platform.core.schemas import HealthResponse, ReadyResponse
 from ai_accel_api_platform.db.session import db_ping
 from ai_accel_api_platform.settings import get_settings
 
@@ -18,3 +19,15 @@ async def health() -> HealthResponse:
         device=get_device_info(prefer_gpu=settings.prefer_gpu),
         db_ok=await db_ping(),
     )
+
+
+@router.get(
+    "/ready",
+    response_model=ReadyResponse,
+    responses={503: {"model": ReadyResponse, "description": "Models are still warming up"}},
+)
+async def ready(response: Response) -> ReadyResponse:
+    if not is_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return ReadyResponse(status="warming_up")
+    return ReadyResponse(status="ready")
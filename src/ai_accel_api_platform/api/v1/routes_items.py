@@ -1,23 +1,113 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Annotated
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 from rq import Queue
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.concurrency import run_in_threadpool
 
-from ai_accel_api_platform.ai.embeddings import embed_texts
-from ai_accel_api_platform.api.deps import get_db_session
-from ai_accel_api_platform.core.schemas import ItemCreate, ItemRead
-from ai_accel_api_platform.db.repositories import get_item, upsert_item_with_embedding
+from ai_accel_api_platform.ai.chunking import embed_document_async, embed_documents_async
+from ai_accel_api_platform.ai.embeddings import embed_array_async, embed_texts_async
+from ai_accel_api_platform.api.deps import (
+    get_db_session,
+    get_read_db_session,
+    get_served_collection,
+)
+from ai_accel_api_platform.core.errors import CollectionModelError
+from ai_accel_api_platform.core.schemas import (
+    BulkItem,
+    BulkItemsResponse,
+    CollectionName,
+    ItemCreate,
+    ItemRead,
+)
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION
+from ai_accel_api_platform.db.repositories import (
+    bulk_upsert_items,
+    get_item,
+    upsert_item_with_embedding,
+)
 from ai_accel_api_platform.db.session import get_redis, get_sync_redis
 from ai_accel_api_platform.db.vector import bump_cache_namespace
+from ai_accel_api_platform.settings import get_settings
 from ai_accel_api_platform.workers.tasks import compute_and_store_embedding
 
+logger = structlog.get_logger(__name__)
+
 router = APIRouter()
 
+MODEL_CHANGED_DETAIL = "Collection moved to an embedding model this deployment does not serve"
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_BULK_ITEMS = TypeAdapter(list[BulkItem])
+
+
+async def _ndjson_items(request: Request) -> AsyncIterator[BulkItem]:
+    buffer = b""
+    line_number = 0
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _parse_line(line, line_number)
+    if buffer.strip():
+        yield _parse_line(buffer, line_number + 1)
+
+
+def _parse_line(line: bytes, line_number: int) -> BulkItem:
+    try:
+        return BulkItem.model_validate_json(line)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", line_number, *error["loc"])} for error in exc.errors()]
+        ) from exc
+
+
+async def _json_items(request: Request) -> AsyncIterator[BulkItem]:
+    try:
+        items = _BULK_ITEMS.validate_json(await request.body())
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+        ) from exc
+    for item in items:
+        yield item
+
+
+async def _batches(items: AsyncIterator[BulkItem], size: int) -> AsyncIterator[list[BulkItem]]:
+    batch: list[BulkItem] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _store_batch(session: AsyncSession, batch: list[BulkItem], collection: str) -> list[UUID]:
+    ids = [item.id or uuid4() for item in batch]
+    texts = [item.content for item in batch]
+    if get_settings().chunking:
+        chunked = await embed_documents_async(texts)
+        embeddings = [document.embedding for document in chunked]
+    else:
+        chunked = None
+        embeddings = list(await embed_array_async(texts))
+    rows = [
+        (item_id, item.content, item.metadata, embedding)
+        for item_id, item, embedding in zip(ids, batch, embeddings, strict=True)
+    ]
+    await bulk_upsert_items(session, rows, chunked, collection)
+    return ids
+
 
 @router.post("/items", response_model=ItemRead)
 async def upsert_item(
@@ -25,32 +115,50 @@ async def upsert_item(
     session: Annotated[AsyncSession, Depends(get_db_session)],
 ) -> ItemRead:
     item_id = payload.id or uuid4()
+    collection = (await get_served_collection(session, payload.collection)).name
 
-    if payload.async_embedding:
-        item = await upsert_item_with_embedding(
-            session,
-            item_id,
-            payload.content,
-            payload.metadata,
-            None,
-        )
-        redis_conn = get_sync_redis()
-        queue = Queue(connection=redis_conn)
-        queue.enqueue(
-            compute_and_store_embedding,
-            str(item_id),
-            payload.content,
-            payload.metadata,
-        )
-    else:
-        embedding = await run_in_threadpool(embed_texts, [payload.content])
-        item = await upsert_item_with_embedding(
-            session,
-            item_id,
-            payload.content,
-            payload.metadata,
-            embedding[0],
-        )
+    try:
+        if payload.async_embedding:
+            item = await upsert_item_with_embedding(
+                session,
+                item_id,
+                payload.content,
+                payload.metadata,
+                None,
+                collection=collection,
+            )
+            redis_conn = get_sync_redis()
+            queue = Queue(connection=redis_conn)
+            queue.enqueue(
+                compute_and_store_embedding,
+                str(item_id),
+                payload.content,
+                payload.metadata,
+                collection,
+            )
+        elif get_settings().chunking:
+            chunked = await embed_document_async(payload.content)
+            item = await upsert_item_with_embedding(
+                session,
+                item_id,
+                payload.content,
+                payload.metadata,
+                chunked.embedding,
+                chunked,
+                collection=collection,
+            )
+        else:
+            embedding = await embed_texts_async([payload.content])
+            item = await upsert_item_with_embedding(
+                session,
+                item_id,
+                payload.content,
+                payload.metadata,
+                embedding[0],
+                collection=collection,
+            )
+    except CollectionModelError as exc:
+        raise HTTPException(status_code=409, detail=MODEL_CHANGED_DETAIL) from exc
 
     try:
         redis = get_redis()
@@ -58,25 +166,68 @@ async def upsert_item(
     except Exception:
         pass
 
-    return ItemRead(
-        id=item.id,
-        content=item.content,
-        metadata=item.metadata_,
-        has_embedding=item.embedding is not None,
-    )
+    return ItemRead(**item._asdict(), collection=collection)
+
+
+@router.post(
+    "/items:bulk",
+    response_model=BulkItemsResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": BulkItem.model_json_schema()}
+                },
+                NDJSON_MEDIA_TYPE: {"schema": BulkItem.model_json_schema()},
+            },
+        }
+    },
+)
+async def bulk_upsert_items_route(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    collection: Annotated[CollectionName, Query()] = DEFAULT_COLLECTION,
+) -> BulkItemsResponse:
+    """Embed and upsert many items; every batch of ``BULK_BATCH_SIZE`` is its own commit.
+
+    Accepts a JSON array or an NDJSON stream (one item per line). With NDJSON, batches
+    committed before an invalid line are kept.
+    """
+    content_type = request.headers.get("content-type", "")
+    items = _ndjson_items(request) if NDJSON_MEDIA_TYPE in content_type else _json_items(request)
+    await get_served_collection(session, collection)
+
+    ids: list[UUID] = []
+    try:
+        async for batch in _batches(items, max(1, get_settings().bulk_batch_size)):
+            ids.extend(await _store_batch(session, batch, collection))
+    except CollectionModelError as exc:
+        raise HTTPException(status_code=409, detail=MODEL_CHANGED_DETAIL) from exc
+    finally:
+        if ids:
+            try:
+                redis = get_redis()
+                await bump_cache_namespace(redis)
+            except Exception:
+                pass
+    logger.info("bulk_items_upserted", count=len(ids), collection=collection)
+    return BulkItemsResponse(count=len(ids), ids=ids)
 
 
 @router.get("/items/{item_id}", response_model=ItemRead)
 async def read_item(
     item_id: UUID,
-    session: Annotated[AsyncSession, Depends(get_db_session)],
+    session: Annotated[AsyncSession, Depends(get_read_db_session)],
+    collection: Annotated[CollectionName, Query()] = DEFAULT_COLLECTION,
 ) -> ItemRead:
-    item = await get_item(session, item_id)
+    item = await get_item(session, item_id, collection)
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
 
     return ItemRead(
         id=item.id,
+        collection=item.collection,
         content=item.content,
         metadata=item.metadata_,
         has_embedding=item.embedding is not None,
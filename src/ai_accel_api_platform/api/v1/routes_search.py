@@ -1,30 +1,94 @@
 from __future__ import annotations
 
-from typing import Annotated
+import asyncio
+from collections.abc import AsyncIterator, Collection, Sequence
+from typing import Annotated, cast
 
-from fastapi import APIRouter, Depends
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.concurrency import run_in_threadpool
-
-from ai_accel_api_platform.ai.embeddings import embed_texts
-from ai_accel_api_platform.ai.rerank import rerank_results
-from ai_accel_api_platform.api.deps import get_db_session
-from ai_accel_api_platform.core.schemas import SearchRequest, SearchResponse, SearchResult
-from ai_accel_api_platform.db.repositories import hybrid_search, vector_search
-from ai_accel_api_platform.db.session import get_redis
+
+from ai_accel_api_platform.ai.embeddings import embed_texts_async
+from ai_accel_api_platform.ai.rerank import rerank_results_async
+from ai_accel_api_platform.api.deps import get_read_db_session, get_served_collection
+from ai_accel_api_platform.core.schemas import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchCursorRequest,
+    SearchCursorResponse,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+)
+from ai_accel_api_platform.core.utils import b64_float32
+from ai_accel_api_platform.db.accuracy import resolve_profile
+from ai_accel_api_platform.db.cursors import SearchCursor, load_cursor, save_cursor
+from ai_accel_api_platform.db.repositories import (
+    SEARCH_FIELDS,
+    SearchHit,
+    batch_vector_search,
+    chunk_search,
+    deep_vector_search,
+    hybrid_search,
+    hydrate_hits,
+    vector_search,
+)
+from ai_accel_api_platform.db.session import get_read_session, get_redis
 from ai_accel_api_platform.db.vector import build_search_cache_key, get_cache_namespace
 from ai_accel_api_platform.settings import get_settings
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _encode_vector(
+    embedding: Sequence[float] | np.ndarray | None, vector_encoding: str
+) -> list[float] | str | None:
+    if embedding is None:
+        return None
+    if vector_encoding == "base64":
+        return b64_float32(embedding)
+    return cast(list[float], np.asarray(embedding, dtype=np.float32).tolist())
+
+
+def _search_results(
+    results: list[tuple[SearchHit, float]],
+    fields: Collection[str],
+    include_vectors: bool,
+    vector_encoding: str,
+) -> list[SearchResult]:
+    return [
+        SearchResult(
+            id=hit.id,
+            content=hit.content if "content" in fields else None,
+            metadata=hit.metadata,
+            score=score,
+            embedding=_encode_vector(hit.embedding, vector_encoding) if include_vectors else None,
+        )
+        for hit, score in results
+    ]
+
 
 @router.post("/search", response_model=SearchResponse)
 async def search(
     payload: SearchRequest,
-    session: Annotated[AsyncSession, Depends(get_db_session)],
+    session: Annotated[AsyncSession, Depends(get_read_db_session)],
 ) -> SearchResponse:
     settings = get_settings()
+    # Hybrid and chunk search rank with ANN candidates only; exact scoring would be
+    # silently ignored there.
+    if payload.exact and (payload.use_hybrid or settings.chunking):
+        raise HTTPException(
+            status_code=422, detail="exact is not supported with use_hybrid or chunking"
+        )
+    fields = set(SEARCH_FIELDS if payload.fields is None else payload.fields)
+    # The reranker scores content, so it is fetched even when it is not returned.
+    query_fields = fields | {"content"} if settings.enable_rerank else fields
+    accuracy = resolve_profile(payload.accuracy)
+    collection = (await get_served_collection(session, payload.collection)).name
     redis: Redis[str] | None = None
     cache_key = None
     try:
@@ -36,24 +100,52 @@ async def search(
             payload.top_k,
             payload.filters,
             payload.text_filter,
+            {
+                "include_vectors": payload.include_vectors,
+                "vector_encoding": payload.vector_encoding,
+                "fields": sorted(fields),
+                "accuracy": accuracy,
+                "exact": payload.exact,
+                "collection": collection,
+            },
         )
 
-        cached = await redis.get(cache_key)
-        if cached:
-            data = SearchResponse.model_validate_json(cached)
-            return data
+        # Strong reads must see the caller's own writes, which a cached result may
+        # predate.
+        if session.info.get("read_consistency") != "strong":
+            cached = await redis.get(cache_key)
+            if cached:
+                data = SearchResponse.model_validate_json(cached)
+                return data
     except Exception:
         redis = None
 
-    embedding = await run_in_threadpool(embed_texts, [payload.query])
+    embedding = await embed_texts_async([payload.query])
 
-    if payload.use_hybrid or payload.text_filter:
-        results = await hybrid_search(
+    if settings.chunking:
+        results = await chunk_search(
             session,
             embedding[0],
             payload.top_k,
             payload.filters,
             payload.text_filter,
+            fields=query_fields,
+            include_vectors=payload.include_vectors,
+            accuracy=accuracy,
+            collection=collection,
+        )
+    elif payload.use_hybrid:
+        results = await hybrid_search(
+            session,
+            embedding[0],
+            payload.top_k,
+            payload.filters,
+            payload.query,
+            fields=query_fields,
+            include_vectors=payload.include_vectors,
+            accuracy=accuracy,
+            collection=collection,
+            text_filter=payload.text_filter,
         )
     else:
         results = await vector_search(
@@ -61,22 +153,130 @@ async def search(
             embedding[0],
             payload.top_k,
             payload.filters,
+            fields=query_fields,
+            include_vectors=payload.include_vectors,
+            accuracy=accuracy,
+            exact=payload.exact,
+            collection=collection,
+            text_filter=payload.text_filter,
         )
 
-    results = rerank_results(payload.query, results)
+    results = await rerank_results_async(payload.query, results)
 
     response = SearchResponse(
+        results=_search_results(results, fields, payload.include_vectors, payload.vector_encoding)
+    )
+
+    # A replica may not have replayed writes that already bumped the cache namespace,
+    # so only primary results are cached.
+    if redis is not None and cache_key is not None and session.info.get("read_source") != "replica":
+        await redis.set(cache_key, response.model_dump_json(), ex=settings.cache_ttl_seconds)
+    return response
+
+
+@router.post("/search:batch", response_model=BatchSearchResponse)
+async def search_batch(
+    payload: BatchSearchRequest,
+    session: Annotated[AsyncSession, Depends(get_read_db_session)],
+) -> BatchSearchResponse:
+    """Run many vector searches with one embedding call and one database round trip."""
+    settings = get_settings()
+    fields = set(SEARCH_FIELDS if payload.fields is None else payload.fields)
+    query_fields = fields | {"content"} if settings.enable_rerank else fields
+    collection = (await get_served_collection(session, payload.collection)).name
+
+    embeddings = await embed_texts_async(payload.queries)
+    batches = await batch_vector_search(
+        session,
+        embeddings,
+        payload.top_k,
+        payload.filters,
+        fields=query_fields,
+        include_vectors=payload.include_vectors,
+        accuracy=resolve_profile(payload.accuracy),
+        collection=collection,
+    )
+    # Concurrent reranks share cross-encoder micro-batches.
+    reranked = await asyncio.gather(
+        *(
+            rerank_results_async(query, results)
+            for query, results in zip(payload.queries, batches, strict=True)
+        )
+    )
+    return BatchSearchResponse(
         results=[
-            SearchResult(
-                id=item.id,
-                content=item.content,
-                metadata=item.metadata_,
-                score=score,
+            SearchResponse(
+                results=_search_results(
+                    results, fields, payload.include_vectors, payload.vector_encoding
+                )
             )
-            for item, score in results
+            for results in reranked
         ]
     )
 
-    if redis is not None and cache_key is not None:
-        await redis.set(cache_key, response.model_dump_json(), ex=settings.cache_ttl_seconds)
-    return response
+
+@router.post("/search:cursor", response_model=SearchCursorResponse)
+async def create_search_cursor(
+    payload: SearchCursorRequest,
+    session: Annotated[AsyncSession, Depends(get_read_db_session)],
+) -> SearchCursorResponse:
+    """Rank up to ``max_results`` items once and keep the list server-side for paging."""
+    settings = get_settings()
+    collection = (await get_served_collection(session, payload.collection)).name
+    embedding = await embed_texts_async([payload.query])
+    ranked = await deep_vector_search(
+        session,
+        embedding[0],
+        payload.max_results,
+        payload.filters,
+        accuracy=resolve_profile(payload.accuracy),
+        collection=collection,
+    )
+    cursor = SearchCursor(
+        ids=[item_id for item_id, _ in ranked],
+        scores=[score for _, score in ranked],
+        fields=sorted(SEARCH_FIELDS if payload.fields is None else payload.fields),
+        include_vectors=payload.include_vectors,
+        vector_encoding=payload.vector_encoding,
+        collection=collection,
+    )
+    ttl = settings.search_cursor_ttl_seconds
+    token = await save_cursor(get_redis(), cursor, ttl)
+    return SearchCursorResponse(cursor=token, total=len(ranked), expires_in=ttl)
+
+
+async def _stream_cursor(cursor: SearchCursor, offset: int, limit: int) -> AsyncIterator[bytes]:
+    page_size = max(1, get_settings().search_cursor_page_size)
+    end = min(len(cursor.ids), offset + limit)
+    # The request's session is released once streaming starts, so pages use their own.
+    async with get_read_session() as session:
+        for start in range(offset, end, page_size):
+            stop = min(end, start + page_size)
+            hits = await hydrate_hits(
+                session,
+                list(zip(cursor.ids[start:stop], cursor.scores[start:stop], strict=True)),
+                cursor.fields,
+                cursor.include_vectors,
+                cursor.collection,
+            )
+            results = _search_results(
+                hits, cursor.fields, cursor.include_vectors, cursor.vector_encoding
+            )
+            yield "".join(result.model_dump_json() + "\n" for result in results).encode()
+
+
+@router.get("/search:cursor/{cursor}")
+async def read_search_cursor(
+    cursor: str,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1)] = 10000,
+) -> StreamingResponse:
+    """Stream results ``offset`` to ``offset + limit`` of a cursor as NDJSON."""
+    stored = await load_cursor(get_redis(), cursor, get_settings().search_cursor_ttl_seconds)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Cursor not found or expired")
+    return StreamingResponse(
+        _stream_cursor(stored, offset, limit),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"X-Cursor-Total": str(len(stored.ids))},
+    )
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Chunk:
+    index: int
+    text: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class ChunkedEmbedding:
+    """Per-chunk vectors of one document plus the document vector they pool into."""
+
+    chunks: list[Chunk]
+    vectors: np.ndarray
+    embedding: np.ndarray
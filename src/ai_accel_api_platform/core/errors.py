@@ -4,3 +4,11 @@ class NotFoundError(Exception):
 
 class AuthError(Exception):
     pass
+
+
+class ModelServerError(Exception):
+    pass
+
+
+class CollectionModelError(Exception):
+    pass
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Any
+from typing import Annotated, Any, Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field, model_validator
 
+CollectionName = Annotated[str, Field(pattern=r"^[a-z][a-z0-9_]{0,27}$")]
+
 
 class HealthResponse(BaseModel):
     status: str
@@ -13,6 +15,10 @@ class HealthResponse(BaseModel):
     db_ok: bool
 
 
+class ReadyResponse(BaseModel):
+    status: str
+
+
 class ApiEndpointOrQueriedObjectInteractionType(str, Enum):
     GET_DATA = "GET_DATA"
     SEND_DATA = "SEND_DATA"
@@ -20,13 +26,26 @@ class ApiEndpointOrQueriedObjectInteractionType(str, Enum):
 
 class ItemCreate(BaseModel):
     id: UUID | None = None
+    collection: CollectionName = "default"
     content: str
     metadata: dict[str, Any] | None = None
     async_embedding: bool = False
 
 
+class BulkItem(BaseModel):
+    id: UUID | None = None
+    content: str
+    metadata: dict[str, Any] | None = None
+
+
+class BulkItemsResponse(BaseModel):
+    count: int
+    ids: list[UUID]
+
+
 class ItemRead(BaseModel):
     id: UUID
+    collection: str = "default"
     content: str
     metadata: dict[str, Any] | None = None
     has_embedding: bool
@@ -47,25 +66,86 @@ class EmbeddingResponse(BaseModel):
     embeddings: list[list[float]]
 
 
+VectorFormat = Literal["json", "f32", "f16", "base64", "npy"]
+
+
+class EmbeddingPackedResponse(BaseModel):
+    dtype: str = "float32"
+    dim: int
+    embeddings: list[str]
+
+
 class SearchRequest(BaseModel):
     query: str
     top_k: int = Field(default=5, ge=1, le=100)
     filters: dict[str, Any] | None = None
     text_filter: str | None = None
     use_hybrid: bool = False
+    include_vectors: bool = False
+    vector_encoding: Literal["float", "base64"] = "float"
+    fields: list[Literal["content", "metadata"]] | None = None
+    accuracy: Literal["fast", "balanced", "accurate"] | None = None
+    collection: CollectionName = "default"
+    exact: bool = False
+
+
+class BatchSearchRequest(BaseModel):
+    queries: list[str] = Field(min_length=1, max_length=256)
+    top_k: int = Field(default=5, ge=1, le=100)
+    filters: dict[str, Any] | None = None
+    include_vectors: bool = False
+    vector_encoding: Literal["float", "base64"] = "float"
+    fields: list[Literal["content", "metadata"]] | None = None
+    accuracy: Literal["fast", "balanced", "accurate"] | None = None
+    collection: CollectionName = "default"
+
+
+class SearchCursorRequest(BaseModel):
+    query: str
+    max_results: int = Field(default=1000, ge=1, le=10000)
+    filters: dict[str, Any] | None = None
+    include_vectors: bool = False
+    vector_encoding: Literal["float", "base64"] = "float"
+    fields: list[Literal["content", "metadata"]] | None = None
+    accuracy: Literal["fast", "balanced", "accurate"] | None = None
+    collection: CollectionName = "default"
+
+
+class SearchCursorResponse(BaseModel):
+    cursor: str
+    total: int
+    expires_in: int
+
+
+class CollectionCreate(BaseModel):
+    name: CollectionName
+    embedding_model: str | None = None
+    embedding_dim: int | None = Field(default=None, ge=1, le=16000)
+
+
+class CollectionRead(BaseModel):
+    name: str
+    embedding_model: str
+    embedding_dim: int
+    served: bool
 
 
 class SearchResult(BaseModel):
     id: UUID
-    content: str
+    content: str | None
     metadata: dict[str, Any] | None
     score: float
+    embedding: list[float] | str | None = None
 
 
 class SearchResponse(BaseModel):
     results: list[SearchResult]
 
 
+class BatchSearchResponse(BaseModel):
+    results: list[SearchResponse]
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
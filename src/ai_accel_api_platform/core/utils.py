@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import base64
 import hashlib
+import io
 from collections.abc import Callable, Iterable
 from typing import Any, cast
 
@@ -35,6 +37,31 @@ def batch_cosine_similarity(
     return cast(list[float], scores.tolist())
 
 
+def pack_float32(vector: Iterable[float] | np.ndarray) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def unpack_float32(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4")
+
+
+def b64_float32(vector: Iterable[float] | np.ndarray) -> str:
+    return base64.b64encode(pack_float32(vector)).decode("ascii")
+
+
+def encode_matrix(matrix: np.ndarray, fmt: str) -> bytes:
+    """Serialize a 2-D embedding matrix as raw ``f32``/``f16`` bytes or ``npy``."""
+    if fmt == "f32":
+        return np.ascontiguousarray(matrix, dtype="<f4").tobytes()
+    if fmt == "f16":
+        return np.ascontiguousarray(matrix, dtype="<f2").tobytes()
+    if fmt == "npy":
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(matrix, dtype="<f4"), allow_pickle=False)
+        return buffer.getvalue()
+    raise ValueError(f"unsupported_format: {fmt}")
+
+
 def json_dumps(payload: Any) -> str:
     data: bytes = orjson.dumps(payload)
     return data.decode("utf-8")
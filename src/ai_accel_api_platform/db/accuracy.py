@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_accel_api_platform.settings import get_settings
+
+AccuracyProfile = Literal["fast", "balanced", "accurate"]
+
+MAX_EF_SEARCH = 1000
+
+
+@dataclass(frozen=True)
+class AnnParams:
+    ef_search: int
+    probes: int
+    max_scan_tuples: int
+
+
+ACCURACY_PROFILES: dict[str, AnnParams] = {
+    "fast": AnnParams(ef_search=40, probes=1, max_scan_tuples=5_000),
+    "balanced": AnnParams(ef_search=100, probes=10, max_scan_tuples=20_000),
+    "accurate": AnnParams(ef_search=400, probes=40, max_scan_tuples=100_000),
+}
+
+
+def resolve_profile(profile: str | None) -> str:
+    """``profile``, or the server default when the request does not name one."""
+    name = profile or get_settings().search_accuracy
+    if name not in ACCURACY_PROFILES:
+        raise ValueError(f"unknown_accuracy_profile: {name}")
+    return name
+
+
+def ann_settings(profile: str | None, top_k: int, iterative: bool) -> dict[str, str]:
+    """GUC values for an ANN query under ``profile``.
+
+    ``ef_search`` never drops below ``top_k``. Iterative queries (filtered or deeper
+    than one index walk) widen it by ``FILTER_ANN_OVERSAMPLE`` and turn on pgvector
+    iterative scans, which keep walking the index until ``top_k`` rows are produced or
+    ``max_scan_tuples`` is reached.
+    """
+    settings = get_settings()
+    params = ACCURACY_PROFILES[resolve_profile(profile)]
+    ef_search = max(params.ef_search, top_k)
+    oversampled = top_k * max(1, settings.filter_ann_oversample)
+    if iterative:
+        ef_search = max(ef_search, oversampled)
+    values = {
+        "hnsw.ef_search": str(min(MAX_EF_SEARCH, ef_search)),
+        "ivfflat.probes": str(params.probes),
+    }
+    if iterative and settings.ann_iterative_scan != "off":
+        values["hnsw.iterative_scan"] = settings.ann_iterative_scan
+        values["hnsw.max_scan_tuples"] = str(max(params.max_scan_tuples, oversampled))
+        # ivfflat only supports relaxed ordering; results are re-sorted by the caller.
+        values["ivfflat.iterative_scan"] = "relaxed_order"
+    return values
+
+
+async def apply_ann_settings(
+    session: AsyncSession, profile: str | None, top_k: int, iterative: bool
+) -> None:
+    """Set the ANN GUCs for the current transaction in a single round trip."""
+    values = ann_settings(profile, top_k, iterative)
+    await session.execute(
+        select(*(func.set_config(name, value, True) for name, value in values.items()))
+    )
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_accel_api_platform.core.errors import CollectionModelError
+from ai_accel_api_platform.db.models import Collection
+from ai_accel_api_platform.settings import get_settings
+
+# Partition and index names are derived from the collection name, so it must be a
+# plain identifier short enough for ``items_<name>_next_embedding_halfvec_hnsw``, the
+# longest index name a re-embedding shadow table gets.
+COLLECTION_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,27}$")
+# pgvector index dimension limits per type.
+MAX_VECTOR_INDEX_DIM = 2000
+MAX_HALFVEC_INDEX_DIM = 4000
+MAX_BIT_INDEX_DIM = 64000
+
+# name -> (monotonic expiry, info)
+_collections: dict[str, tuple[float, CollectionInfo]] = {}
+_collections_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CollectionInfo:
+    name: str
+    embedding_model: str
+    embedding_dim: int
+
+    @property
+    def served(self) -> bool:
+        """Whether this process embeds with the collection's model."""
+        settings = get_settings()
+        return (
+            self.embedding_model == settings.embedding_model
+            and self.embedding_dim == settings.embedding_dim
+        )
+
+
+def partition_name(name: str) -> str:
+    if not COLLECTION_NAME_PATTERN.match(name):
+        raise ValueError(f"invalid_collection_name: {name}")
+    return f"items_{name}"
+
+
+def vector_index_definitions(dim: int) -> dict[str, str]:
+    """HNSW index methods by index name suffix for ``dim``-dimensional embeddings.
+
+    Types whose pgvector index limit is below ``dim`` are left out.
+    """
+    definitions = {}
+    if dim <= MAX_VECTOR_INDEX_DIM:
+        definitions["embedding_hnsw"] = f"USING hnsw ((embedding::vector({dim})) vector_cosine_ops)"
+    if dim <= MAX_HALFVEC_INDEX_DIM:
+        definitions["embedding_halfvec_hnsw"] = (
+            f"USING hnsw ((embedding::halfvec({dim})) halfvec_cosine_ops)"
+        )
+    if dim <= MAX_BIT_INDEX_DIM:
+        definitions["embedding_bit_hnsw"] = (
+            f"USING hnsw ((binary_quantize(embedding)::bit({dim})) bit_hamming_ops)"
+        )
+    return definitions
+
+
+def partition_statements(name: str, dim: int) -> list[str]:
+    """DDL for the ``items`` partition of collection ``name`` and its vector indexes.
+
+    Vector indexes are built on ``embedding::<type>(dim)`` expressions because the
+    parent column has no fixed dimension; the CHECK keeps every row castable. Text
+    and metadata indexes are inherited from the partitioned parent.
+    """
+    table = partition_name(name)
+    return [
+        f"CREATE TABLE {table} PARTITION OF items FOR VALUES IN ('{name}')",
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_embedding_dim "
+        f"CHECK (vector_dims(embedding) = {dim})",
+        *(
+            f"CREATE INDEX {table}_{suffix} ON {table} {definition}"
+            for suffix, definition in vector_index_definitions(dim).items()
+        ),
+    ]
+
+
+def _info(row: Collection) -> CollectionInfo:
+    return CollectionInfo(row.name, row.embedding_model, row.embedding_dim)
+
+
+async def get_collection(session: AsyncSession, name: str) -> CollectionInfo | None:
+    """Collection ``name``, cached for ``COLLECTION_CACHE_TTL_SECONDS``.
+
+    Rows only change when a re-embedding cuts over to a new model, so the TTL bounds
+    how long a deployment keeps serving a collection it no longer matches.
+    """
+    cached = _collections.get(name)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    row = await session.get(Collection, name, populate_existing=True)
+    if row is None:
+        return None
+    info = _info(row)
+    with _collections_lock:
+        _collections[name] = (now + get_settings().collection_cache_ttl_seconds, info)
+    return info
+
+
+async def list_collections(session: AsyncSession) -> list[CollectionInfo]:
+    result = await session.execute(select(Collection).order_by(Collection.name))
+    return [_info(row) for row in result.scalars()]
+
+
+async def create_collection(
+    session: AsyncSession, name: str, embedding_model: str, embedding_dim: int
+) -> CollectionInfo:
+    """Register collection ``name`` and create its partition in one transaction.
+
+    Attaching a partition briefly locks ``items``; the new partition is empty, so its
+    indexes build instantly.
+    """
+    statements = partition_statements(name, embedding_dim)
+    if await get_collection(session, name) is not None:
+        raise ValueError(f"collection_exists: {name}")
+    session.add(Collection(name=name, embedding_model=embedding_model, embedding_dim=embedding_dim))
+    await session.flush()
+    for statement in statements:
+        await session.execute(text(statement))
+    await session.commit()
+    return CollectionInfo(name, embedding_model, embedding_dim)
+
+
+async def lock_collection_model(session: AsyncSession, name: str) -> None:
+    """Keep collection ``name`` on the configured model until the transaction ends.
+
+    Writes take this share lock before touching ``items``. A cutover to another model
+    updates the row, so it waits for writes in flight, and writes queued behind it
+    see the new model and raise ``CollectionModelError`` instead of mixing vectors
+    of two models in one partition.
+    """
+    locked = await session.scalar(
+        select(Collection.name)
+        .where(
+            Collection.name == name, Collection.embedding_model == get_settings().embedding_model
+        )
+        .with_for_update(read=True)
+    )
+    if locked is None:
+        await session.rollback()
+        clear_collections()
+        raise CollectionModelError(name)
+
+
+def clear_collections() -> None:
+    with _collections_lock:
+        _collections.clear()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import base64
+import secrets
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+import orjson
+from redis.asyncio import Redis
+
+from ai_accel_api_platform.core.utils import b64_float32, json_dumps
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION
+
+CURSOR_KEY_PREFIX = "search:cursor:"
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """A materialized, ranked candidate list plus how its pages should be rendered."""
+
+    ids: list[UUID]
+    scores: list[float]
+    fields: list[str]
+    include_vectors: bool
+    vector_encoding: str
+    collection: str = DEFAULT_COLLECTION
+
+    def dumps(self) -> str:
+        return json_dumps(
+            {
+                "ids": base64.b64encode(b"".join(item_id.bytes for item_id in self.ids)).decode(
+                    "ascii"
+                ),
+                "scores": b64_float32(self.scores),
+                "fields": self.fields,
+                "include_vectors": self.include_vectors,
+                "vector_encoding": self.vector_encoding,
+                "collection": self.collection,
+            }
+        )
+
+    @classmethod
+    def loads(cls, raw: str) -> SearchCursor:
+        data = orjson.loads(raw)
+        packed = base64.b64decode(data["ids"])
+        scores = np.frombuffer(base64.b64decode(data["scores"]), dtype="<f4")
+        return cls(
+            ids=[UUID(bytes=packed[start : start + 16]) for start in range(0, len(packed), 16)],
+            scores=[float(score) for score in scores],
+            fields=list(data["fields"]),
+            include_vectors=bool(data["include_vectors"]),
+            vector_encoding=str(data["vector_encoding"]),
+            collection=str(data.get("collection", DEFAULT_COLLECTION)),
+        )
+
+
+async def save_cursor(redis: Redis[str], cursor: SearchCursor, ttl_seconds: int) -> str:
+    token = secrets.token_urlsafe(18)
+    await redis.set(CURSOR_KEY_PREFIX + token, cursor.dumps(), ex=ttl_seconds)
+    return token
+
+
+async def load_cursor(redis: Redis[str], token: str, ttl_seconds: int) -> SearchCursor | None:
+    """The cursor stored under ``token``; reading it extends its TTL."""
+    raw = await redis.getex(CURSOR_KEY_PREFIX + token, ex=ttl_seconds)
+    return SearchCursor.loads(raw) if raw else None
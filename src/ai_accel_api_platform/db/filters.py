@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, Text, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_accel_api_platform.core.utils import json_dumps, normalize_filters
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION, Item
+from ai_accel_api_platform.settings import get_settings
+
+FilterStrategy = Literal["exact", "ann"]
+
+METADATA_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_MAX_CACHED_PLANS = 1024
+
+_plans: OrderedDict[str, tuple[float, FilterStrategy]] = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def metadata_text(key: str) -> ColumnElement[str]:
+    """``metadata->>'key'`` with the key inlined, so it matches expression indexes."""
+    if not METADATA_KEY_PATTERN.match(key):
+        raise ValueError(f"invalid_metadata_key: {key}")
+    return Item.metadata_.op("->>", return_type=Text)(literal(key, literal_execute=True))
+
+
+def filter_conditions(filters: dict[str, Any] | None) -> list[ColumnElement[bool]]:
+    """JSONB containment for ``filters`` plus equality predicates on promoted keys.
+
+    The extra predicates select the same rows as ``@>`` for string values but let the
+    planner use the promoted expression and partial HNSW indexes. Values are inlined
+    because partial index predicates only match constants.
+    """
+    if not filters:
+        return []
+    promoted = set(get_settings().promoted_metadata_keys)
+    return [
+        Item.metadata_.contains(filters),
+        *(
+            metadata_text(key) == literal(value, literal_execute=True)
+            for key, value in filters.items()
+            if key in promoted and isinstance(value, str)
+        ),
+    ]
+
+
+async def count_matching(
+    session: AsyncSession, conditions: list[ColumnElement[bool]], limit: int
+) -> int:
+    """Count rows matching ``conditions``, stopping after ``limit``."""
+    matching = select(literal(1)).select_from(Item).where(*conditions).limit(limit).subquery()
+    result = await session.execute(select(func.count()).select_from(matching))
+    return int(result.scalar_one())
+
+
+async def plan_filter_strategy(
+    session: AsyncSession,
+    filters: dict[str, Any] | None,
+    conditions: list[ColumnElement[bool]],
+    collection: str = DEFAULT_COLLECTION,
+) -> FilterStrategy:
+    """Pick pre-filtering (exact scan) or post-filtering (oversampled ANN) for ``filters``.
+
+    Filters matching at most ``FILTER_EXACT_MAX_ROWS`` rows are searched exactly; the
+    bounded count that decides this is cached per collection and filter for a short time.
+    """
+    settings = get_settings()
+    threshold = settings.filter_exact_max_rows
+    if not filters or threshold <= 0:
+        return "ann"
+
+    key = json_dumps({"collection": collection, "filters": normalize_filters(filters)})
+    now = time.monotonic()
+    with _plans_lock:
+        cached = _plans.get(key)
+        if cached is not None and cached[0] > now:
+            _plans.move_to_end(key)
+            return cached[1]
+
+    matching = await count_matching(session, conditions, threshold + 1)
+    strategy: FilterStrategy = "exact" if matching <= threshold else "ann"
+    with _plans_lock:
+        _plans[key] = (now + settings.filter_plan_ttl_seconds, strategy)
+        _plans.move_to_end(key)
+        while len(_plans) > _MAX_CACHED_PLANS:
+            _plans.popitem(last=False)
+    return strategy
+
+
+def clear_plans() -> None:
+    with _plans_lock:
+        _plans.clear()
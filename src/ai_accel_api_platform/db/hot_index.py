@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
+from typing import Any, Protocol
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ai_accel_api_platform.db.collections import get_collection
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION, Item
+from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.telemetry.metrics import HOT_INDEX_ITEMS
+
+logger = structlog.get_logger(__name__)
+
+# Rows allocated up front; backends double their capacity as items arrive.
+INITIAL_CAPACITY = 1024
+
+_index: HotIndex | None = None
+_task: asyncio.Task[None] | None = None
+
+
+class _Backend(Protocol):
+    def set(self, labels: np.ndarray, vectors: np.ndarray) -> None: ...
+
+    def delete(self, labels: Iterable[int]) -> None: ...
+
+    def search(self, query: np.ndarray, k: int, ef: int) -> tuple[np.ndarray, np.ndarray]: ...
+
+
+class _NumpyBackend:
+    """Exact scan over a growable matrix of normalized vectors."""
+
+    def __init__(self, dim: int, capacity: int) -> None:
+        self._vectors = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._alive = np.zeros(max(1, capacity), dtype=bool)
+        self._size = 0
+
+    def set(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        needed = int(labels.max()) + 1
+        if needed > len(self._vectors):
+            grow = max(needed, 2 * len(self._vectors)) - len(self._vectors)
+            self._vectors = np.vstack(
+                [self._vectors, np.zeros((grow, self._vectors.shape[1]), dtype=np.float32)]
+            )
+            self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._vectors[labels] = vectors
+        self._alive[labels] = True
+        self._size = max(self._size, needed)
+
+    def delete(self, labels: Iterable[int]) -> None:
+        self._alive[list(labels)] = False
+
+    def search(self, query: np.ndarray, k: int, ef: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = self._vectors[: self._size] @ query
+        scores[~self._alive[: self._size]] = -np.inf
+        k = min(k, int(self._alive[: self._size].sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+
+class _HnswBackend:
+    """hnswlib graph; labels of deleted items are reused when the item comes back."""
+
+    def __init__(self, dim: int, capacity: int) -> None:
+        import hnswlib
+
+        settings = get_settings()
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(
+            max_elements=max(1, capacity),
+            ef_construction=settings.hot_index_ef_construction,
+            M=settings.hot_index_m,
+        )
+        self._deleted: set[int] = set()
+
+    def set(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        needed = int(labels.max()) + 1
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        for label in self._deleted.intersection(labels.tolist()):
+            self._index.unmark_deleted(label)
+            self._deleted.discard(label)
+        self._index.add_items(vectors, labels)
+
+    def delete(self, labels: Iterable[int]) -> None:
+        for label in labels:
+            if label not in self._deleted:
+                self._index.mark_deleted(label)
+                self._deleted.add(label)
+
+    def search(self, query: np.ndarray, k: int, ef: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, self._index.get_current_count() - len(self._deleted))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self._index.set_ef(max(ef, k))
+        labels, distances = self._index.knn_query(query, k=k)
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+
+def _make_backend(dim: int, capacity: int) -> tuple[str, _Backend]:
+    # Both backends grow on demand, so a small corpus never pays for HOT_INDEX_MAX_ITEMS.
+    capacity = min(capacity, INITIAL_CAPACITY)
+    try:
+        return "hnswlib", _HnswBackend(dim, capacity)
+    except ImportError:
+        logger.info("hot_index_backend", backend="numpy", reason="hnswlib_not_installed")
+        return "numpy", _NumpyBackend(dim, capacity)
+
+
+class HotIndex:
+    """In-process replica of the default collection's embeddings for unfiltered search.
+
+    Item ids map to dense integer labels in the backend. Searches return ``None``
+    until the first full sync has finished, so callers fall back to Postgres.
+    """
+
+    def __init__(self, dim: int, capacity: int, backend: _Backend | None = None) -> None:
+        if backend is None:
+            self.backend_name, backend = _make_backend(dim, capacity)
+        else:
+            self.backend_name = type(backend).__name__
+        self._backend = backend
+        self._labels: dict[UUID, int] = {}
+        self._ids: list[UUID] = []
+        self._live: set[UUID] = set()
+        self._lock = threading.Lock()
+        self.ready = False
+        self.watermark: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def apply(self, ids: Sequence[UUID], vectors: Sequence[Any | None]) -> None:
+        """Upsert ids with a vector and drop ids whose vector is ``None``."""
+        with self._lock:
+            labels: list[int] = []
+            rows: list[np.ndarray] = []
+            removed: list[int] = []
+            for item_id, vector in zip(ids, vectors, strict=True):
+                if vector is None:
+                    if item_id in self._live:
+                        removed.append(self._labels[item_id])
+                        self._live.discard(item_id)
+                    continue
+                label = self._labels.get(item_id)
+                if label is None:
+                    label = len(self._ids)
+                    self._labels[item_id] = label
+                    self._ids.append(item_id)
+                labels.append(label)
+                rows.append(np.asarray(vector, dtype=np.float32))
+                self._live.add(item_id)
+            if removed:
+                self._backend.delete(removed)
+            if labels:
+                matrix = np.vstack(rows)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._backend.set(np.asarray(labels, dtype=np.int64), matrix / (norms + 1e-12))
+            HOT_INDEX_ITEMS.set(len(self._live))
+
+    def search(
+        self, query: Iterable[float], top_k: int, ef: int
+    ) -> list[tuple[UUID, float]] | None:
+        if not self.ready:
+            return None
+        vector = np.asarray(list(query), dtype=np.float32)
+        vector = vector / (float(np.linalg.norm(vector)) + 1e-12)
+        with self._lock:
+            if not self._live:
+                return []
+            labels, scores = self._backend.search(vector, top_k, ef)
+            return [
+                (self._ids[int(label)], float(score))
+                for label, score in zip(labels, scores, strict=True)
+            ]
+
+
+def get_hot_index() -> HotIndex | None:
+    return _index
+
+
+async def sync_hot_index(session: AsyncSession, index: HotIndex) -> None:
+    """Apply items changed since the index watermark.
+
+    The poll re-reads ``HOT_INDEX_SYNC_OVERLAP_SECONDS`` before the watermark, because
+    rows can commit out of order: ``updated_at`` is the wall-clock time of the write
+    (``clock_timestamp()``), which precedes its commit by however long the rest of the
+    transaction takes. Re-applying an unchanged row is harmless.
+    """
+    settings = get_settings()
+    conditions = [Item.collection == DEFAULT_COLLECTION]
+    if index.watermark is not None:
+        since = index.watermark - timedelta(seconds=settings.hot_index_sync_overlap_seconds)
+        conditions.append(Item.updated_at >= since)
+    elif not index.ready:
+        total = await session.scalar(
+            select(func.count()).select_from(Item).where(*conditions, Item.embedding.isnot(None))
+        )
+        if int(total or 0) > settings.hot_index_max_items:
+            logger.warning(
+                "hot_index_disabled", items=total, max_items=settings.hot_index_max_items
+            )
+            return
+
+    stmt = (
+        select(Item.id, Item.embedding, Item.updated_at)
+        .where(*conditions)
+        .execution_options(yield_per=settings.hot_index_sync_batch_size)
+    )
+    watermark = index.watermark
+    result = await session.stream(stmt)
+    async for partition in result.partitions():
+        ids = [row[0] for row in partition]
+        vectors = [row[1] for row in partition]
+        await run_in_threadpool(index.apply, ids, vectors)
+        latest = max(row[2] for row in partition)
+        watermark = latest if watermark is None else max(watermark, latest)
+    index.watermark = watermark
+
+    if len(index) > settings.hot_index_max_items:
+        # A partial replica would silently drop results; hand searches back to Postgres.
+        index.ready = False
+        logger.warning("hot_index_over_capacity", items=len(index))
+    elif not index.ready:
+        index.ready = True
+        logger.info("hot_index_ready", items=len(index), backend=index.backend_name)
+
+
+async def _run_sync(index: HotIndex) -> None:
+    global _index
+    settings = get_settings()
+    interval = max(0.1, settings.hot_index_sync_interval_seconds)
+    while True:
+        try:
+            async with get_session() as session:
+                collection = await get_collection(session, DEFAULT_COLLECTION)
+                if collection is not None and not collection.served:
+                    # Re-embedded by another model: drop the old vectors and bootstrap
+                    # from scratch if this deployment serves the collection again.
+                    if index.watermark is not None:
+                        index = HotIndex(settings.embedding_dim, settings.hot_index_max_items)
+                        _index = index
+                        HOT_INDEX_ITEMS.set(0)
+                else:
+                    await sync_hot_index(session, index)
+        except Exception as exc:
+            logger.warning("hot_index_sync_failed", error=str(exc))
+        await asyncio.sleep(interval)
+
+
+def start_hot_index_sync() -> None:
+    """Bootstrap the hot index in the background and keep polling for changes."""
+    global _index, _task
+    settings = get_settings()
+    if not settings.hot_index:
+        return
+    if _index is None:
+        _index = HotIndex(settings.embedding_dim, settings.hot_index_max_items)
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run_sync(_index))
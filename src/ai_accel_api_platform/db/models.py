@@ -5,14 +5,29 @@ from typing import Any
 from uuid import UUID, uuid4
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Boolean, DateTime, Integer, String, Text, func, text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    DateTime,
+    ForeignKeyConstraint,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from ai_accel_api_platform.settings import get_settings
 
 EMBEDDING_DIM = get_settings().embedding_dim
+# Text search configuration baked into the generated ``items.content_tsv`` column.
+TEXT_SEARCH_CONFIG = "english"
+# Collection of items written without one; it is the partition the migration created.
+DEFAULT_COLLECTION = "default"
 
 
 class Base(DeclarativeBase):
@@ -44,14 +59,63 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class Collection(Base):
+    """A named set of items with its own ``items`` partition and embedding space."""
+
+    __tablename__ = "collections"
+
+    name: Mapped[str] = mapped_column(Text(), primary_key=True)
+    embedding_model: Mapped[str] = mapped_column(Text())
+    embedding_dim: Mapped[int] = mapped_column(Integer())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = ({"postgresql_partition_by": "LIST (collection)"},)
 
+    collection: Mapped[str] = mapped_column(
+        Text(), primary_key=True, default=DEFAULT_COLLECTION, server_default=DEFAULT_COLLECTION
+    )
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
     content: Mapped[str] = mapped_column(Text())
     metadata_: Mapped[dict[str, Any] | None] = mapped_column("metadata", JSONB(), nullable=True)
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(EMBEDDING_DIM), nullable=True)
+    # Unconstrained: each partition checks and indexes its collection's dimension.
+    embedding: Mapped[list[float] | None] = mapped_column(Vector(), nullable=True)
+    # Model that produced ``embedding``; NULL on rows older than the tag.
+    embedding_model: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    content_tsv: Mapped[Any] = mapped_column(
+        TSVECTOR(),
+        Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Wall-clock time of the write, not the transaction start (migration 0011), so
+    # pollers of ``updated_at`` see rows committed late in a long transaction.
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True),
+        server_default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
     )
+
+
+class ItemChunk(Base):
+    __tablename__ = "item_chunks"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["collection", "item_id"], ["items.collection", "items.id"], ondelete="CASCADE"
+        ),
+        UniqueConstraint("collection", "item_id", "chunk_index"),
+    )
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    collection: Mapped[str] = mapped_column(
+        Text(), default=DEFAULT_COLLECTION, server_default=DEFAULT_COLLECTION
+    )
+    item_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), index=True)
+    chunk_index: Mapped[int] = mapped_column(Integer())
+    content: Mapped[str] = mapped_column(Text())
+    start_char: Mapped[int] = mapped_column(Integer())
+    end_char: Mapped[int] = mapped_column(Integer())
+    embedding: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIM))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
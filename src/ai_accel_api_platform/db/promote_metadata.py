@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+from collections.abc import Sequence
+
+import structlog
+from sqlalchemy import text
+
+from ai_accel_api_platform.db.collections import (
+    MAX_VECTOR_INDEX_DIM,
+    CollectionInfo,
+    list_collections,
+    partition_name,
+)
+from ai_accel_api_platform.db.filters import METADATA_KEY_PATTERN
+from ai_accel_api_platform.db.session import get_engine, get_session
+from ai_accel_api_platform.logging import configure_logging
+
+logger = structlog.get_logger(__name__)
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _index_suffix(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+
+
+def promotion_statements(
+    key: str, hnsw_values: list[str], collections: Sequence[CollectionInfo]
+) -> list[str]:
+    """DDL promoting metadata ``key`` in each collection's partition: a btree
+    expression index, plus one partial HNSW index per value in ``hnsw_values`` for
+    filters that are hit constantly.
+
+    Postgres cannot build indexes on a partitioned table concurrently, so every
+    partition gets its own.
+    """
+    if not METADATA_KEY_PATTERN.match(key):
+        raise ValueError(f"invalid_metadata_key: {key}")
+    expression = f"(metadata->>{_quote_literal(key)})"
+    statements = []
+    for collection in collections:
+        table = partition_name(collection.name)
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_meta_{key.lower()}_btree "
+            f"ON {table} ({expression})"
+        )
+        if collection.embedding_dim > MAX_VECTOR_INDEX_DIM:
+            continue
+        for value in hnsw_values:
+            statements.append(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"{table}_meta_{key.lower()}_{_index_suffix(value)}_hnsw "
+                f"ON {table} USING hnsw "
+                f"((embedding::vector({collection.embedding_dim})) vector_cosine_ops) "
+                f"WHERE {expression} = {_quote_literal(value)}"
+            )
+    statements.append("ANALYZE items")
+    return statements
+
+
+async def promote(key: str, hnsw_values: list[str]) -> None:
+    async with get_session() as session:
+        collections = await list_collections(session)
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    async with engine.connect() as conn:
+        for statement in promotion_statements(key, hnsw_values, collections):
+            logger.info("metadata_promotion_statement", key=key, sql=statement)
+            await conn.execute(text(statement))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Index a hot metadata key for filtered search. Add the key to "
+        "PROMOTED_METADATA_KEYS afterwards so queries use the new indexes."
+    )
+    parser.add_argument("key")
+    parser.add_argument(
+        "--hnsw-value",
+        action="append",
+        default=[],
+        help="build a partial HNSW index for metadata->>key = VALUE (repeatable)",
+    )
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(promote(args.key, args.hnsw_value))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import (
+    ColumnElement,
+    RowMapping,
+    TableClause,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ai_accel_api_platform.ai.chunking import embed_documents
+from ai_accel_api_platform.ai.embeddings import encode_local
+from ai_accel_api_platform.core.chunks import ChunkedEmbedding
+from ai_accel_api_platform.db.collections import (
+    CollectionInfo,
+    clear_collections,
+    get_collection,
+    lock_collection_model,
+    partition_name,
+    vector_index_definitions,
+)
+from ai_accel_api_platform.db.models import Collection, Item, ItemChunk
+from ai_accel_api_platform.db.repositories import chunk_rows
+from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Seconds to wait before the first cutover retry; each further retry waits twice as
+# long, up to CUTOVER_MAX_RETRY_SECONDS.
+CUTOVER_RETRY_SECONDS = 1.0
+CUTOVER_MAX_RETRY_SECONDS = 30.0
+
+_INDEX_HEADER = re.compile(r"^CREATE (UNIQUE )?INDEX (\S+) ON (?:ONLY )?(?:\S+\.)?(\S+) ")
+
+
+class ReindexProgress(NamedTuple):
+    """Where a re-embedding job stopped; ``after`` is the keyset cursor to resume from."""
+
+    after: UUID | None
+    processed: int
+    done: bool
+    backfill: bool
+
+
+class ReindexCoverage(NamedTuple):
+    items: int
+    pending: int
+
+
+def shadow_name(name: str) -> str:
+    """Table the items of collection ``name`` are re-embedded into before cutover."""
+    return f"{partition_name(name)}_next"
+
+
+def _partition_table(name: str) -> TableClause:
+    """Stored ``items`` columns on the concrete table ``name``."""
+    return table(
+        name,
+        *(
+            column(col.name, col.type)
+            for col in Item.__table__.columns
+            if col.name != "content_tsv"
+        ),
+    )
+
+
+def shadow_statements(name: str, dim: int, live_indexes: dict[str, str]) -> list[str]:
+    """DDL for the shadow table of collection ``name`` holding ``dim``-dimensional vectors.
+
+    ``live_indexes`` maps the live partition's index names to their definitions. Its
+    text and metadata indexes are recreated under the shadow's name so the swapped-in
+    partition keeps them; vector indexes are built for the new dimension instead.
+    The collection CHECK lets the cutover attach the shadow without a validation scan.
+    """
+    live, shadow = partition_name(name), shadow_name(name)
+    statements = [
+        f"CREATE TABLE {shadow} (LIKE items INCLUDING ALL EXCLUDING INDEXES)",
+        f"ALTER TABLE {shadow} ADD PRIMARY KEY (collection, id)",
+        f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow}_collection CHECK (collection = '{name}')",
+        f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow}_embedding_dim "
+        f"CHECK (vector_dims(embedding) = {dim})",
+    ]
+    for index, definition in sorted(live_indexes.items()):
+        header = _INDEX_HEADER.match(definition)
+        if header is None or header.group(3) != live or "embedding" in definition:
+            continue
+        suffix = index.removeprefix(live)
+        renamed = f"{shadow}{suffix}" if suffix != index else f"{shadow}_{index}"
+        statements.append(
+            f"CREATE {header.group(1) or ''}INDEX {renamed} ON {shadow} "
+            + definition[header.end() :]
+        )
+    statements.extend(
+        f"CREATE INDEX {shadow}_{suffix} ON {shadow} {definition}"
+        for suffix, definition in vector_index_definitions(dim).items()
+    )
+    return statements
+
+
+async def _index_definitions(session: AsyncSession, table_name: str) -> dict[str, str]:
+    result = await session.execute(
+        text(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = CAST(:table AS regclass) AND NOT i.indisprimary"
+        ),
+        {"table": table_name},
+    )
+    return {name: definition for name, definition in result.tuples()}
+
+
+async def _table_exists(session: AsyncSession, table_name: str) -> bool:
+    result = await session.execute(
+        text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table_name}
+    )
+    return bool(result.scalar_one())
+
+
+async def ensure_shadow(session: AsyncSession, name: str, dim: int) -> None:
+    """Create the shadow table of collection ``name`` unless a previous run did."""
+    shadow = shadow_name(name)
+    if await _table_exists(session, shadow):
+        return
+    live_indexes = await _index_definitions(session, partition_name(name))
+    skipped = [index for index, definition in live_indexes.items() if "embedding" in definition]
+    for statement in shadow_statements(name, dim, live_indexes):
+        await session.execute(text(statement))
+    await session.commit()
+    logger.info("reindex_shadow_created", collection=name, table=shadow, dim=dim)
+    if skipped:
+        # Partial HNSW indexes of promoted metadata values are dimension-specific;
+        # promote_metadata rebuilds them once the collection is cut over.
+        logger.warning("reindex_vector_indexes_not_copied", collection=name, indexes=skipped)
+
+
+async def drop_shadow(session: AsyncSession, name: str) -> None:
+    """Abandon a re-embedding of collection ``name``; the live partition is untouched."""
+    await session.execute(text(f"DROP TABLE IF EXISTS {shadow_name(name)}"))
+    await session.commit()
+
+
+async def _check_reindexable(session: AsyncSession, name: str) -> None:
+    # Chunk vectors live in ``item_chunks`` at the served dimension and cannot be
+    # swapped along with a partition.
+    has_chunks = await session.scalar(select(exists().where(ItemChunk.collection == name)))
+    if get_settings().chunking or has_chunks:
+        raise ValueError(f"reindex_chunked_collection: {name}")
+
+
+def _stale_stmt(name: str, after: UUID | None, limit: int | None) -> Any:
+    """Live items whose shadow row is missing or older than the live row."""
+    live = _partition_table(partition_name(name)).alias("live")
+    shadow = _partition_table(shadow_name(name)).alias("shadow")
+    stmt = (
+        select(live)
+        .select_from(
+            live.outerjoin(
+                shadow, (shadow.c.collection == live.c.collection) & (shadow.c.id == live.c.id)
+            )
+        )
+        .where(
+            live.c.collection == name,
+            or_(shadow.c.id.is_(None), shadow.c.updated_at.is_distinct_from(live.c.updated_at)),
+        )
+        .order_by(live.c.id)
+    )
+    if after is not None:
+        stmt = stmt.where(live.c.id > after)
+    return stmt if limit is None else stmt.limit(limit)
+
+
+def _needs_vector(live: TableClause) -> ColumnElement[bool]:
+    settings = get_settings()
+    # Rows without a recorded model predate the column and were embedded with the
+    # collection's model.
+    conditions = [
+        live.c.embedding.is_(None),
+        live.c.embedding_model != settings.embedding_model,
+    ]
+    if settings.chunking:
+        # Items written before CHUNKING was enabled have no chunks to be found by.
+        conditions.append(
+            ~exists().where(
+                ItemChunk.collection == live.c.collection, ItemChunk.item_id == live.c.id
+            )
+        )
+    return or_(*conditions)
+
+
+def _missing_stmt(name: str, after: UUID | None, limit: int | None) -> Any:
+    """Live items of a served collection that were never embedded, were embedded by
+    another model's deployment or, with ``CHUNKING``, have no chunks."""
+    live = _partition_table(partition_name(name))
+    stmt = select(live).where(live.c.collection == name, _needs_vector(live)).order_by(live.c.id)
+    if after is not None:
+        stmt = stmt.where(live.c.id > after)
+    return stmt if limit is None else stmt.limit(limit)
+
+
+async def coverage(session: AsyncSession, name: str) -> ReindexCoverage:
+    """Item count of collection ``name`` and how many still need a vector from the
+    configured model."""
+    info = await get_collection(session, name)
+    if info is None:
+        raise ValueError(f"unknown_collection: {name}")
+    live = _partition_table(partition_name(name))
+    items = await session.scalar(select(func.count()).select_from(live))
+    if info.served:
+        pending_stmt = _missing_stmt(name, None, None)
+    elif await _table_exists(session, shadow_name(name)):
+        pending_stmt = _stale_stmt(name, None, None)
+    else:
+        return ReindexCoverage(items or 0, items or 0)
+    pending = await session.scalar(select(func.count()).select_from(pending_stmt.subquery()))
+    return ReindexCoverage(items or 0, pending or 0)
+
+
+async def _write_shadow(
+    session: AsyncSession, name: str, rows: Sequence[RowMapping], vectors: np.ndarray
+) -> None:
+    shadow = _partition_table(shadow_name(name))
+    stmt = insert(shadow)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["collection", "id"],
+            set_={
+                key: stmt.excluded[key]
+                for key in ("content", "metadata", "embedding", "embedding_model", "updated_at")
+            },
+        ),
+        [
+            # updated_at is copied from the live row: it is the version the shadow is at.
+            {**row, "embedding": vector, "embedding_model": get_settings().embedding_model}
+            for row, vector in zip(rows, vectors, strict=True)
+        ],
+    )
+
+
+async def _write_backfill(
+    session: AsyncSession, name: str, rows: Sequence[RowMapping], vectors: np.ndarray
+) -> None:
+    live = _partition_table(partition_name(name))
+    await lock_collection_model(session, name)
+    # Rows written since they were read keep the newer write, embedded or queued.
+    stmt = (
+        update(live)
+        .where(
+            live.c.collection == name,
+            live.c.id == bindparam("row_id"),
+            live.c.updated_at == bindparam("row_updated_at"),
+            _needs_vector(live),
+        )
+        .values(
+            embedding=bindparam("vector", type_=Item.embedding.type),
+            embedding_model=get_settings().embedding_model,
+            updated_at=func.clock_timestamp(),
+        )
+    )
+    await session.execute(
+        stmt,
+        [
+            {"row_id": row["id"], "row_updated_at": row["updated_at"], "vector": vector}
+            for row, vector in zip(rows, vectors, strict=True)
+        ],
+    )
+
+
+async def _write_chunk_backfill(
+    session: AsyncSession, name: str, rows: Sequence[RowMapping], documents: list[ChunkedEmbedding]
+) -> None:
+    live = _partition_table(partition_name(name))
+    await lock_collection_model(session, name)
+    for row, document in zip(rows, documents, strict=True):
+        # As in _write_backfill, rows written since they were read are left alone.
+        written = await session.execute(
+            update(live)
+            .where(
+                live.c.collection == name,
+                live.c.id == row["id"],
+                live.c.updated_at == row["updated_at"],
+                _needs_vector(live),
+            )
+            .values(
+                embedding=document.embedding,
+                embedding_model=get_settings().embedding_model,
+                updated_at=func.clock_timestamp(),
+            )
+            .returning(live.c.id)
+        )
+        if written.first() is None:
+            continue
+        await session.execute(
+            delete(ItemChunk).where(ItemChunk.collection == name, ItemChunk.item_id == row["id"])
+        )
+        await session.execute(insert(ItemChunk), chunk_rows(name, row["id"], document))
+
+
+async def cut_over(session: AsyncSession, name: str) -> bool:
+    """Swap the fully re-embedded shadow in as the partition of collection ``name``.
+
+    Writes to the collection are blocked while the final check runs. The detach takes
+    ACCESS EXCLUSIVE on ``items`` itself, so queries on every collection queue behind
+    it: for up to ``REINDEX_LOCK_TIMEOUT_SECONDS`` while it waits for running queries,
+    then for the milliseconds the catalog updates take. Returns False when items
+    changed since the last pass or a lock was not granted in time.
+    """
+    settings = get_settings()
+    live, shadow = partition_name(name), shadow_name(name)
+    lock_timeout_ms = int(settings.reindex_lock_timeout_seconds * 1000)
+    try:
+        await session.execute(text(f"SET LOCAL lock_timeout = {lock_timeout_ms}"))
+        # Writes hold the collection row in share mode (lock_collection_model). Taking
+        # it before the partition lets writes in flight finish and queues later ones,
+        # which then see the new model, behind the cutover.
+        await session.execute(
+            select(Collection.name).where(Collection.name == name).with_for_update()
+        )
+        await session.execute(text(f"LOCK TABLE {live} IN EXCLUSIVE MODE"))
+        if (await session.execute(_stale_stmt(name, None, 1))).first() is not None:
+            await session.rollback()
+            return False
+        await session.execute(
+            text(
+                f"DELETE FROM {shadow} s WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {live} l WHERE l.collection = s.collection AND l.id = s.id)"
+            )
+        )
+        await session.execute(text(f"ALTER TABLE items DETACH PARTITION {live}"))
+        await session.execute(text(f"DROP TABLE {live}"))
+        await session.execute(
+            text(f"ALTER TABLE items ATTACH PARTITION {shadow} FOR VALUES IN ('{name}')")
+        )
+        await session.execute(text(f"ALTER TABLE {shadow} DROP CONSTRAINT {shadow}_collection"))
+        await session.execute(text(f"ALTER TABLE {shadow} RENAME TO {live}"))
+        # Renaming the primary key's index also renames the constraint.
+        indexes = [f"{shadow}_pkey", *await _index_definitions(session, live)]
+        for index in indexes:
+            if index.startswith(f"{shadow}_"):
+                renamed = live + index.removeprefix(shadow)
+                await session.execute(text(f"ALTER INDEX {index} RENAME TO {renamed}"))
+        await session.execute(
+            text(
+                f"ALTER TABLE {live} RENAME CONSTRAINT {shadow}_embedding_dim "
+                f"TO {live}_embedding_dim"
+            )
+        )
+        await session.execute(
+            update(Collection)
+            .where(Collection.name == name)
+            .values(embedding_model=settings.embedding_model, embedding_dim=settings.embedding_dim)
+        )
+        await session.commit()
+    except DBAPIError as exc:
+        await session.rollback()
+        logger.warning("reindex_cutover_retry", collection=name, error=str(exc.orig))
+        return False
+    clear_collections()
+    logger.info(
+        "reindex_cutover",
+        collection=name,
+        model=settings.embedding_model,
+        dim=settings.embedding_dim,
+    )
+    return True
+
+
+def throttle_delay(processed: int, elapsed: float, max_items_per_second: float) -> float:
+    """Seconds to pause so ``processed`` items in ``elapsed`` seconds stay within the rate."""
+    if max_items_per_second <= 0:
+        return 0.0
+    return max(0.0, processed / max_items_per_second - elapsed)
+
+
+async def reindex_step(
+    name: str, after: UUID | None = None, budget_seconds: float | None = None
+) -> ReindexProgress:
+    """Embed items of collection ``name`` with the configured model for up to
+    ``budget_seconds`` (``REINDEX_JOB_SECONDS``), resuming after item id ``after``.
+
+    A collection this worker serves only gets its missing vectors filled in place,
+    with chunks when ``CHUNKING`` is on. Any other collection is re-embedded into its
+    shadow table, keyset page by keyset page at ``REINDEX_MAX_ITEMS_PER_SECOND``;
+    items written meanwhile are picked up by the next pass. A pass that finds nothing
+    left is done, and the shadow waits for ``finalize``.
+    """
+    settings = get_settings()
+    budget = settings.reindex_job_seconds if budget_seconds is None else budget_seconds
+    started = time.monotonic()
+    processed = 0
+    async with get_session() as session:
+        info: CollectionInfo | None = await get_collection(session, name)
+        if info is None:
+            raise ValueError(f"unknown_collection: {name}")
+        backfill = info.served
+        if not backfill:
+            await _check_reindexable(session, name)
+            await ensure_shadow(session, name, settings.embedding_dim)
+        pending_stmt = _missing_stmt if backfill else _stale_stmt
+        write = _write_backfill if backfill else _write_shadow
+        chunked = backfill and settings.chunking
+
+        while time.monotonic() - started < budget:
+            result = await session.execute(pending_stmt(name, after, settings.reindex_batch_size))
+            rows = result.mappings().all()
+            if not rows:
+                if after is not None:
+                    # Items before the cursor may have changed during the pass.
+                    after = None
+                    continue
+                return ReindexProgress(None, processed, True, backfill)
+            texts = [row["content"] for row in rows]
+            if chunked:
+                documents = await run_in_threadpool(embed_documents, texts)
+                await _write_chunk_backfill(session, name, rows, documents)
+            else:
+                vectors = await run_in_threadpool(encode_local, texts)
+                await write(session, name, rows, vectors)
+            await session.commit()
+            processed += len(rows)
+            after = rows[-1]["id"]
+            delay = throttle_delay(
+                processed, time.monotonic() - started, settings.reindex_max_items_per_second
+            )
+            if delay:
+                await asyncio.sleep(delay)
+
+    logger.info("reindex_progress", collection=name, processed=processed, after=str(after))
+    return ReindexProgress(after, processed, False, backfill)
+
+
+async def finalize(name: str) -> bool:
+    """Cut collection ``name`` over to its re-embedded shadow table.
+
+    Each attempt first re-embeds items written since the last pass. A failed cutover
+    is retried after ``CUTOVER_RETRY_SECONDS``, doubling up to
+    ``CUTOVER_MAX_RETRY_SECONDS``, so a busy ``items`` table is not stalled over and
+    over. Returns False after ``REINDEX_CUTOVER_ATTEMPTS`` failed attempts.
+    """
+    settings = get_settings()
+    async with get_session() as session:
+        info = await get_collection(session, name)
+        if info is None:
+            raise ValueError(f"unknown_collection: {name}")
+        if info.served or not await _table_exists(session, shadow_name(name)):
+            raise ValueError(f"reindex_not_started: {name}")
+
+    attempts = max(1, settings.reindex_cutover_attempts)
+    delay = CUTOVER_RETRY_SECONDS
+    for attempt in range(1, attempts + 1):
+        progress = await reindex_step(name)
+        while not progress.done:
+            progress = await reindex_step(name, progress.after)
+        async with get_session() as session:
+            if await cut_over(session, name):
+                return True
+        logger.warning("reindex_cutover_failed", collection=name, attempt=attempt)
+        if attempt < attempts:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CUTOVER_MAX_RETRY_SECONDS)
+    return False
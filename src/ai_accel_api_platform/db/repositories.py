@@ -1,14 +1,53 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from typing import Any
+from collections.abc import Collection, Iterable, Sequence
+from datetime import datetime
+from typing import Any, NamedTuple
 from uuid import UUID
 
-from sqlalchemy import select
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Select,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    null,
+    select,
+    true,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
+from ai_accel_api_platform.core.chunks import ChunkedEmbedding
 from ai_accel_api_platform.core.security import get_password_hash, verify_password
-from ai_accel_api_platform.db.models import Item, User
+from ai_accel_api_platform.db.accuracy import (
+    ACCURACY_PROFILES,
+    MAX_EF_SEARCH,
+    apply_ann_settings,
+    resolve_profile,
+)
+from ai_accel_api_platform.db.collections import lock_collection_model
+from ai_accel_api_platform.db.filters import filter_conditions, plan_filter_strategy
+from ai_accel_api_platform.db.hot_index import get_hot_index
+from ai_accel_api_platform.db.models import (
+    DEFAULT_COLLECTION,
+    EMBEDDING_DIM,
+    TEXT_SEARCH_CONFIG,
+    Item,
+    ItemChunk,
+    User,
+)
+from ai_accel_api_platform.db.snapshot import get_snapshot
+from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.telemetry.metrics import VECTOR_SEARCHES
+
+SEARCH_FIELDS = ("content", "metadata")
 
 
 async def get_user_by_username(session: AsyncSession, username: str) -> User | None:
@@ -106,69 +145,557 @@ async def ensure_default_user(
     )
 
 
+class ItemWriteResult(NamedTuple):
+    id: UUID
+    content: str
+    metadata: dict[str, Any] | None
+    has_embedding: bool
+
+
+def chunk_rows(collection: str, item_id: UUID, chunked: ChunkedEmbedding) -> list[dict[str, Any]]:
+    return [
+        {
+            "collection": collection,
+            "item_id": item_id,
+            "chunk_index": chunk.index,
+            "content": chunk.text,
+            "start_char": chunk.start,
+            "end_char": chunk.end,
+            "embedding": vector,
+        }
+        for chunk, vector in zip(chunked.chunks, chunked.vectors, strict=True)
+    ]
+
+
 async def upsert_item_with_embedding(
     session: AsyncSession,
     item_id: UUID,
     content: str,
     metadata: dict[str, Any] | None,
     embedding: Iterable[float] | None,
-) -> Item:
-    result = await session.execute(select(Item).where(Item.id == item_id))
-    item = result.scalar_one_or_none()
+    chunked: ChunkedEmbedding | None = None,
+    collection: str = DEFAULT_COLLECTION,
+) -> ItemWriteResult:
+    """Insert or update an item with one ``INSERT ... ON CONFLICT ... RETURNING``.
 
-    if item is None:
-        item = Item(id=item_id, content=content, metadata_=metadata, embedding=embedding)
-        session.add(item)
-    else:
-        item.content = content
-        item.metadata_ = metadata
-        if embedding is not None:
-            item.embedding = list(embedding)
+    Without an ``embedding`` the stored embedding and chunks are kept. With one, the
+    item's chunks are replaced by ``chunked`` (or cleared) in the same statement.
+    Raises ``CollectionModelError`` when the collection no longer uses the configured
+    embedding model.
+    """
+    vector = None if embedding is None else list(embedding)
+    # A separate round trip on purpose: folded into the upsert, the model check would
+    # wait on the collection row while already holding a lock on ``items``, which
+    # deadlocks with a cutover holding the row and waiting to detach the partition.
+    await lock_collection_model(session, collection)
+    stmt = insert(Item).values(
+        collection=collection,
+        id=item_id,
+        content=content,
+        metadata_=metadata,
+        embedding=vector,
+        embedding_model=None if vector is None else get_settings().embedding_model,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Item.collection, Item.id],
+        set_={
+            "content": stmt.excluded.content,
+            "metadata": stmt.excluded.metadata,
+            "embedding": func.coalesce(stmt.excluded.embedding, Item.embedding),
+            "embedding_model": func.coalesce(stmt.excluded.embedding_model, Item.embedding_model),
+            "updated_at": func.clock_timestamp(),
+        },
+    )
+    if vector is not None:
+        stmt = stmt.add_cte(
+            delete(ItemChunk)
+            .where(ItemChunk.collection == collection, ItemChunk.item_id == item_id)
+            .cte("cleared_chunks")
+        )
+    result = await session.execute(
+        stmt.returning(Item.id, Item.content, Item.metadata_, Item.embedding.isnot(None))
+    )
+    row = ItemWriteResult(*result.one())
 
+    if chunked is not None:
+        await session.execute(insert(ItemChunk), chunk_rows(collection, item_id, chunked))
     await session.commit()
-    await session.refresh(item)
-    return item
+    return row
+
 
+async def bulk_upsert_items(
+    session: AsyncSession,
+    rows: Sequence[tuple[UUID, str, dict[str, Any] | None, Iterable[float]]],
+    chunked: Sequence[ChunkedEmbedding] | None = None,
+    collection: str = DEFAULT_COLLECTION,
+) -> None:
+    """Upsert embedded items through one executemany ``INSERT ... ON CONFLICT``, then commit.
+
+    Later rows win when an id repeats. Chunks of every written item are replaced by
+    ``chunked`` (aligned with ``rows``) or cleared. Raises ``CollectionModelError``
+    when the collection no longer uses the configured embedding model.
+    """
+    latest = {item_id: index for index, (item_id, *_rest) in enumerate(rows)}
+    model = get_settings().embedding_model
+    values = [
+        {
+            "collection": collection,
+            "id": item_id,
+            "content": content,
+            "metadata_": metadata,
+            "embedding": list(embedding),
+            "embedding_model": model,
+        }
+        for index, (item_id, content, metadata, embedding) in enumerate(rows)
+        if latest[item_id] == index
+    ]
+    if not values:
+        return
+    await lock_collection_model(session, collection)
+    stmt = insert(Item)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[Item.collection, Item.id],
+            set_={
+                "content": stmt.excluded.content,
+                "metadata": stmt.excluded.metadata,
+                "embedding": stmt.excluded.embedding,
+                "embedding_model": stmt.excluded.embedding_model,
+                "updated_at": func.clock_timestamp(),
+            },
+        ),
+        values,
+    )
 
-async def get_item(session: AsyncSession, item_id: UUID) -> Item | None:
-    result = await session.execute(select(Item).where(Item.id == item_id))
+    await session.execute(
+        delete(ItemChunk).where(
+            ItemChunk.collection == collection, ItemChunk.item_id.in_(list(latest))
+        )
+    )
+    if chunked is not None:
+        chunk_values = [
+            row
+            for index in latest.values()
+            for row in chunk_rows(collection, rows[index][0], chunked[index])
+        ]
+        if chunk_values:
+            await session.execute(insert(ItemChunk), chunk_values)
+
+    await session.commit()
+
+
+async def get_item(
+    session: AsyncSession, item_id: UUID, collection: str = DEFAULT_COLLECTION
+) -> Item | None:
+    result = await session.execute(
+        select(Item).where(Item.collection == collection, Item.id == item_id)
+    )
     return result.scalar_one_or_none()
 
 
+def _item_embedding() -> ColumnElement[Any]:
+    """``items.embedding`` cast to the served dimension, as the partitions index it."""
+    return cast(Item.embedding, Vector(EMBEDDING_DIM))
+
+
+def _compact_distance(query: list[float], mode: str) -> ColumnElement[Any]:
+    distance: ColumnElement[Any]
+    if mode == "half":
+        distance = cast(Item.embedding, HALFVEC(EMBEDDING_DIM)).cosine_distance(query)
+    else:
+        bits = "".join("1" if value > 0 else "0" for value in query)
+        distance = cast(func.binary_quantize(Item.embedding), BIT(EMBEDDING_DIM)).hamming_distance(
+            bits
+        )
+    return distance
+
+
+class SearchHit(NamedTuple):
+    """Projected search row; columns that were not requested come back as None."""
+
+    id: UUID
+    content: str | None
+    metadata: dict[str, Any] | None
+    embedding: Any | None
+
+
+def _hit_columns(fields: Collection[str], include_vectors: bool) -> list[ColumnElement[Any]]:
+    return [
+        Item.id.label("id"),
+        (Item.content if "content" in fields else null()).label("content"),
+        (Item.metadata_ if "metadata" in fields else null()).label("metadata"),
+        (Item.embedding if include_vectors else null()).label("embedding"),
+    ]
+
+
+def _item_conditions(
+    collection: str, filters: dict[str, Any] | None, text_filter: str | None
+) -> list[ColumnElement[bool]]:
+    # Inlined so the planner prunes to the collection's partition at plan time.
+    conditions = [Item.collection == literal(collection, literal_execute=True)]
+    conditions.extend(filter_conditions(filters))
+    if text_filter:
+        conditions.append(Item.content.ilike(f"%{text_filter}%"))
+    return conditions
+
+
+def _candidate_limit(top_k: int) -> int:
+    """Rows the ANN walk must produce for ``top_k`` results: compact index modes
+    oversample candidates for full-precision rescoring."""
+    settings = get_settings()
+    if settings.vector_index_mode in {"half", "binary"}:
+        return top_k * max(1, settings.vector_rescore_oversample)
+    return top_k
+
+
+def _nearest_items_stmt(
+    collection: str,
+    query_embedding: Iterable[float],
+    top_k: int,
+    filters: dict[str, Any] | None,
+    text_filter: str | None,
+    columns: list[ColumnElement[Any]],
+    exact: bool = False,
+) -> Select[Any]:
+    query = list(query_embedding)
+    conditions = [Item.embedding.isnot(None), *_item_conditions(collection, filters, text_filter)]
+
+    distance = _item_embedding().cosine_distance(query)
+    if exact:
+        # Pre-filter: the materialized CTE fences off the HNSW index, so every row
+        # matching the filter is scored and the top_k is exact.
+        filtered = (
+            select(Item.id, distance.label("distance"))
+            .where(*conditions)
+            .cte("filtered")
+            .prefix_with("MATERIALIZED")
+        )
+        return (
+            select(*columns, filtered.c.distance)
+            .join(filtered, filtered.c.id == Item.id)
+            .order_by(filtered.c.distance.asc())
+            .limit(top_k)
+        )
+
+    stmt = select(*columns, distance.label("distance")).where(*conditions)
+
+    settings = get_settings()
+    if settings.vector_index_mode in {"half", "binary"}:
+        # Walk the compact index for an oversampled candidate set, then rescore the
+        # candidates with exact full-precision distances.
+        candidates = (
+            select(Item.id)
+            .where(*conditions)
+            .order_by(_compact_distance(query, settings.vector_index_mode))
+            .limit(_candidate_limit(top_k))
+            .subquery("candidates")
+        )
+        stmt = stmt.join(candidates, candidates.c.id == Item.id)
+
+    return stmt.order_by(distance.asc()).limit(top_k)
+
+
+async def _prepare_ann_search(
+    session: AsyncSession,
+    collection: str,
+    top_k: int,
+    filters: dict[str, Any] | None,
+    accuracy: str | None,
+    iterative: bool = False,
+    full_precision: bool = False,
+) -> bool:
+    """Choose pre- or post-filtering for ``filters``; returns True for an exact scan.
+
+    Index scans get the ANN settings of the ``accuracy`` profile for the current
+    transaction; filtered ones also widen the search so ``top_k`` rows survive.
+    Unless the query walks the ``full_precision`` index, the walk is sized for the
+    oversampled candidate set of a compact ``VECTOR_INDEX_MODE``, since a plain HNSW
+    scan returns at most ``ef_search`` rows.
+    """
+    if filters:
+        conditions = [Item.embedding.isnot(None), *_item_conditions(collection, filters, None)]
+        if await plan_filter_strategy(session, filters, conditions, collection) == "exact":
+            return True
+    limit = top_k if full_precision else _candidate_limit(top_k)
+    iterative = iterative or bool(filters) or limit > MAX_EF_SEARCH
+    await apply_ann_settings(session, accuracy, limit, iterative)
+    return False
+
+
+async def hydrate_hits(
+    session: AsyncSession,
+    hits: list[tuple[UUID, float]],
+    fields: Collection[str],
+    include_vectors: bool,
+    collection: str = DEFAULT_COLLECTION,
+) -> list[tuple[SearchHit, float]]:
+    """Load the requested columns for ids ranked elsewhere, keeping their order.
+
+    Ids no longer present in ``collection`` are dropped; with nothing to load, no
+    query runs.
+    """
+    if not hits or (not fields and not include_vectors):
+        return [(SearchHit(item_id, None, None, None), score) for item_id, score in hits]
+    result = await session.execute(
+        select(*_hit_columns(fields, include_vectors)).where(
+            *_item_conditions(collection, None, None),
+            Item.id.in_([item_id for item_id, _ in hits]),
+        )
+    )
+    rows = {row[0]: SearchHit(*row) for row in result.all()}
+    return [(rows[item_id], score) for item_id, score in hits if item_id in rows]
+
+
+async def _latest_item_update(session: AsyncSession) -> datetime | None:
+    # Served by the default partition's updated_at index (migration 0010).
+    latest: datetime | None = await session.scalar(
+        select(func.max(Item.updated_at)).where(*_item_conditions(DEFAULT_COLLECTION, None, None))
+    )
+    return latest
+
+
 async def vector_search(
     session: AsyncSession,
     query_embedding: Iterable[float],
     top_k: int,
     filters: dict[str, Any] | None,
-) -> list[tuple[Item, float]]:
-    distance = Item.embedding.op("<=>")(list(query_embedding))
-    stmt = select(Item, distance.label("distance")).where(Item.embedding.isnot(None))
+    fields: Collection[str] = SEARCH_FIELDS,
+    include_vectors: bool = False,
+    accuracy: str | None = None,
+    exact: bool = False,
+    collection: str = DEFAULT_COLLECTION,
+    text_filter: str | None = None,
+) -> list[tuple[SearchHit, float]]:
+    """Nearest items of ``collection`` by cosine similarity, optionally restricted to
+    items whose content contains ``text_filter`` (case-insensitive).
 
-    if filters:
-        stmt = stmt.where(Item.metadata_.contains(filters))
+    Unfiltered searches of the default collection are served from the hot index when
+    it is ready, or with ``exact`` from the vector snapshot when one is configured
+    and no item changed since its export. Everything else is answered by Postgres
+    from the collection's partition, where ``exact`` bypasses the ANN indexes.
+    """
+    query = list(query_embedding)
+    in_memory = not filters and not text_filter and collection == DEFAULT_COLLECTION
+    snapshot = get_snapshot() if in_memory and exact else None
+    if snapshot is not None and snapshot.is_current(await _latest_item_update(session)):
+        block_rows = get_settings().snapshot_block_rows
+        hits = await run_in_threadpool(snapshot.search, query, top_k, block_rows)
+        VECTOR_SEARCHES.labels(source="snapshot").inc()
+        return await hydrate_hits(session, hits, fields, include_vectors)
+    if in_memory and not exact and (hot_index := get_hot_index()) is not None:
+        ef_search = ACCURACY_PROFILES[resolve_profile(accuracy)].ef_search
+        hot_hits = await run_in_threadpool(hot_index.search, query, top_k, ef_search)
+        if hot_hits is not None:
+            VECTOR_SEARCHES.labels(source="hot_index").inc()
+            return await hydrate_hits(session, hot_hits, fields, include_vectors)
+    VECTOR_SEARCHES.labels(source="postgres").inc()
 
-    stmt = stmt.order_by(distance.asc()).limit(top_k)
-    result = await session.execute(stmt)
-    rows = result.all()
+    columns = _hit_columns(fields, include_vectors)
+    exact = exact or await _prepare_ann_search(
+        session, collection, top_k, filters, accuracy, iterative=bool(text_filter)
+    )
+    result = await session.execute(
+        _nearest_items_stmt(collection, query, top_k, filters, text_filter, columns, exact)
+    )
+    # Relaxed-order iterative scans may return rows slightly out of distance order.
+    rows = sorted(result.all(), key=lambda row: float(row[4]))
+    return [(SearchHit(*row[:4]), 1.0 - float(row[4])) for row in rows]
+
+
+async def deep_vector_search(
+    session: AsyncSession,
+    query_embedding: Iterable[float],
+    limit: int,
+    filters: dict[str, Any] | None,
+    accuracy: str | None = None,
+    collection: str = DEFAULT_COLLECTION,
+) -> list[tuple[UUID, float]]:
+    """Rank up to ``limit`` item ids in one query, far deeper than a single HNSW walk.
+
+    Iterative index scans keep extending the walk until ``limit`` rows are produced or
+    the scan budget runs out. Only ids and scores are returned; load rows page by
+    page with ``hydrate_hits``.
+    """
+    query = list(query_embedding)
+    exact = await _prepare_ann_search(session, collection, limit, filters, accuracy, iterative=True)
+    result = await session.execute(
+        _nearest_items_stmt(collection, query, limit, filters, None, [Item.id.label("id")], exact)
+    )
+    rows = sorted(result.all(), key=lambda row: float(row[1]))
     return [(row[0], 1.0 - float(row[1])) for row in rows]
 
 
+async def batch_vector_search(
+    session: AsyncSession,
+    query_embeddings: Sequence[Iterable[float]],
+    top_k: int,
+    filters: dict[str, Any] | None,
+    fields: Collection[str] = SEARCH_FIELDS,
+    include_vectors: bool = False,
+    accuracy: str | None = None,
+    collection: str = DEFAULT_COLLECTION,
+) -> list[list[tuple[SearchHit, float]]]:
+    """Nearest items for several query vectors in one statement.
+
+    The query vectors form a VALUES list and a LATERAL subquery runs the
+    ``ORDER BY distance LIMIT top_k`` lookup once per row, so each query still walks
+    the HNSW index while the whole batch costs a single round trip. Selective filters
+    are scanned exactly from a materialized CTE instead.
+    """
+    if not query_embeddings:
+        return []
+    queries = values(
+        column("ord", Integer), column("embedding", Vector(EMBEDDING_DIM)), name="queries"
+    ).data([(index, list(vector)) for index, vector in enumerate(query_embeddings)])
+    # VALUES parameters arrive untyped; the cast makes Postgres read them as vectors.
+    query = cast(queries.c.embedding, Vector(EMBEDDING_DIM))
+
+    conditions = [Item.embedding.isnot(None), *_item_conditions(collection, filters, None)]
+    if await _prepare_ann_search(
+        session, collection, top_k, filters, accuracy, full_precision=True
+    ):
+        filtered = (
+            select(Item.id, _item_embedding().label("embedding"))
+            .where(*conditions)
+            .cte("filtered")
+            .prefix_with("MATERIALIZED")
+        )
+        distance = filtered.c.embedding.cosine_distance(query)
+        nearest = select(filtered.c.id, distance.label("distance"))
+    else:
+        distance = _item_embedding().cosine_distance(query)
+        nearest = select(Item.id, distance.label("distance")).where(*conditions)
+    lateral = nearest.correlate(queries).order_by(distance.asc()).limit(top_k).lateral("nearest")
+
+    stmt = (
+        select(queries.c.ord, *_hit_columns(fields, include_vectors), lateral.c.distance)
+        .select_from(queries)
+        .join(lateral, true())
+        .join(Item, Item.id == lateral.c.id)
+        .where(*_item_conditions(collection, None, None))
+        .order_by(queries.c.ord, lateral.c.distance)
+    )
+    result = await session.execute(stmt)
+    grouped: list[list[tuple[SearchHit, float]]] = [[] for _ in query_embeddings]
+    for row in result.all():
+        grouped[row[0]].append((SearchHit(*row[1:5]), 1.0 - float(row[5])))
+    return grouped
+
+
 async def hybrid_search(
     session: AsyncSession,
     query_embedding: Iterable[float],
     top_k: int,
     filters: dict[str, Any] | None,
-    text_filter: str | None,
-) -> list[tuple[Item, float]]:
-    distance = Item.embedding.op("<=>")(list(query_embedding))
-    stmt = select(Item, distance.label("distance")).where(Item.embedding.isnot(None))
+    text_query: str,
+    fields: Collection[str] = SEARCH_FIELDS,
+    include_vectors: bool = False,
+    accuracy: str | None = None,
+    collection: str = DEFAULT_COLLECTION,
+    text_filter: str | None = None,
+) -> list[tuple[SearchHit, float]]:
+    """Fuse an ANN leg and a full-text leg for ``text_query`` with weighted reciprocal
+    rank fusion.
 
-    if filters:
-        stmt = stmt.where(Item.metadata_.contains(filters))
-    if text_filter:
-        stmt = stmt.where(Item.content.ilike(f"%{text_filter}%"))
+    Both legs and the fusion run as one statement, so the planner can use the HNSW
+    and GIN indexes side by side. ``text_filter`` restricts both legs to items whose
+    content contains it. Scores are RRF scores, not cosine similarities.
+    """
+    settings = get_settings()
+    candidates = max(top_k, settings.hybrid_candidates)
+    exact = await _prepare_ann_search(
+        session, collection, candidates, filters, accuracy, iterative=bool(text_filter)
+    )
+
+    ann = _nearest_items_stmt(
+        collection, query_embedding, candidates, filters, text_filter, [Item.id.label("id")], exact
+    ).subquery("ann")
+    ann_ranked = select(
+        ann.c.id, func.row_number().over(order_by=ann.c.distance.asc()).label("rank")
+    ).subquery("ann_ranked")
+
+    tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, text_query)
+    text_rank = func.ts_rank_cd(Item.content_tsv, tsquery)
+    lexical = (
+        select(Item.id, text_rank.label("text_rank"))
+        .where(
+            Item.content_tsv.op("@@")(tsquery),
+            *_item_conditions(collection, filters, text_filter),
+        )
+        .order_by(text_rank.desc())
+        .limit(candidates)
+        .subquery("lexical")
+    )
+    lexical_ranked = select(
+        lexical.c.id, func.row_number().over(order_by=lexical.c.text_rank.desc()).label("rank")
+    ).subquery("lexical_ranked")
 
-    stmt = stmt.order_by(distance.asc()).limit(top_k)
+    k = max(0, settings.hybrid_rrf_k)
+    fused = (
+        select(
+            func.coalesce(ann_ranked.c.id, lexical_ranked.c.id).label("id"),
+            (
+                func.coalesce(settings.hybrid_vector_weight / (k + ann_ranked.c.rank), 0.0)
+                + func.coalesce(settings.hybrid_text_weight / (k + lexical_ranked.c.rank), 0.0)
+            ).label("score"),
+        )
+        .select_from(
+            ann_ranked.join(lexical_ranked, ann_ranked.c.id == lexical_ranked.c.id, full=True)
+        )
+        .subquery("fused")
+    )
+    stmt = (
+        select(*_hit_columns(fields, include_vectors), fused.c.score)
+        .join(fused, fused.c.id == Item.id)
+        .where(*_item_conditions(collection, None, None))
+        .order_by(fused.c.score.desc())
+        .limit(top_k)
+    )
     result = await session.execute(stmt)
-    rows = result.all()
-    return [(row[0], 1.0 - float(row[1])) for row in rows]
+    return [(SearchHit(*row[:4]), float(row[4])) for row in result.all()]
+
+
+async def chunk_search(
+    session: AsyncSession,
+    query_embedding: Iterable[float],
+    top_k: int,
+    filters: dict[str, Any] | None,
+    text_filter: str | None = None,
+    fields: Collection[str] = SEARCH_FIELDS,
+    include_vectors: bool = False,
+    accuracy: str | None = None,
+    collection: str = DEFAULT_COLLECTION,
+) -> list[tuple[SearchHit, float]]:
+    """Search item chunks and rank their parent items by max or summed chunk similarity.
+
+    Chunks of every collection share one index, so searches outside the default
+    collection filter it with iterative scans.
+    """
+    settings = get_settings()
+    limit = top_k * max(1, settings.chunk_search_oversample)
+    iterative = bool(filters or text_filter) or collection != DEFAULT_COLLECTION
+    await apply_ann_settings(session, accuracy, limit, iterative)
+    distance = ItemChunk.embedding.cosine_distance(list(query_embedding))
+    hits = (
+        select(ItemChunk.item_id, (1.0 - distance).label("score"))
+        .join(Item, (Item.collection == ItemChunk.collection) & (Item.id == ItemChunk.item_id))
+        .where(
+            ItemChunk.collection == literal(collection, literal_execute=True),
+            *_item_conditions(collection, filters, text_filter),
+        )
+        .order_by(distance.asc())
+        .limit(limit)
+        .subquery("chunk_hits")
+    )
+    aggregate = func.sum if settings.chunk_aggregation == "sum" else func.max
+    score = aggregate(hits.c.score).label("score")
+    stmt = (
+        select(*_hit_columns(fields, include_vectors), score)
+        .join(hits, hits.c.item_id == Item.id)
+        .where(*_item_conditions(collection, None, None))
+        .group_by(Item.collection, Item.id)
+        .order_by(score.desc())
+        .limit(top_k)
+    )
+    result = await session.execute(stmt)
+    return [(SearchHit(*row[:4]), float(row[4])) for row in result.all()]
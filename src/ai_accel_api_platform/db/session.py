@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import itertools
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
+import structlog
 from redis import Redis
 from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy import text
@@ -15,26 +19,112 @@ from sqlalchemy.ext.asyncio import (
 
 from ai_accel_api_platform.settings import get_settings
 
+logger = structlog.get_logger(__name__)
+
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_replicas: list[_Replica] | None = None
+_replica_turn = itertools.count()
 _redis: AsyncRedis[str] | None = None
 _redis_sync: Redis[str] | None = None
+_redis_sync_raw: Redis[bytes] | None = None
+
+
+# Zero when the replica is streaming from the primary and has replayed everything it
+# received (including from an idle primary). Otherwise the age of the last replayed
+# transaction, so a replica cut off from the primary ages instead of reporting zero.
+# Reading the receiver status needs pg_read_all_stats (pg_monitor); without it the
+# age is always used. NULL when nothing was replayed yet.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    settings = get_settings()
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=True,
+    )
 
 
 def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
-        settings = get_settings()
-        _engine = create_async_engine(
-            settings.database_url,
-            pool_size=settings.db_pool_size,
-            max_overflow=settings.db_max_overflow,
-            pool_timeout=settings.db_pool_timeout,
-            pool_pre_ping=True,
-        )
+        _engine = _create_engine(get_settings().database_url)
     return _engine
 
 
+@dataclass
+class _Replica:
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker[AsyncSession]
+    lag_seconds: float | None = None
+    checked_at: float = float("-inf")
+
+
+def _get_replicas() -> list[_Replica]:
+    global _replicas
+    if _replicas is None:
+        _replicas = []
+        for url in get_settings().database_replica_urls:
+            engine = _create_engine(url)
+            _replicas.append(_Replica(engine, async_sessionmaker(engine, expire_on_commit=False)))
+    return _replicas
+
+
+async def replica_lag(replica: _Replica) -> float | None:
+    """Replay lag of ``replica`` in seconds, or ``None`` when it is unreachable.
+
+    Measurements are reused for ``REPLICA_LAG_CHECK_INTERVAL_SECONDS``.
+    """
+    now = time.monotonic()
+    if now - replica.checked_at < get_settings().replica_lag_check_interval_seconds:
+        return replica.lag_seconds
+    try:
+        async with replica.engine.connect() as conn:
+            lag = await conn.scalar(REPLICA_LAG_SQL)
+        replica.lag_seconds = float("inf") if lag is None else float(lag)
+    except Exception as exc:
+        logger.warning("replica_lag_check_failed", error=str(exc))
+        replica.lag_seconds = None
+    replica.checked_at = now
+    return replica.lag_seconds
+
+
+async def get_read_sessionmaker(
+    max_lag_seconds: float | None = None,
+) -> tuple[async_sessionmaker[AsyncSession], str]:
+    """A replica within ``max_lag_seconds`` of the primary, else the primary.
+
+    Returns the sessionmaker and ``"replica"`` or ``"primary"``. Replicas are tried
+    round-robin; the bound defaults to ``REPLICA_MAX_LAG_SECONDS``.
+    """
+    replicas = _get_replicas()
+    if max_lag_seconds is None:
+        max_lag_seconds = get_settings().replica_max_lag_seconds
+    start = next(_replica_turn)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        lag = await replica_lag(replica)
+        if lag is not None and lag <= max_lag_seconds:
+            return replica.sessionmaker, "replica"
+    return get_sessionmaker(), "primary"
+
+
+async def dispose_replicas() -> None:
+    global _replicas
+    for replica in _replicas or []:
+        await replica.engine.dispose()
+    _replicas = None
+
+
 def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     global _sessionmaker
     if _sessionmaker is None:
@@ -51,6 +141,17 @@ async def get_session() -> AsyncIterator[AsyncSession]:
         await session.close()
 
 
+@asynccontextmanager
+async def get_read_session(max_lag_seconds: float | None = None) -> AsyncIterator[AsyncSession]:
+    """Session for read-only work, on a sufficiently fresh replica when one is configured."""
+    sessionmaker, _ = await get_read_sessionmaker(max_lag_seconds)
+    session = sessionmaker()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
 async def db_ping() -> bool:
     try:
         async with get_engine().connect() as conn:
@@ -74,3 +175,11 @@ def get_sync_redis() -> Redis[str]:
         settings = get_settings()
         _redis_sync = Redis.from_url(settings.redis_url, decode_responses=True)
     return _redis_sync
+
+
+def get_sync_redis_raw() -> Redis[bytes]:
+    global _redis_sync_raw
+    if _redis_sync_raw is None:
+        settings = get_settings()
+        _redis_sync_raw = Redis.from_url(settings.redis_url)
+    return _redis_sync_raw
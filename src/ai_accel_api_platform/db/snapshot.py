@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import func, select
+
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION, Item
+from ai_accel_api_platform.db.session import get_engine, get_session
+from ai_accel_api_platform.logging import configure_logging
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_DTYPES = ("float32", "float16")
+
+_snapshot: VectorSnapshot | None = None
+_snapshot_mtime: float | None = None
+_snapshot_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class VectorSnapshot:
+    """Read-only, memory-mapped item vectors plus their ids.
+
+    Rows are L2-normalized at export time, so a dot product is the cosine
+    similarity. The arrays are ``np.load(..., mmap_mode="r")`` views: processes that
+    map the same files share the page cache and nothing is copied onto the heap.
+    """
+
+    vectors: np.ndarray
+    ids: np.ndarray
+    manifest: dict[str, Any]
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def max_updated_at(self) -> datetime | None:
+        """Newest ``items.updated_at`` of the default collection when it was exported."""
+        exported = self.manifest.get("max_updated_at")
+        return datetime.fromisoformat(exported) if exported else None
+
+    def is_current(self, latest_update: datetime | None) -> bool:
+        """Whether no default-collection item changed after the export, given the
+        collection's newest ``updated_at``. Snapshots exported without that
+        watermark are never current."""
+        if "max_updated_at" not in self.manifest:
+            return False
+        if latest_update is None:
+            return True
+        return self.max_updated_at is not None and latest_update <= self.max_updated_at
+
+    def search(
+        self, query: Iterable[float], top_k: int, block_rows: int
+    ) -> list[tuple[UUID, float]]:
+        """Exact top-k by cosine similarity, scanning ``block_rows`` rows at a time."""
+        vector = np.asarray(list(query), dtype=np.float32)
+        vector /= float(np.linalg.norm(vector)) + 1e-12
+        top_k = min(top_k, len(self))
+        if top_k <= 0:
+            return []
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        block_rows = max(top_k, block_rows)
+        for start in range(0, len(self), block_rows):
+            block = np.asarray(self.vectors[start : start + block_rows], dtype=np.float32)
+            scores = block @ vector
+            if len(scores) > top_k:
+                keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                keep = np.arange(len(scores))
+            best_rows = np.concatenate([best_rows, keep + start])
+            best_scores = np.concatenate([best_scores, scores[keep]])
+            if len(best_scores) > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1)[:top_k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores, kind="stable")
+        return [
+            (UUID(bytes=bytes(self.ids[row])), float(score))
+            for row, score in zip(best_rows[order], best_scores[order], strict=True)
+        ]
+
+
+def load_snapshot(path: str | Path) -> VectorSnapshot:
+    directory = Path(path)
+    manifest = json.loads((directory / MANIFEST_FILE).read_text())
+    vectors = np.load(directory / VECTORS_FILE, mmap_mode="r")
+    ids = np.load(directory / IDS_FILE, mmap_mode="r")
+    if vectors.shape != (manifest["count"], manifest["dim"]) or len(ids) != manifest["count"]:
+        raise ValueError("snapshot_incomplete")
+    # A snapshot exported before a re-embedding cutover holds the old model's vectors.
+    if manifest.get("model", get_settings().embedding_model) != get_settings().embedding_model:
+        raise ValueError("snapshot_model_mismatch")
+    return VectorSnapshot(vectors=vectors, ids=ids, manifest=manifest)
+
+
+def get_snapshot() -> VectorSnapshot | None:
+    """The snapshot at ``SNAPSHOT_PATH``, reloaded when a new export replaces it."""
+    global _snapshot, _snapshot_mtime
+    path = get_settings().snapshot_path
+    if not path:
+        return None
+    try:
+        mtime = (Path(path) / MANIFEST_FILE).stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if mtime != _snapshot_mtime:
+        with _snapshot_lock:
+            if mtime != _snapshot_mtime:
+                try:
+                    _snapshot = load_snapshot(path)
+                    _snapshot_mtime = mtime
+                    logger.info("snapshot_loaded", path=path, items=len(_snapshot))
+                except (OSError, ValueError) as exc:
+                    # Files are mid-replacement; keep serving the previous mapping.
+                    logger.warning("snapshot_load_failed", path=path, error=str(exc))
+    return _snapshot
+
+
+def recall_at_k(approximate: Sequence[UUID], exact: Sequence[UUID]) -> float:
+    """Share of the exact top-k ids that an approximate search also returned."""
+    if not exact:
+        return 1.0
+    return len(set(approximate) & set(exact)) / len(exact)
+
+
+def _replace(tmp: Path, target: Path) -> None:
+    with open(tmp, "rb") as handle:
+        os.fsync(handle.fileno())
+    os.replace(tmp, target)
+
+
+async def export_snapshot(path: str | Path, dtype: str = "float32") -> int:
+    """Write every default-collection embedding to ``path``; returns the number exported.
+
+    The export reads one repeatable-read snapshot of ``items``. Each file is written
+    next to its target and renamed into place, with the manifest last, so readers
+    never map a partially written array.
+    """
+    if dtype not in SNAPSHOT_DTYPES:
+        raise ValueError(f"unsupported_snapshot_dtype: {dtype}")
+    settings = get_settings()
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    vectors_tmp = directory / f"{VECTORS_FILE}.tmp"
+    ids_tmp = directory / f"{IDS_FILE}.tmp"
+    manifest_tmp = directory / f"{MANIFEST_FILE}.tmp"
+
+    conditions = [Item.collection == DEFAULT_COLLECTION, Item.embedding.isnot(None)]
+    async with get_session() as session:
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        # Searches compare this watermark with the live table to detect a stale export.
+        max_updated_at = await session.scalar(
+            select(func.max(Item.updated_at)).where(Item.collection == DEFAULT_COLLECTION)
+        )
+        count = int(
+            await session.scalar(select(func.count()).select_from(Item).where(*conditions)) or 0
+        )
+        # open_memmap pads the .npy header to 64 bytes, so rows start aligned.
+        vectors = np.lib.format.open_memmap(
+            vectors_tmp, mode="w+", dtype=dtype, shape=(count, settings.embedding_dim)
+        )
+        ids = np.lib.format.open_memmap(ids_tmp, mode="w+", dtype=np.uint8, shape=(count, 16))
+        stmt = (
+            select(Item.id, Item.embedding)
+            .where(*conditions)
+            .order_by(Item.id)
+            .execution_options(yield_per=settings.snapshot_export_batch_size)
+        )
+        offset = 0
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            block = np.asarray([row[1] for row in partition], dtype=np.float32)
+            block /= np.linalg.norm(block, axis=1, keepdims=True) + 1e-12
+            vectors[offset : offset + len(block)] = block
+            ids[offset : offset + len(block)] = [
+                np.frombuffer(row[0].bytes, dtype=np.uint8) for row in partition
+            ]
+            offset += len(block)
+
+    vectors.flush()
+    ids.flush()
+    del vectors, ids
+    manifest = {
+        "count": count,
+        "dim": settings.embedding_dim,
+        "dtype": dtype,
+        "model": settings.embedding_model,
+        "created_at": datetime.now(UTC).isoformat(),
+        "max_updated_at": max_updated_at.isoformat() if max_updated_at else None,
+    }
+    manifest_tmp.write_text(json.dumps(manifest))
+    _replace(vectors_tmp, directory / VECTORS_FILE)
+    _replace(ids_tmp, directory / IDS_FILE)
+    _replace(manifest_tmp, directory / MANIFEST_FILE)
+    logger.info("snapshot_exported", path=str(directory), items=count, dtype=dtype)
+    return count
+
+
+async def _export(path: str, dtype: str) -> None:
+    try:
+        await export_snapshot(path, dtype)
+    finally:
+        await get_engine().dispose()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export item embeddings to a vector snapshot.")
+    parser.add_argument("path", nargs="?", default=settings.snapshot_path)
+    parser.add_argument("--dtype", choices=SNAPSHOT_DTYPES, default=settings.snapshot_dtype)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("path is required when SNAPSHOT_PATH is not set")
+    configure_logging()
+    asyncio.run(_export(args.path, args.dtype))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ def build_search_cache_key(
     top_k: int,
     filters: dict[str, Any] | None,
     text_filter: str | None,
+    options: dict[str, Any] | None = None,
 ) -> str:
     normalized_filters = normalize_filters(filters)
     parts = [
@@ -23,6 +24,7 @@ def build_search_cache_key(
         str(top_k),
         json_dumps(normalized_filters),
         (text_filter or "").strip().lower(),
+        json_dumps(normalize_filters(options)),
     ]
     return cache_key("search", parts)
 
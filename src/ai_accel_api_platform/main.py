@@ -4,14 +4,16 @@ import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from ai_accel_api_platform.ai.warmup import start_warmup
 from ai_accel_api_platform.api.middleware import (
     RateLimitMiddleware,
     RequestIDMiddleware,
     TimeoutMiddleware,
 )
 from ai_accel_api_platform.api.v1 import router as v1_router
+from ai_accel_api_platform.db.hot_index import start_hot_index_sync
 from ai_accel_api_platform.db.repositories import ensure_default_user
-from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.db.session import dispose_replicas, get_engine, get_session
 from ai_accel_api_platform.grpc_server import start_grpc_server
 from ai_accel_api_platform.logging import configure_logging
 from ai_accel_api_platform.settings import get_settings
@@ -53,6 +55,8 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     async def startup() -> None:
+        start_warmup()
+        start_hot_index_sync()
         try:
             async with get_session() as session:
                 await ensure_default_user(
@@ -67,6 +71,11 @@ def create_app() -> FastAPI:
         if settings.enable_grpc:
             start_grpc_server()
 
+    @app.on_event("shutdown")
+    async def shutdown() -> None:
+        await dispose_replicas()
+        await get_engine().dispose()
+
     return app
 
 
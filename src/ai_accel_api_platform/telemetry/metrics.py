@@ -5,7 +5,7 @@ from collections.abc import Awaitable, Callable
 
 from fastapi import APIRouter, Request
 from fastapi.responses import Response
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 from starlette.middleware.base import BaseHTTPMiddleware
 
 REQUEST_COUNT = Counter(
@@ -18,6 +18,50 @@ REQUEST_LATENCY = Histogram(
     "Request latency in seconds",
     ["method", "path"],
 )
+CACHE_REQUESTS = Counter(
+    "vector_cache_requests_total",
+    "Vector cache lookups by cache and result (l1_hit, l2_hit, miss)",
+    ["cache", "result"],
+)
+EMBED_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Number of texts encoded per micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+EMBED_QUEUE_WAIT = Histogram(
+    "embedding_queue_wait_seconds",
+    "Time the oldest request in a micro-batch waited before encoding",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+EMBED_TOKENS = Counter(
+    "embedding_tokens_total",
+    "Tokens fed to the embedding model, real versus after padding",
+    ["kind"],
+)
+EMBED_PADDING_EFFICIENCY = Histogram(
+    "embedding_padding_efficiency",
+    "Share of real tokens among padded tokens per encode call",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+)
+RERANK_BATCH_SIZE = Histogram(
+    "rerank_batch_size",
+    "Number of (query, document) pairs scored per rerank micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+RERANK_LATENCY = Histogram(
+    "rerank_latency_seconds",
+    "Time spent reranking the candidates of one search",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HOT_INDEX_ITEMS = Gauge(
+    "hot_index_items",
+    "Vectors held by the in-process hot index",
+)
+VECTOR_SEARCHES = Counter(
+    "vector_searches_total",
+    "Vector searches by where they were served (hot_index, snapshot, postgres)",
+    ["source"],
+)
 
 router = APIRouter()
 
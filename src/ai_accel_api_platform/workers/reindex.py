@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+import structlog
+from redis import Redis
+from rq import Queue
+
+from ai_accel_api_platform.db.reindex import coverage, drop_shadow, finalize
+from ai_accel_api_platform.db.session import get_engine, get_redis, get_session
+from ai_accel_api_platform.db.vector import bump_cache_namespace
+from ai_accel_api_platform.logging import configure_logging
+from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.workers.tasks import enqueue_reindex
+
+logger = structlog.get_logger(__name__)
+
+
+async def _status(collection: str) -> None:
+    try:
+        async with get_session() as session:
+            items, pending = await coverage(session, collection)
+    finally:
+        await get_engine().dispose()
+    logger.info(
+        "reindex_status",
+        collection=collection,
+        model=get_settings().embedding_model,
+        items=items,
+        pending=pending,
+        coverage=1.0 if items == 0 else round((items - pending) / items, 4),
+    )
+
+
+async def _abort(collection: str) -> None:
+    try:
+        async with get_session() as session:
+            await drop_shadow(session, collection)
+    finally:
+        await get_engine().dispose()
+    logger.info("reindex_aborted", collection=collection)
+
+
+async def _cutover(collection: str) -> bool:
+    try:
+        done = await finalize(collection)
+    finally:
+        await get_engine().dispose()
+    if not done:
+        logger.error(
+            "reindex_cutover_gave_up",
+            collection=collection,
+            attempts=get_settings().reindex_cutover_attempts,
+        )
+        return False
+    try:
+        redis = get_redis()
+        await bump_cache_namespace(redis)
+    except Exception:
+        pass
+    logger.info("reindex_cutover_finished", collection=collection)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-embed a collection with this deployment's EMBEDDING_MODEL in the "
+        "background; --cutover swaps it in once every item is covered. A collection "
+        "already on this model only gets its missing embeddings filled in."
+    )
+    parser.add_argument("collection")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="log coverage and exit")
+    group.add_argument(
+        "--abort", action="store_true", help="drop the partially re-embedded shadow table"
+    )
+    group.add_argument(
+        "--cutover",
+        action="store_true",
+        help="catch up and swap the re-embedded table in; briefly blocks queries on "
+        "every collection",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.status:
+        asyncio.run(_status(args.collection))
+    elif args.abort:
+        asyncio.run(_abort(args.collection))
+    elif args.cutover:
+        if not asyncio.run(_cutover(args.collection)):
+            raise SystemExit(1)
+    else:
+        settings = get_settings()
+        queue = Queue(settings.reindex_queue, connection=Redis.from_url(settings.redis_url))
+        job = enqueue_reindex(queue, args.collection)
+        logger.info("reindex_enqueued", collection=args.collection, queue=queue.name, job=job.id)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from redis import Redis
 from rq import Worker
 
@@ -9,7 +11,8 @@ from ai_accel_api_platform.settings import get_settings
 def main() -> None:
     settings = get_settings()
     redis_conn = Redis.from_url(settings.redis_url)
-    worker = Worker(["default"], connection=redis_conn)
+    # Queues to listen on, e.g. ``reindex`` for a worker running a new EMBEDDING_MODEL.
+    worker = Worker(sys.argv[1:] or ["default"], connection=redis_conn)
     worker.work()
 
 
@@ -4,28 +4,48 @@ import asyncio
 from typing import Any
 from uuid import UUID
 
+import structlog
+from rq import Queue, get_current_job
+from rq.job import Job
+
+from ai_accel_api_platform.ai.chunking import embed_document
 from ai_accel_api_platform.ai.embeddings import embed_texts
+from ai_accel_api_platform.core.errors import CollectionModelError
+from ai_accel_api_platform.db.models import DEFAULT_COLLECTION
+from ai_accel_api_platform.db.reindex import reindex_step
 from ai_accel_api_platform.db.repositories import upsert_item_with_embedding
 from ai_accel_api_platform.db.session import get_redis, get_session
 from ai_accel_api_platform.db.vector import bump_cache_namespace
+from ai_accel_api_platform.settings import get_settings
+
+logger = structlog.get_logger(__name__)
 
 
 def compute_and_store_embedding(
     item_id: str,
     content: str,
     metadata: dict[str, Any] | None,
+    collection: str = DEFAULT_COLLECTION,
 ) -> str:
-    embedding = embed_texts([content])[0]
+    chunked = embed_document(content) if get_settings().chunking else None
+    embedding = chunked.embedding.tolist() if chunked else embed_texts([content])[0]
 
     async def _run() -> None:
         async with get_session() as session:
-            await upsert_item_with_embedding(
-                session,
-                UUID(item_id),
-                content,
-                metadata,
-                embedding,
-            )
+            try:
+                await upsert_item_with_embedding(
+                    session,
+                    UUID(item_id),
+                    content,
+                    metadata,
+                    embedding,
+                    chunked,
+                    collection=collection,
+                )
+            except CollectionModelError:
+                # The collection's new model fills the vector in with its backfill.
+                logger.warning("embedding_discarded", item_id=item_id, collection=collection)
+                return
         try:
             redis = get_redis()
             await bump_cache_namespace(redis)
@@ -34,3 +54,44 @@ def compute_and_store_embedding(
 
     asyncio.run(_run())
     return item_id
+
+
+def enqueue_reindex(queue: Queue, collection: str, after: str | None = None) -> Job:
+    # A job runs for REINDEX_JOB_SECONDS plus its last batch.
+    timeout = 2 * get_settings().reindex_job_seconds
+    return queue.enqueue(reindex_collection, collection, after, job_timeout=timeout)
+
+
+def reindex_collection(collection: str, after: str | None = None) -> dict[str, Any]:
+    """Re-embed ``collection`` for up to ``REINDEX_JOB_SECONDS``, then enqueue the rest.
+
+    Each job is short and resumes from the previous one's keyset cursor, so a worker
+    restart loses at most one batch and other jobs on the queue are not starved. The
+    last job leaves a fully covered shadow table for ``reindex --cutover`` to swap in.
+    """
+    progress = asyncio.run(reindex_step(collection, UUID(after) if after else None))
+
+    async def _bump() -> None:
+        try:
+            redis = get_redis()
+            await bump_cache_namespace(redis)
+        except Exception:
+            pass
+
+    # Backfilled vectors are visible at once; re-embedded ones only after the cutover.
+    if progress.backfill and progress.processed:
+        asyncio.run(_bump())
+    job = get_current_job()
+    if not progress.done and job is not None:
+        enqueue_reindex(
+            Queue(job.origin, connection=job.connection),
+            collection,
+            str(progress.after) if progress.after else None,
+        )
+    logger.info(
+        "reindex_job_finished",
+        collection=collection,
+        processed=progress.processed,
+        done=progress.done,
+    )
+    return {"processed": progress.processed, "done": progress.done}
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 
+from ai_accel_api_platform.db import collections
+from ai_accel_api_platform.db.session import get_engine
 from ai_accel_api_platform.main import create_app
 
 
@@ -10,3 +14,24 @@ from ai_accel_api_platform.main import create_app
 def client():
     app = create_app()
     return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def default_collection():
+    """Serve the default collection without looking it up in Postgres."""
+    settings = collections.get_settings()
+    collections.clear_collections()
+    collections._collections["default"] = (
+        float("inf"),
+        collections.CollectionInfo("default", settings.embedding_model, settings.embedding_dim),
+    )
+    yield
+    collections.clear_collections()
+
+
+@pytest.fixture(autouse=True)
+async def dispose_engine():
+    # Pooled connections are bound to the event loop of the test that opened them.
+    yield
+    if os.getenv("DATABASE_URL"):
+        await get_engine().dispose()
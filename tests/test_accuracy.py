@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from ai_accel_api_platform.db import accuracy
+from ai_accel_api_platform.settings import Settings
+
+
+def test_ann_settings_use_server_default_profile(monkeypatch):
+    monkeypatch.setattr(accuracy.get_settings(), "search_accuracy", "fast")
+
+    assert accuracy.ann_settings(None, 5, iterative=False) == {
+        "hnsw.ef_search": "40",
+        "ivfflat.probes": "1",
+    }
+
+
+def test_ann_settings_enable_iterative_scans_for_filters(monkeypatch):
+    settings = accuracy.get_settings()
+    monkeypatch.setattr(settings, "filter_ann_oversample", 10)
+    monkeypatch.setattr(settings, "ann_iterative_scan", "relaxed_order")
+
+    values = accuracy.ann_settings("accurate", 50, iterative=True)
+
+    assert values["hnsw.ef_search"] == "500"
+    assert values["hnsw.iterative_scan"] == "relaxed_order"
+    assert values["hnsw.max_scan_tuples"] == "100000"
+    assert values["ivfflat.iterative_scan"] == "relaxed_order"
+
+
+def test_ann_settings_cap_ef_search_and_allow_disabling_iterative_scans(monkeypatch):
+    monkeypatch.setattr(accuracy.get_settings(), "ann_iterative_scan", "off")
+
+    values = accuracy.ann_settings("balanced", 100, iterative=True)
+
+    assert values["hnsw.ef_search"] == str(accuracy.MAX_EF_SEARCH)
+    assert "hnsw.iterative_scan" not in values
+
+
+@pytest.mark.parametrize("env", [{"SEARCH_ACCURACY": "turbo"}, {"ANN_ITERATIVE_SCAN": "relaxed"}])
+def test_settings_reject_unknown_accuracy_config(env):
+    with pytest.raises(ValidationError):
+        Settings(**env)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from ai_accel_api_platform.ai import chunking
+from ai_accel_api_platform.settings import Settings
+
+
+class OffsetTokenizer:
+    """Splits words into two-character tokens and reports their offsets."""
+
+    def __call__(self, text, **kwargs):
+        offsets = []
+        for match in re.finditer(r"\S+", text):
+            for start in range(match.start(), match.end(), 2):
+                offsets.append((start, min(start + 2, match.end())))
+        return {"offset_mapping": offsets}
+
+
+def test_chunk_text_keeps_short_text_whole():
+    chunks = chunking.chunk_text("one two three", max_tokens=5, overlap_tokens=1)
+    assert [(chunk.index, chunk.text) for chunk in chunks] == [(0, "one two three")]
+
+
+def test_chunk_text_windows_overlap_on_token_offsets():
+    text = "aa bb  cc dd\nee ff"
+    chunks = chunking.chunk_text(text, max_tokens=3, overlap_tokens=1)
+
+    assert [chunk.text for chunk in chunks] == ["aa bb  cc", "cc dd\nee", "ee ff"]
+    assert all(text[chunk.start : chunk.end] == chunk.text for chunk in chunks)
+
+
+def test_chunk_text_uses_tokenizer_offsets():
+    chunks = chunking.chunk_text(
+        "abcdef gh", max_tokens=2, overlap_tokens=0, tokenizer=OffsetTokenizer()
+    )
+    assert [chunk.text for chunk in chunks] == ["abcd", "ef gh"]
+
+
+def test_embed_document_pools_chunk_vectors(monkeypatch):
+    settings = chunking.get_settings()
+    monkeypatch.setattr(settings, "chunk_max_tokens", 2)
+    monkeypatch.setattr(settings, "chunk_overlap_tokens", 0)
+    monkeypatch.setattr(chunking, "get_chunk_tokenizer", lambda: None)
+    calls = []
+
+    def fake_embed_array(texts):
+        calls.append(list(texts))
+        return np.asarray([[3.0, 0.0], [0.0, 4.0]], dtype=np.float32)[: len(texts)]
+
+    monkeypatch.setattr(chunking, "embed_array", fake_embed_array)
+
+    result = chunking.embed_document("a b c d")
+
+    assert calls == [["a b", "c d"]]
+    np.testing.assert_allclose(result.embedding, [0.6, 0.8], rtol=1e-6)
+
+
+def test_chunk_aggregation_is_validated():
+    with pytest.raises(ValidationError):
+        Settings(CHUNK_AGGREGATION="SUM")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from ai_accel_api_platform.api import deps
+from ai_accel_api_platform.api.deps import get_db_session, get_read_db_session
+from ai_accel_api_platform.api.v1 import routes_items
+from ai_accel_api_platform.core.errors import CollectionModelError
+from ai_accel_api_platform.db import collections
+from ai_accel_api_platform.db.cursors import SearchCursor
+from ai_accel_api_platform.db.repositories import bulk_upsert_items, get_item, vector_search
+from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.settings import get_settings
+
+
+def test_partition_statements_index_the_collection_dimension():
+    statements = collections.partition_statements("tenant_a", 768)
+
+    assert statements[0] == (
+        "CREATE TABLE items_tenant_a PARTITION OF items FOR VALUES IN ('tenant_a')"
+    )
+    assert "CHECK (vector_dims(embedding) = 768)" in statements[1]
+    assert any("((embedding::vector(768)) vector_cosine_ops)" in stmt for stmt in statements)
+
+
+def test_partition_statements_skip_indexes_past_pgvector_limits():
+    statements = collections.partition_statements("wide", 3072)
+
+    assert not any("vector_cosine_ops" in stmt for stmt in statements)
+    assert any("halfvec(3072)" in stmt for stmt in statements)
+
+
+@pytest.mark.parametrize("name", ["Tenant", "1st", "a-b", "x; drop table items", "a" * 29])
+def test_partition_name_rejects_unsafe_names(name):
+    with pytest.raises(ValueError):
+        collections.partition_name(name)
+
+
+def test_collection_is_served_only_with_matching_model():
+    settings = get_settings()
+
+    assert collections.CollectionInfo("a", settings.embedding_model, settings.embedding_dim).served
+    assert not collections.CollectionInfo("b", "other-model", settings.embedding_dim).served
+
+
+def test_cursor_round_trips_collection():
+    cursor = SearchCursor([uuid4()], [0.5], ["content"], False, "float", collection="tenant_a")
+
+    assert SearchCursor.loads(cursor.dumps()).collection == "tenant_a"
+
+
+def test_search_rejects_unknown_and_unserved_collections(client, monkeypatch):
+    collections._collections["other"] = (
+        float("inf"),
+        collections.CollectionInfo("other", "other-model", 1024),
+    )
+
+    async def cached_only(session, name):
+        cached = collections._collections.get(name)
+        return cached and cached[1]
+
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr(deps, "get_collection", cached_only)
+    client.app.dependency_overrides[get_read_db_session] = fake_session
+
+    def search(collection):
+        return client.post("/v1/search", json={"query": "q", "collection": collection})
+
+    assert search("nope").status_code == 404
+    assert search("other").status_code == 409
+    assert search("Bad!").status_code == 422
+
+
+def test_item_write_after_model_cutover_returns_409(client, monkeypatch):
+    async def fake_session():
+        yield None
+
+    async def moved(*args, **kwargs):
+        raise CollectionModelError("default")
+
+    monkeypatch.setattr(routes_items, "upsert_item_with_embedding", moved)
+    client.app.dependency_overrides[get_db_session] = fake_session
+
+    response = client.post("/v1/items", json={"content": "doc", "async_embedding": True})
+
+    assert response.status_code == 409
+
+
+@pytest.mark.integration
+async def test_collections_are_isolated_partitions():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    settings = get_settings()
+    name = f"test_{uuid4().hex[:8]}"
+    item_id = uuid4()
+    embedding = [0.3] * settings.embedding_dim
+    try:
+        async with get_session() as session:
+            await collections.create_collection(
+                session, name, settings.embedding_model, settings.embedding_dim
+            )
+        async with get_session() as session:
+            # The same id may exist in several collections.
+            rows = [(item_id, "tenant doc", {"source": "test"}, embedding)]
+            await bulk_upsert_items(session, rows, None, name)
+            await bulk_upsert_items(session, rows, None)
+
+            tenant_hits = await vector_search(session, embedding, 5, None, collection=name)
+            assert [hit.id for hit, _ in tenant_hits] == [item_id]
+            stored = await get_item(session, item_id, name)
+            assert stored is not None and stored.collection == name
+    finally:
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM items WHERE id = :id"), {"id": item_id})
+            await session.execute(text(f"ALTER TABLE items DETACH PARTITION items_{name}"))
+            await session.execute(text(f"DROP TABLE IF EXISTS items_{name}"))
+            await session.execute(text("DELETE FROM collections WHERE name = :n"), {"n": name})
+            await session.commit()
+        collections.clear_collections()
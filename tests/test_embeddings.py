@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+
 import numpy as np
+import pytest
 
 from ai_accel_api_platform.ai import embeddings
+from ai_accel_api_platform.ai.cache import VectorCache
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    cache = VectorCache("embedding", max_entries=100, ttl_seconds=60)
+    monkeypatch.setattr(embeddings, "_cache", cache)
+    return cache
 
 
 class DummyModel:
@@ -20,3 +31,103 @@ def test_embed_texts_uses_dummy(monkeypatch):
     results = embeddings.embed_texts(["hello", "world"])
     assert len(results) == 2
     assert results[0] == [1.0, 1.0, 1.0]
+
+
+async def test_embed_texts_async_coalesces_concurrent_calls(monkeypatch):
+    calls = []
+
+    class CountingModel(DummyModel):
+        def encode(self, texts, **kwargs):
+            calls.append(list(texts))
+            return np.arange(len(texts), dtype=np.float32).reshape(-1, 1)
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", CountingModel)
+    embeddings._embedder = None
+    embeddings._batcher = None
+
+    results = await asyncio.gather(
+        embeddings.embed_texts_async(["a"]),
+        embeddings.embed_texts_async(["b", "c"]),
+        embeddings.embed_texts_async(["d"]),
+    )
+
+    assert calls == [["a", "b", "c", "d"]]
+    assert results == [[[0.0]], [[1.0], [2.0]], [[3.0]]]
+
+
+def test_embed_texts_dedupes_and_caches(monkeypatch, local_cache):
+    calls = []
+
+    class CountingModel(DummyModel):
+        def encode(self, texts, **kwargs):
+            calls.append(list(texts))
+            return np.full((len(texts), 2), len(calls), dtype=np.float32)
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", CountingModel)
+    embeddings._embedder = None
+
+    first = embeddings.embed_texts(["x", "y", "x"])
+    second = embeddings.embed_texts(["y", "z"])
+
+    assert calls == [["x", "y"], ["z"]]
+    assert first == [[1.0, 1.0], [1.0, 1.0], [1.0, 1.0]]
+    assert second == [[1.0, 1.0], [2.0, 2.0]]
+    assert len(local_cache) == 3
+
+
+def test_embedding_cache_keys_separate_backends(monkeypatch):
+    settings = embeddings.get_settings()
+    keys = set()
+    for backend, onnx_quantize in [("torch", False), ("onnx", False), ("onnx", True)]:
+        monkeypatch.setattr(settings, "embed_backend", backend)
+        monkeypatch.setattr(settings, "embed_onnx_quantize", onnx_quantize)
+        keys.add(embeddings.embedding_cache_key("m", embeddings.embedding_variant(), True, "x"))
+
+    assert len(keys) == 3
+
+
+def test_vector_cache_evicts_least_recently_used():
+    cache = VectorCache("test", max_entries=2, ttl_seconds=60)
+    cache.set_many({"a": np.array([1.0]), "b": np.array([2.0])})
+    cache.get_many(["a"])
+    cache.set_many({"c": np.array([3.0])})
+
+    hits = cache.get_many(["a", "b", "c"])
+    assert [hit is not None for hit in hits] == [True, False, True]
+
+
+def test_plan_length_buckets_respects_token_budget():
+    lengths = [10, 500, 12, 480, 8]
+    buckets = embeddings.plan_length_buckets(lengths, token_budget=1024, max_batch_size=32)
+
+    assert buckets == [[1, 3], [2, 0, 4]]
+    for bucket in buckets:
+        assert max(lengths[i] for i in bucket) * len(bucket) <= 1024
+
+
+def test_encode_local_restores_input_order(monkeypatch):
+    batches = []
+
+    class WordTokenizer:
+        model_max_length = 512
+
+        def __call__(self, texts, **kwargs):
+            return {"input_ids": [text.split() for text in texts]}
+
+    class TokenizedModel(DummyModel):
+        tokenizer = WordTokenizer()
+        max_seq_length = 512
+
+        def encode(self, texts, **kwargs):
+            batches.append(list(texts))
+            return np.array([[len(text.split())] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", TokenizedModel)
+    monkeypatch.setattr(embeddings.get_settings(), "embed_token_budget", 8)
+    embeddings._embedder = None
+
+    texts = ["a", "a b c d e f", "a b", "a b c d e"]
+    result = embeddings.encode_local(texts)
+
+    assert result[:, 0].tolist() == [1.0, 6.0, 2.0, 5.0]
+    assert batches == [["a b c d e f"], ["a b c d e"], ["a b", "a"]]
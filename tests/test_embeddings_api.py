@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import base64
+import io
+import json
+
+import numpy as np
+
+from ai_accel_api_platform.api.v1 import routes_embeddings
+
+
+def fake_embed_array(texts):
+    return np.array([[float(len(text)), 0.5] for text in texts], dtype=np.float32)
+
+
+def test_embeddings_stream_ndjson(client, monkeypatch):
+    monkeypatch.setattr(routes_embeddings, "embed_array", fake_embed_array)
+    monkeypatch.setattr(routes_embeddings.get_settings(), "embed_stream_chunk_size", 2)
+
+    response = client.post("/v1/embeddings?stream=true", json={"texts": ["a", "bb", "ccc"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"index": 0, "embedding": [1.0, 0.5]},
+        {"index": 1, "embedding": [2.0, 0.5]},
+        {"index": 2, "embedding": [3.0, 0.5]},
+    ]
+
+
+def test_embeddings_stream_binary_records(client, monkeypatch):
+    monkeypatch.setattr(routes_embeddings, "embed_array", fake_embed_array)
+    monkeypatch.setattr(routes_embeddings.get_settings(), "embed_stream_chunk_size", 2)
+
+    response = client.post(
+        "/v1/embeddings",
+        json={"texts": ["a", "bb", "ccc"]},
+        headers={"Accept": routes_embeddings.RECORD_STREAM_MEDIA_TYPE},
+    )
+
+    body = response.content
+    header = routes_embeddings.RECORD_HEADER
+    rows = []
+    while body:
+        start, count, dim = header.unpack_from(body)
+        size = header.size + count * dim * 4
+        matrix = np.frombuffer(body[header.size : size], dtype="<f4").reshape(count, dim)
+        rows.extend((start + offset, row.tolist()) for offset, row in enumerate(matrix))
+        body = body[size:]
+    assert rows == [(0, [1.0, 0.5]), (1, [2.0, 0.5]), (2, [3.0, 0.5])]
+
+
+def test_embeddings_binary_formats(client, monkeypatch):
+    async def fake_embed_array_async(texts):
+        return fake_embed_array(texts)
+
+    monkeypatch.setattr(routes_embeddings, "embed_array_async", fake_embed_array_async)
+    expected = fake_embed_array(["a", "bb"])
+
+    f32 = client.post(
+        "/v1/embeddings",
+        json={"texts": ["a", "bb"]},
+        headers={"Accept": "application/octet-stream"},
+    )
+    assert f32.headers["x-embedding-dim"] == "2"
+    np.testing.assert_array_equal(np.frombuffer(f32.content, "<f4").reshape(2, 2), expected)
+
+    f16 = client.post("/v1/embeddings?format=f16", json={"texts": ["a", "bb"]})
+    np.testing.assert_array_equal(np.frombuffer(f16.content, "<f2").reshape(2, 2), expected)
+
+    npy = client.post("/v1/embeddings?format=npy", json={"texts": ["a", "bb"]})
+    np.testing.assert_array_equal(np.load(io.BytesIO(npy.content)), expected)
+
+    packed = client.post("/v1/embeddings?format=base64", json={"texts": ["a", "bb"]}).json()
+    assert packed["dim"] == 2
+    decoded = [np.frombuffer(base64.b64decode(row), "<f4") for row in packed["embeddings"]]
+    np.testing.assert_array_equal(np.stack(decoded), expected)
+
+    default = client.post("/v1/embeddings", json={"texts": ["a", "bb"]}).json()
+    assert default == {"embeddings": expected.tolist()}
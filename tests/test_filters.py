@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from ai_accel_api_platform.db import filters
+from ai_accel_api_platform.db.collections import CollectionInfo
+from ai_accel_api_platform.db.promote_metadata import promotion_statements
+
+
+@pytest.fixture()
+def counted(monkeypatch):
+    calls = []
+
+    async def fake_count_matching(session, conditions, limit):
+        calls.append(limit)
+        return matches["rows"]
+
+    matches = {"rows": 0}
+    monkeypatch.setattr(filters, "count_matching", fake_count_matching)
+    monkeypatch.setattr(filters.get_settings(), "filter_exact_max_rows", 100)
+    filters.clear_plans()
+    yield matches, calls
+    filters.clear_plans()
+
+
+async def test_plan_filter_strategy_prefers_exact_for_selective_filters(counted):
+    matches, calls = counted
+    matches["rows"] = 100
+    assert await filters.plan_filter_strategy(None, {"tenant": "a"}, []) == "exact"
+
+    matches["rows"] = 101
+    assert await filters.plan_filter_strategy(None, {"tenant": "b"}, []) == "ann"
+    assert calls == [101, 101]
+
+
+async def test_plan_filter_strategy_caches_per_filter(counted):
+    matches, calls = counted
+    matches["rows"] = 5
+    await filters.plan_filter_strategy(None, {"a": 1, "b": 2}, [])
+    matches["rows"] = 500
+
+    assert await filters.plan_filter_strategy(None, {"b": 2, "a": 1}, []) == "exact"
+    assert len(calls) == 1
+
+
+async def test_plan_filter_strategy_skips_count_without_filters(counted):
+    _, calls = counted
+    assert await filters.plan_filter_strategy(None, None, []) == "ann"
+    assert calls == []
+
+
+def test_filter_conditions_inline_promoted_string_values(monkeypatch):
+    monkeypatch.setattr(filters.get_settings(), "promoted_metadata_keys_raw", "tenant, kind")
+
+    conditions = filters.filter_conditions({"tenant": "o'neil", "kind": 3, "other": "x"})
+    promoted = conditions[1].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+
+    assert len(conditions) == 2
+    assert str(promoted) == "(items.metadata ->> 'tenant') = 'o''neil'"
+
+
+def test_metadata_text_rejects_unsafe_keys():
+    with pytest.raises(ValueError):
+        filters.metadata_text("tenant'; drop table items; --")
+
+
+def test_promotion_statements_escape_values():
+    statements = promotion_statements(
+        "tenant", ["o'neil"], [CollectionInfo("default", "model", 384)]
+    )
+
+    assert statements[0].endswith("ON items_default ((metadata->>'tenant'))")
+    assert "(embedding::vector(384))" in statements[1]
+    assert statements[1].endswith("WHERE (metadata->>'tenant') = 'o''neil'")
+    assert statements[-1] == "ANALYZE items"
+
+
+def test_promotion_statements_cover_every_partition():
+    statements = promotion_statements(
+        "tenant",
+        ["a"],
+        [CollectionInfo("default", "model", 384), CollectionInfo("wide", "model", 3072)],
+    )
+
+    assert any("ON items_wide ((metadata->>'tenant'))" in stmt for stmt in statements)
+    # pgvector cannot HNSW-index vectors wider than 2000 dimensions.
+    assert not any("items_wide" in stmt and "hnsw" in stmt for stmt in statements)
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import numpy as np
+
+from ai_accel_api_platform.ai import warmup
 from ai_accel_api_platform.api.v1 import routes_health
+from ai_accel_api_platform.settings import get_settings
 
 
 def test_health_endpoint(client, monkeypatch):
@@ -14,3 +18,32 @@ def test_health_endpoint(client, monkeypatch):
     assert payload["status"] == "ok"
     assert payload["db_ok"] is True
     assert "device" in payload
+
+
+def test_ready_endpoint_waits_for_warmup(client, monkeypatch):
+    warmup.reset()
+    response = client.get("/v1/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    warmup.mark_ready()
+    response = client.get("/v1/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_warm_up_models_runs_each_shape(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "embed_batch_size", 2)
+    monkeypatch.setattr(settings, "enable_rerank", True)
+    encoded: list[list[str]] = []
+    scored: list[list[tuple[str, str]]] = []
+
+    warmup.warm_up_models(
+        encode=lambda texts: encoded.append(texts) or np.zeros((len(texts), 3)),
+        predict=lambda pairs: scored.append(pairs) or np.zeros(len(pairs)),
+    )
+
+    assert [len(batch) for batch in encoded] == [2] * len(warmup.WARMUP_WORD_COUNTS)
+    assert [len(batch[0].split()) for batch in encoded] == list(warmup.WARMUP_WORD_COUNTS)
+    assert len(scored) == len(encoded)
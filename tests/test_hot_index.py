@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from ai_accel_api_platform.db import repositories
+from ai_accel_api_platform.db.hot_index import HotIndex, _NumpyBackend, sync_hot_index
+from ai_accel_api_platform.db.repositories import SearchHit, upsert_item_with_embedding
+from ai_accel_api_platform.db.session import get_engine, get_session
+from ai_accel_api_platform.settings import get_settings
+
+
+def _index(dim=3):
+    return HotIndex(dim, capacity=2, backend=_NumpyBackend(dim, capacity=2))
+
+
+def test_hot_index_upserts_updates_and_removes():
+    index = _index()
+    first, second, third = uuid4(), uuid4(), uuid4()
+    index.apply([first, second, third], [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0]])
+    index.ready = True
+
+    assert [item_id for item_id, _ in index.search([1, 0, 0], 2, ef=10)] == [first, third]
+
+    index.apply([first, third], [[0, 0, 1], None])
+    hits = index.search([0, 1, 0.1], 5, ef=10)
+
+    assert [item_id for item_id, _ in hits] == [second, first]
+    assert len(index) == 2
+
+
+def test_hot_index_is_unavailable_until_ready():
+    index = _index()
+    index.apply([uuid4()], [[1, 0, 0]])
+
+    assert index.search([1, 0, 0], 1, ef=10) is None
+
+
+async def test_vector_search_serves_unfiltered_queries_from_hot_index(monkeypatch):
+    index = _index()
+    item_id = uuid4()
+    index.apply([item_id], [[0, 2, 0]])
+    index.ready = True
+    monkeypatch.setattr(repositories, "get_hot_index", lambda: index)
+
+    # No session: lean results never touch Postgres.
+    results = await repositories.vector_search(None, [0, 1, 0], 3, None, fields=())
+
+    assert results == [(SearchHit(item_id, None, None, None), pytest.approx(1.0))]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_sync_hot_index_bootstraps_and_follows_updates():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    embedding_dim = get_settings().embedding_dim
+    vector = np.zeros(embedding_dim, dtype=np.float32)
+    vector[8] = 1.0
+    item_id = uuid4()
+    index = HotIndex(embedding_dim, 16, backend=_NumpyBackend(embedding_dim, 16))
+    try:
+        async with get_session() as session:
+            await sync_hot_index(session, index)
+            assert index.ready
+            await upsert_item_with_embedding(session, item_id, "hot", {"source": "hot"}, vector)
+            await sync_hot_index(session, index)
+
+        hits = index.search(vector, 1, ef=10)
+        assert hits is not None
+        assert hits[0][0] == item_id
+        assert hits[0][1] == pytest.approx(1.0)
+    finally:
+        # Identical vectors left by earlier runs would tie with this one.
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM items WHERE id = :id"), {"id": item_id})
+            await session.commit()
+        await get_engine().dispose()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_sync_hot_index_picks_up_late_commits(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    monkeypatch.setattr(get_settings(), "hot_index_sync_overlap_seconds", 0.2)
+    embedding_dim = get_settings().embedding_dim
+    vectors = np.zeros((2, embedding_dim), dtype=np.float32)
+    vectors[0, 9] = vectors[1, 10] = 1.0
+    late, early = uuid4(), uuid4()
+    index = HotIndex(embedding_dim, 16, backend=_NumpyBackend(embedding_dim, 16))
+    try:
+        async with get_session() as slow, get_session() as session:
+            # The slow write's transaction starts well before the other write's.
+            await slow.execute(text("SELECT 1"))
+            await asyncio.sleep(0.5)
+            await sync_hot_index(session, index)
+            await upsert_item_with_embedding(session, early, "early", {"source": "hot"}, vectors[1])
+            await sync_hot_index(session, index)
+            await upsert_item_with_embedding(slow, late, "late", {"source": "hot"}, vectors[0])
+            await sync_hot_index(session, index)
+
+        hits = index.search(vectors[0], 1, ef=10)
+        assert hits is not None
+        assert hits[0][0] == late
+    finally:
+        async with get_session() as session:
+            await session.execute(
+                text("DELETE FROM items WHERE id IN (:late, :early)"),
+                {"late": late, "early": early},
+            )
+            await session.commit()
+        await get_engine().dispose()
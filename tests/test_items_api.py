@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from uuid import UUID
+
+import numpy as np
+import pytest
+
+from ai_accel_api_platform.api.deps import get_db_session
+from ai_accel_api_platform.api.v1 import routes_items
+
+
+@pytest.fixture()
+def bulk_calls(client, monkeypatch):
+    calls = {"embed": [], "upsert": [], "bump": 0}
+
+    async def fake_embed_array_async(texts):
+        calls["embed"].append(list(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    async def fake_bulk_upsert_items(session, rows, chunked, collection):
+        calls["upsert"].append([(item_id, content) for item_id, content, _, _ in rows])
+
+    async def fake_bump_cache_namespace(redis):
+        calls["bump"] += 1
+
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr(routes_items, "embed_array_async", fake_embed_array_async)
+    monkeypatch.setattr(routes_items, "bulk_upsert_items", fake_bulk_upsert_items)
+    monkeypatch.setattr(routes_items, "bump_cache_namespace", fake_bump_cache_namespace)
+    monkeypatch.setattr(routes_items, "get_redis", lambda: None)
+    monkeypatch.setattr(routes_items.get_settings(), "bulk_batch_size", 2)
+    monkeypatch.setattr(routes_items.get_settings(), "chunking", False)
+    client.app.dependency_overrides[get_db_session] = fake_session
+    return calls
+
+
+def test_bulk_items_ndjson_batches_and_bumps_once(client, bulk_calls):
+    item_id = "00000000-0000-0000-0000-000000000001"
+    body = "\n".join(
+        json.dumps(line)
+        for line in [{"id": item_id, "content": "a"}, {"content": "b"}, {"content": "c"}]
+    )
+
+    response = client.post(
+        "/v1/items:bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["count"] == 3
+    assert payload["ids"][0] == item_id
+    assert bulk_calls["embed"] == [["a", "b"], ["c"]]
+    assert [[content for _, content in batch] for batch in bulk_calls["upsert"]] == [
+        ["a", "b"],
+        ["c"],
+    ]
+    assert bulk_calls["upsert"][0][0][0] == UUID(item_id)
+    assert bulk_calls["bump"] == 1
+
+
+def test_bulk_items_json_array(client, bulk_calls):
+    response = client.post("/v1/items:bulk", json=[{"content": "a"}, {"content": "b"}])
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    assert bulk_calls["embed"] == [["a", "b"]]
+
+
+def test_bulk_items_rejects_invalid_line(client, bulk_calls):
+    body = '{"content": "a"}\n{"metadata": {}}\n'
+
+    response = client.post(
+        "/v1/items:bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", 2]
+    assert bulk_calls["upsert"] == []
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from ai_accel_api_platform.ai import model_server
+from ai_accel_api_platform.ai.model_client import ModelServerClient
+
+
+async def test_model_server_round_trip(monkeypatch, tmp_path):
+    def fake_encode(texts):
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    def fake_predict(pairs):
+        return np.array([len(content) for _, content in pairs], dtype=np.float32)
+
+    monkeypatch.setattr(model_server, "encode_local", fake_encode)
+    monkeypatch.setattr(model_server, "predict_local", fake_predict)
+
+    socket_path = str(tmp_path / "model.sock")
+    server = await asyncio.start_unix_server(
+        model_server.ModelServer(max_batch_size=8, max_wait_ms=1).handle, path=socket_path
+    )
+    client = ModelServerClient(socket_path, timeout_seconds=5)
+
+    async with server:
+        embedded = await asyncio.to_thread(client.embed, ["ab", "abcd"])
+        scores = await asyncio.to_thread(client.rerank, [("q", "abc")])
+        client.close()
+
+    assert embedded.tolist() == [[2.0, 1.0], [4.0, 1.0]]
+    assert scores.tolist() == [3.0]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from sentence_transformers import SentenceTransformer
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from ai_accel_api_platform.ai.onnx_backend import load_onnx_embedder
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "hello", "world", "the", "a"]
+
+
+@pytest.fixture()
+def tiny_model_dir(tmp_path):
+    model_dir = tmp_path / "tiny-bert"
+    model_dir.mkdir()
+    (model_dir / "vocab.txt").write_text("\n".join(VOCAB + [chr(c) for c in range(97, 123)]))
+    tokenizer = BertTokenizerFast(str(model_dir / "vocab.txt"))
+    config = BertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(str(model_dir))
+    tokenizer.save_pretrained(str(model_dir))
+    return str(model_dir)
+
+
+def test_onnx_embedder_matches_torch(tiny_model_dir, tmp_path):
+    texts = ["hello world", "a", "the world says hello to a b c d e f"]
+    reference = SentenceTransformer(tiny_model_dir, device="cpu").encode(
+        texts, convert_to_numpy=True, normalize_embeddings=True
+    )
+
+    embedder = load_onnx_embedder(tiny_model_dir, str(tmp_path / "onnx"), quantize=False)
+    result = embedder.encode(texts, batch_size=2, normalize_embeddings=True)
+
+    assert result.shape == reference.shape
+    np.testing.assert_allclose(result, reference, atol=1e-4)
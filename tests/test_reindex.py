@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from ai_accel_api_platform.core.chunks import Chunk, ChunkedEmbedding
+from ai_accel_api_platform.core.errors import CollectionModelError
+from ai_accel_api_platform.db import collections, reindex
+from ai_accel_api_platform.db.repositories import (
+    get_item,
+    upsert_item_with_embedding,
+    vector_search,
+)
+from ai_accel_api_platform.db.session import get_session
+from ai_accel_api_platform.settings import get_settings
+
+LIVE_INDEXES = {
+    "items_tenant_a_content_tsv_gin": (
+        "CREATE INDEX items_tenant_a_content_tsv_gin ON public.items_tenant_a "
+        "USING gin (content_tsv)"
+    ),
+    "items_tenant_a_meta_kind_btree": (
+        "CREATE INDEX items_tenant_a_meta_kind_btree ON public.items_tenant_a "
+        "USING btree (((metadata ->> 'kind'::text)))"
+    ),
+    "items_tenant_a_embedding_hnsw": (
+        "CREATE INDEX items_tenant_a_embedding_hnsw ON public.items_tenant_a "
+        "USING hnsw (((embedding)::vector(8)) vector_cosine_ops)"
+    ),
+}
+
+
+def test_shadow_statements_copy_non_vector_indexes_for_the_new_dimension():
+    statements = reindex.shadow_statements("tenant_a", 384, LIVE_INDEXES)
+
+    assert statements[0] == (
+        "CREATE TABLE items_tenant_a_next (LIKE items INCLUDING ALL EXCLUDING INDEXES)"
+    )
+    assert (
+        "CREATE INDEX items_tenant_a_next_meta_kind_btree ON items_tenant_a_next "
+        "USING btree (((metadata ->> 'kind'::text)))"
+    ) in statements
+    assert "CHECK (vector_dims(embedding) = 384)" in statements[3]
+    assert not any("vector(8)" in stmt for stmt in statements)
+    assert any("((embedding::vector(384)) vector_cosine_ops)" in stmt for stmt in statements)
+
+
+def test_longest_collection_name_fits_shadow_index_names():
+    name = "a" * 28
+    statements = reindex.shadow_statements(name, 384, {})
+
+    longest = max(len(stmt.split()[2]) for stmt in statements if stmt.startswith("CREATE INDEX"))
+    assert longest <= 63
+
+
+def test_throttle_delay_holds_the_configured_rate():
+    assert reindex.throttle_delay(400, 1.0, 200) == pytest.approx(1.0)
+    assert reindex.throttle_delay(400, 3.0, 200) == 0.0
+    assert reindex.throttle_delay(400, 0.0, 0) == 0.0
+
+
+async def test_finalize_backs_off_and_gives_up(monkeypatch):
+    settings = get_settings()
+    sleeps = []
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def previous_model(session, name):
+        return collections.CollectionInfo(name, "previous-model", 8)
+
+    async def shadow_exists(session, table_name):
+        return True
+
+    async def covered(name, after=None, budget_seconds=None):
+        return reindex.ReindexProgress(None, 0, True, False)
+
+    async def locked_out(session, name):
+        return False
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(reindex, "get_session", fake_session)
+    monkeypatch.setattr(reindex, "get_collection", previous_model)
+    monkeypatch.setattr(reindex, "_table_exists", shadow_exists)
+    monkeypatch.setattr(reindex, "reindex_step", covered)
+    monkeypatch.setattr(reindex, "cut_over", locked_out)
+    monkeypatch.setattr(reindex, "asyncio", SimpleNamespace(sleep=sleep))
+    monkeypatch.setattr(settings, "reindex_cutover_attempts", 4)
+
+    assert not await reindex.finalize("tenant_a")
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+@pytest.mark.integration
+async def test_reindex_re_embeds_and_cuts_over(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    settings = get_settings()
+    dim = settings.embedding_dim
+    name = f"test_{uuid4().hex[:8]}"
+    ids = [uuid4() for _ in range(5)]
+    unembedded = uuid4()
+    loop = asyncio.get_running_loop()
+    calls = []
+
+    async def concurrent_edit():
+        # Written by a deployment still serving the previous model.
+        async with get_session() as session:
+            await session.execute(
+                text(
+                    "UPDATE items SET content = 'edited', updated_at = now() "
+                    "WHERE collection = :n AND id = :id"
+                ),
+                {"n": name, "id": ids[0]},
+            )
+            await session.commit()
+
+    def fake_encode(texts):
+        calls.append(list(texts))
+        if len(calls) == 1:
+            # A write landing mid-pass must be re-embedded before the cutover.
+            asyncio.run_coroutine_threadsafe(concurrent_edit(), loop).result()
+        vectors = np.zeros((len(texts), dim), dtype=np.float32)
+        vectors[:, 0] = 1.0
+        return vectors
+
+    monkeypatch.setattr(reindex, "encode_local", fake_encode)
+    monkeypatch.setattr(settings, "reindex_batch_size", 2)
+    monkeypatch.setattr(settings, "reindex_max_items_per_second", 0)
+    try:
+        async with get_session() as session:
+            await collections.create_collection(session, name, "previous-model", 8)
+        async with get_session() as session:
+            await session.execute(
+                text(
+                    "INSERT INTO items (collection, id, content, metadata, embedding, "
+                    'embedding_model) VALUES (:n, :id, :content, \'{"source": "test"}\', '
+                    "CAST(:embedding AS vector), 'previous-model')"
+                ),
+                [
+                    {"n": name, "id": item_id, "content": f"doc {n}", "embedding": str([0.1] * 8)}
+                    for n, item_id in enumerate(ids)
+                ],
+            )
+            await session.commit()
+            with pytest.raises(CollectionModelError):
+                await upsert_item_with_embedding(
+                    session, uuid4(), "new", None, [0.1] * 8, None, name
+                )
+
+        progress = await reindex.reindex_step(name, budget_seconds=30)
+        assert progress.done and not progress.backfill
+        assert [text for batch in calls for text in batch].count("edited") == 1
+
+        collections.clear_collections()
+        async with get_session() as session:
+            info = await collections.get_collection(session, name)
+            assert info is not None and not info.served
+            # Written between the last pass and the cutover.
+            await session.execute(
+                text("UPDATE items SET updated_at = now() WHERE collection = :n AND id = :id"),
+                {"n": name, "id": ids[2]},
+            )
+            await session.commit()
+        passes = len(calls)
+        assert await reindex.finalize(name)
+        assert calls[passes:] == [["doc 2"]]
+
+        collections.clear_collections()
+        async with get_session() as session:
+            info = await collections.get_collection(session, name)
+            assert info is not None and info.served
+            edited = await get_item(session, ids[0], name)
+            assert edited is not None and edited.content == "edited"
+            assert edited.embedding_model == settings.embedding_model
+            hits = await vector_search(
+                session, [1.0] + [0.0] * (dim - 1), 10, None, collection=name
+            )
+            assert {hit.id for hit, _ in hits} == set(ids)
+            tables = await session.execute(
+                text("SELECT to_regclass(:next), to_regclass(:index)"),
+                {"next": reindex.shadow_name(name), "index": f"items_{name}_embedding_hnsw"},
+            )
+            assert tables.one() == (None, f"items_{name}_embedding_hnsw")
+
+            await upsert_item_with_embedding(session, unembedded, "later", None, None, None, name)
+            # Left behind by a deployment of another model before it saw the cutover.
+            await session.execute(
+                text("UPDATE items SET embedding_model = 'previous-model' WHERE id = :id"),
+                {"id": ids[1]},
+            )
+            await session.commit()
+
+        # Served now, so only missing and foreign vectors are filled in place.
+        progress = await reindex.reindex_step(name, budget_seconds=30)
+        assert progress.done and progress.backfill and progress.processed == 2
+        async with get_session() as session:
+            filled = await get_item(session, unembedded, name)
+            assert filled is not None and filled.embedding is not None
+            refreshed = await get_item(session, ids[1], name)
+            assert refreshed is not None
+            assert refreshed.embedding_model == settings.embedding_model
+    finally:
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM items WHERE collection = :n"), {"n": name})
+            await session.execute(text(f"ALTER TABLE items DETACH PARTITION items_{name}"))
+            await session.execute(text(f"DROP TABLE IF EXISTS items_{name}"))
+            await session.execute(text(f"DROP TABLE IF EXISTS items_{name}_next"))
+            await session.execute(text("DELETE FROM collections WHERE name = :n"), {"n": name})
+            await session.commit()
+        collections.clear_collections()
+
+
+@pytest.mark.integration
+async def test_backfill_chunks_items_written_before_chunking(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    settings = get_settings()
+    dim = settings.embedding_dim
+    name = f"test_{uuid4().hex[:8]}"
+    item_id = uuid4()
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[1] = 1.0
+
+    def fake_embed_documents(texts):
+        return [
+            ChunkedEmbedding([Chunk(0, text, 0, len(text))], vector[None, :], vector)
+            for text in texts
+        ]
+
+    monkeypatch.setattr(reindex, "embed_documents", fake_embed_documents)
+    monkeypatch.setattr(settings, "reindex_max_items_per_second", 0)
+    try:
+        async with get_session() as session:
+            await collections.create_collection(session, name, settings.embedding_model, dim)
+        async with get_session() as session:
+            await upsert_item_with_embedding(
+                session, item_id, "unchunked", {"source": "test"}, [0.1] * dim, None, name
+            )
+
+        monkeypatch.setattr(settings, "chunking", True)
+        progress = await reindex.reindex_step(name, budget_seconds=30)
+        assert progress.done and progress.backfill and progress.processed == 1
+
+        async with get_session() as session:
+            chunks = await session.execute(
+                text("SELECT content FROM item_chunks WHERE collection = :n AND item_id = :id"),
+                {"n": name, "id": item_id},
+            )
+            assert chunks.scalars().all() == ["unchunked"]
+            assert (await reindex.coverage(session, name)).pending == 0
+    finally:
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM items WHERE collection = :n"), {"n": name})
+            await session.execute(text(f"ALTER TABLE items DETACH PARTITION items_{name}"))
+            await session.execute(text(f"DROP TABLE IF EXISTS items_{name}"))
+            await session.execute(text("DELETE FROM collections WHERE name = :n"), {"n": name})
+            await session.commit()
+        collections.clear_collections()
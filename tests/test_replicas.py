@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from ai_accel_api_platform import main
+from ai_accel_api_platform.api.deps import get_read_db_session
+from ai_accel_api_platform.api.v1 import routes_search
+from ai_accel_api_platform.core.schemas import SearchRequest
+from ai_accel_api_platform.db import session as db_session
+from ai_accel_api_platform.main import create_app
+
+
+def _replica(lag):
+    sessionmaker = object()
+    return db_session._Replica(engine=None, sessionmaker=sessionmaker, lag_seconds=lag)
+
+
+@pytest.fixture()
+def replicas(monkeypatch):
+    fresh, stale, down = _replica(0.5), _replica(30.0), _replica(None)
+    monkeypatch.setattr(db_session, "_replicas", [stale, down, fresh])
+    monkeypatch.setattr(db_session.get_settings(), "replica_lag_check_interval_seconds", 1e9)
+    monkeypatch.setattr(db_session.get_settings(), "replica_max_lag_seconds", 5.0)
+    for replica in (fresh, stale, down):
+        replica.checked_at = float("inf")
+    return fresh
+
+
+async def test_read_sessionmaker_skips_stale_and_unreachable_replicas(replicas):
+    sessionmaker, source = await db_session.get_read_sessionmaker()
+
+    assert (sessionmaker, source) == (replicas.sessionmaker, "replica")
+
+
+async def test_read_sessionmaker_falls_back_to_primary_when_too_stale(replicas):
+    sessionmaker, source = await db_session.get_read_sessionmaker(max_lag_seconds=0.1)
+
+    assert source == "primary"
+    assert sessionmaker is db_session.get_sessionmaker()
+
+
+async def test_read_db_session_honours_strong_consistency(replicas):
+    response = Response()
+    sessions = get_read_db_session(response, read_consistency="strong", max_staleness=None)
+    session = await anext(sessions)
+
+    assert response.headers["X-Read-Source"] == "primary"
+    assert session.bind is db_session.get_engine()
+    await sessions.aclose()
+
+
+async def test_replica_that_never_replayed_counts_as_stale(monkeypatch):
+    class Connection:
+        async def scalar(self, statement):
+            return None
+
+    class Engine:
+        @asynccontextmanager
+        async def connect(self):
+            yield Connection()
+
+    replica = db_session._Replica(engine=Engine(), sessionmaker=object())
+
+    assert await db_session.replica_lag(replica) == float("inf")
+
+
+@pytest.fixture()
+def cached_search(monkeypatch):
+    store = {"hit": '{"results": []}'}
+    searches = []
+
+    class FakeRedis:
+        async def get(self, key):
+            return store.get("hit")
+
+        async def set(self, key, value, ex=None):
+            store["written"] = value
+
+    async def namespace(redis):
+        return "1"
+
+    async def served(session, name):
+        return SimpleNamespace(name=name)
+
+    async def embed(texts):
+        return [[0.0]]
+
+    async def search(*args, **kwargs):
+        searches.append(args)
+        return []
+
+    async def rerank(query, results):
+        return results
+
+    monkeypatch.setattr(routes_search, "get_redis", FakeRedis)
+    monkeypatch.setattr(routes_search, "get_cache_namespace", namespace)
+    monkeypatch.setattr(routes_search, "get_served_collection", served)
+    monkeypatch.setattr(routes_search, "embed_texts_async", embed)
+    monkeypatch.setattr(routes_search, "vector_search", search)
+    monkeypatch.setattr(routes_search, "rerank_results_async", rerank)
+    monkeypatch.setattr(routes_search.get_settings(), "chunking", False)
+    return store, searches
+
+
+async def test_strong_search_skips_the_cache_read(cached_search):
+    store, searches = cached_search
+    session = SimpleNamespace(info={"read_source": "primary", "read_consistency": "strong"})
+
+    await routes_search.search(SearchRequest(query="q"), session)
+
+    assert len(searches) == 1 and "written" in store
+
+
+async def test_replica_search_results_are_not_cached(cached_search):
+    store, searches = cached_search
+    del store["hit"]
+    session = SimpleNamespace(info={"read_source": "replica", "read_consistency": None})
+
+    await routes_search.search(SearchRequest(query="q"), session)
+
+    assert len(searches) == 1 and "written" not in store
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_replica_lag_of_a_primary_is_zero(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    monkeypatch.setattr(db_session, "_replicas", None)
+    monkeypatch.setattr(
+        db_session.get_settings(), "database_replica_urls_raw", os.environ["DATABASE_URL"]
+    )
+
+    try:
+        _, source = await db_session.get_read_sessionmaker()
+        assert source == "replica"
+        assert db_session._get_replicas()[0].lag_seconds == 0.0
+    finally:
+        await db_session.dispose_replicas()
+
+
+async def test_shutdown_disposes_replica_pools(monkeypatch):
+    disposed = []
+
+    class Engine:
+        async def dispose(self):
+            disposed.append(self)
+
+    replica = db_session._Replica(engine=Engine(), sessionmaker=object())
+    monkeypatch.setattr(db_session, "_replicas", [replica])
+    app = create_app()
+    monkeypatch.setattr(main, "get_engine", Engine)
+
+    for handler in app.router.on_shutdown:
+        await handler()
+
+    assert disposed[0] is replica.engine and len(disposed) == 2
+    assert db_session._replicas is None
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ai_accel_api_platform.ai import rerank
+from ai_accel_api_platform.ai.cache import VectorCache
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    cache = VectorCache("rerank", max_entries=100, ttl_seconds=60)
+    monkeypatch.setattr(rerank, "_cache", cache)
+    return cache
+
+
+@pytest.fixture()
+def scored_pairs(monkeypatch):
+    calls = []
+
+    def fake_predict(pairs):
+        calls.append(list(pairs))
+        return np.asarray([float(len(content)) for _, content in pairs], dtype=np.float32)
+
+    settings = rerank.get_settings()
+    monkeypatch.setattr(settings, "enable_rerank", True)
+    # Cache lookups run in the threadpool first; leave room for both to reach the batcher.
+    monkeypatch.setattr(settings, "rerank_max_wait_ms", 50)
+    monkeypatch.setattr(rerank, "_predict", fake_predict)
+    monkeypatch.setattr(rerank, "_batcher", None)
+    return calls
+
+
+def _results(*contents):
+    return [(SimpleNamespace(content=content), 0.5) for content in contents]
+
+
+async def test_rerank_results_async_batches_concurrent_searches(scored_pairs):
+    first, second = await asyncio.gather(
+        rerank.rerank_results_async("q1", _results("a", "ccc")),
+        rerank.rerank_results_async("q2", _results("bb")),
+    )
+
+    assert len(scored_pairs) == 1
+    assert sorted(scored_pairs[0]) == [("q1", "a"), ("q1", "ccc"), ("q2", "bb")]
+    assert [(item.content, score) for item, score in first] == [("ccc", 3.0), ("a", 1.0)]
+    assert [(item.content, score) for item, score in second] == [("bb", 2.0)]
+
+
+async def test_rerank_results_async_caps_candidates(scored_pairs, monkeypatch):
+    monkeypatch.setattr(rerank.get_settings(), "rerank_max_candidates", 2)
+
+    results = await rerank.rerank_results_async("q", _results("a", "bbb", "cccc", "dd"))
+
+    assert scored_pairs == [[("q", "a"), ("q", "bbb")]]
+    # The tail keeps its retrieval order, scored below every reranked hit.
+    assert [(item.content, score) for item, score in results] == [
+        ("bbb", 3.0),
+        ("a", 1.0),
+        ("cccc", 0.0),
+        ("dd", -1.0),
+    ]
+
+
+async def test_rerank_cache_scores_only_new_or_changed_pairs(scored_pairs):
+    first = SimpleNamespace(id=1, content="a")
+    second = SimpleNamespace(id=2, content="bb")
+    await rerank.rerank_results_async("Hot Query", [(first, 0.5), (second, 0.4)])
+
+    second.content = "cccc"
+    third = SimpleNamespace(id=3, content="ddd")
+    results = await rerank.rerank_results_async(
+        "Hot Query", [(first, 0.5), (second, 0.4), (third, 0.3)]
+    )
+
+    assert scored_pairs == [
+        [("Hot Query", "a"), ("Hot Query", "bb")],
+        [("Hot Query", "cccc"), ("Hot Query", "ddd")],
+    ]
+    assert [(item.id, score) for item, score in results] == [(2, 4.0), (3, 3.0), (1, 1.0)]
+
+
+async def test_rerank_cache_keeps_query_casings_apart(scored_pairs):
+    item = SimpleNamespace(id=1, content="a")
+    await rerank.rerank_results_async("Hot Query", [(item, 0.5)])
+    await rerank.rerank_results_async("hot query", [(item, 0.5)])
+
+    assert scored_pairs == [[("Hot Query", "a")], [("hot query", "a")]]
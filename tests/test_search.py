@@ -1,14 +1,36 @@
 from __future__ import annotations
 
+import json
 import os
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
+import numpy as np
 import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 
-from ai_accel_api_platform.db.repositories import upsert_item_with_embedding, vector_search
+from ai_accel_api_platform.ai.chunking import pool_chunk_vectors
+from ai_accel_api_platform.api.deps import get_read_db_session
+from ai_accel_api_platform.api.v1 import routes_search
+from ai_accel_api_platform.core.chunks import Chunk, ChunkedEmbedding
+from ai_accel_api_platform.db import collections, filters, repositories
+from ai_accel_api_platform.db.repositories import (
+    SEARCH_FIELDS,
+    SearchHit,
+    batch_vector_search,
+    bulk_upsert_items,
+    chunk_search,
+    deep_vector_search,
+    get_item,
+    hybrid_search,
+    upsert_item_with_embedding,
+    vector_search,
+)
 from ai_accel_api_platform.db.session import get_session
 from ai_accel_api_platform.db.vector import build_search_cache_key
-from ai_accel_api_platform.settings import get_settings
+from ai_accel_api_platform.settings import Settings, get_settings
 
 
 def test_cache_key_deterministic():
@@ -38,3 +60,463 @@ async def test_vector_search_integration():
 
     assert results
     assert results[0][0].id == item_id
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chunk_search_integration():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding_dim = get_settings().embedding_dim
+    near = np.zeros(embedding_dim, dtype=np.float32)
+    near[0] = 1.0
+    far = np.zeros(embedding_dim, dtype=np.float32)
+    far[1] = 1.0
+    chunks = [Chunk(0, "intro", 0, 5), Chunk(1, "details", 6, 13)]
+    chunked = ChunkedEmbedding(chunks, np.stack([far, near]), pool_chunk_vectors([far, near]))
+    marker = str(uuid4())
+
+    item_id = uuid4()
+    async with get_session() as session:
+        await upsert_item_with_embedding(
+            session, item_id, "intro details", {"marker": marker}, chunked.embedding, chunked
+        )
+        results = await chunk_search(session, near.tolist(), 1, {"marker": marker})
+
+    assert results[0][0].id == item_id
+    assert results[0][1] == pytest.approx(1.0)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bulk_upsert_items_integration():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding_dim = get_settings().embedding_dim
+    vector = np.zeros(embedding_dim, dtype=np.float32)
+    vector[2] = 1.0
+    chunked = ChunkedEmbedding([Chunk(0, "new", 0, 3)], vector[None, :], vector)
+    first, second = uuid4(), uuid4()
+    marker = str(uuid4())
+    async with get_session() as session:
+        await upsert_item_with_embedding(session, first, "old", None, vector)
+        await bulk_upsert_items(
+            session,
+            [
+                (first, "stale", None, vector),
+                (second, "other", {"marker": "other"}, vector),
+                (first, "new", {"marker": marker}, vector),
+            ],
+            [chunked, chunked, chunked],
+        )
+        item = await get_item(session, first)
+        await session.refresh(item)
+        chunks = await chunk_search(session, vector.tolist(), 5, {"marker": marker})
+
+    assert item is not None
+    assert (item.content, item.metadata_) == ("new", {"marker": marker})
+    assert [found.id for found, _ in chunks] == [first]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_upsert_keeps_embedding_and_chunks_without_new_embedding():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding_dim = get_settings().embedding_dim
+    vector = np.zeros(embedding_dim, dtype=np.float32)
+    vector[3] = 1.0
+    chunked = ChunkedEmbedding([Chunk(0, "v1", 0, 2)], vector[None, :], vector)
+    marker = str(uuid4())
+    item_id = uuid4()
+    async with get_session() as session:
+        await upsert_item_with_embedding(session, item_id, "v1", None, vector, chunked)
+        await upsert_item_with_embedding(session, item_id, "v1", None, vector, chunked)
+        written = await upsert_item_with_embedding(session, item_id, "v2", {"marker": marker}, None)
+        results = await chunk_search(session, vector.tolist(), 1, {"marker": marker})
+
+    assert written == (item_id, "v2", {"marker": marker}, True)
+    assert [found.id for found, _ in results] == [item_id]
+
+
+def test_search_fields_drop_content(client, monkeypatch):
+    item_id = uuid4()
+    requested = {}
+
+    async def fake_embed_texts_async(texts):
+        return [[0.0]]
+
+    async def fake_vector_search(
+        session,
+        embedding,
+        top_k,
+        filters,
+        fields,
+        include_vectors,
+        accuracy,
+        exact,
+        collection,
+        text_filter,
+    ):
+        requested.update(fields=set(fields), include_vectors=include_vectors, accuracy=accuracy)
+        return [(SearchHit(item_id, None, {"a": 1}, None), 0.9)]
+
+    async def fake_session():
+        yield None
+
+    def no_redis():
+        raise ConnectionError("redis disabled in tests")
+
+    monkeypatch.setattr(routes_search, "embed_texts_async", fake_embed_texts_async)
+    monkeypatch.setattr(routes_search, "vector_search", fake_vector_search)
+    monkeypatch.setattr(routes_search, "get_redis", no_redis)
+    monkeypatch.setattr(routes_search.get_settings(), "enable_rerank", False)
+    monkeypatch.setattr(routes_search.get_settings(), "chunking", False)
+    client.app.dependency_overrides[get_read_db_session] = fake_session
+
+    response = client.post(
+        "/v1/search", json={"query": "q", "fields": ["metadata"], "accuracy": "fast"}
+    )
+
+    assert response.status_code == 200
+    assert requested == {"fields": {"metadata"}, "include_vectors": False, "accuracy": "fast"}
+    assert response.json()["results"] == [
+        {"id": str(item_id), "content": None, "metadata": {"a": 1}, "score": 0.9, "embedding": None}
+    ]
+
+
+def test_search_rejects_exact_where_it_would_be_ignored(client, monkeypatch):
+    async def fake_session():
+        yield None
+
+    client.app.dependency_overrides[get_read_db_session] = fake_session
+    monkeypatch.setattr(routes_search.get_settings(), "chunking", False)
+    response = client.post("/v1/search", json={"query": "q", "exact": True, "use_hybrid": True})
+    assert response.status_code == 422
+
+    monkeypatch.setattr(routes_search.get_settings(), "chunking", True)
+    response = client.post("/v1/search", json={"query": "q", "exact": True})
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_vector_search_projection_integration():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding = np.zeros(get_settings().embedding_dim, dtype=np.float32)
+    embedding[4] = 1.0
+    marker = str(uuid4())
+    item_id = uuid4()
+    async with get_session() as session:
+        await upsert_item_with_embedding(session, item_id, "body", {"marker": marker}, embedding)
+        lean = await vector_search(session, embedding.tolist(), 1, {"marker": marker}, fields=())
+        full = await vector_search(
+            session, embedding.tolist(), 1, {"marker": marker}, include_vectors=True
+        )
+
+    assert lean[0][0] == SearchHit(item_id, None, None, None)
+    assert full[0][0].content == "body"
+    assert full[0][0].metadata == {"marker": marker}
+    np.testing.assert_allclose(full[0][0].embedding, embedding)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_lexical_and_vector_hits():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding_dim = get_settings().embedding_dim
+    query = np.zeros(embedding_dim, dtype=np.float32)
+    query[5] = 1.0
+    far = np.zeros(embedding_dim, dtype=np.float32)
+    far[6] = 1.0
+    marker = str(uuid4())
+    lexical_only, vector_only, both = uuid4(), uuid4(), uuid4()
+    async with get_session() as session:
+        for item_id, content, vector in [
+            (lexical_only, "zebras grazing on quantum fields", far),
+            (vector_only, "unrelated words", query),
+            (both, "a zebra explains quantum tunnelling", query),
+        ]:
+            await upsert_item_with_embedding(session, item_id, content, {"marker": marker}, vector)
+        results = await hybrid_search(
+            session, query.tolist(), 3, {"marker": marker}, "zebra quantum"
+        )
+
+    assert results[0][0].id == both
+    assert {hit.id for hit, _ in results} == {lexical_only, vector_only, both}
+
+    async with get_session() as session:
+        filtered = await hybrid_search(
+            session, query.tolist(), 3, {"marker": marker}, "zebra quantum", text_filter="zebra"
+        )
+
+    # text_filter restricts both legs, so the vector-only hit drops out.
+    assert {hit.id for hit, _ in filtered} == {lexical_only, both}
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_vector_search_exact_filter_returns_full_top_k(monkeypatch):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    filters.clear_plans()
+    monkeypatch.setattr(get_settings(), "filter_exact_max_rows", 10)
+
+    embedding_dim = get_settings().embedding_dim
+    query = np.zeros(embedding_dim, dtype=np.float32)
+    query[7] = 1.0
+    marker = str(uuid4())
+    rng = np.random.default_rng(7)
+    async with get_session() as session:
+        for index in range(3):
+            vector = rng.normal(size=embedding_dim).astype(np.float32)
+            await upsert_item_with_embedding(
+                session, uuid4(), f"filtered {index}", {"marker": marker}, vector
+            )
+        results = await vector_search(session, query.tolist(), 5, {"marker": marker})
+
+    assert await filters.plan_filter_strategy(None, {"marker": marker}, []) == "exact"
+    assert len(results) == 3
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+@pytest.mark.parametrize(
+    ("mode", "candidate_order"),
+    [
+        ("half", "ORDER BY CAST(items.embedding AS HALFVEC(384)) <=>"),
+        ("binary", "ORDER BY CAST(binary_quantize(items.embedding) AS BIT(384)) <~>"),
+    ],
+)
+def test_compact_modes_rescore_index_candidates_at_full_precision(
+    monkeypatch, mode, candidate_order
+):
+    monkeypatch.setattr(get_settings(), "vector_index_mode", mode)
+    monkeypatch.setattr(get_settings(), "vector_rescore_oversample", 4)
+    columns = repositories._hit_columns(SEARCH_FIELDS, False)
+
+    stmt = repositories._nearest_items_stmt("default", [0.1] * 384, 5, None, None, columns)
+    candidates = stmt.get_final_froms()[0].right
+
+    # Candidates come from the compact expression index, in the order it serves...
+    assert candidates.name == "candidates"
+    assert candidate_order in str(candidates.element.compile(dialect=postgresql.dialect()))
+    assert candidates.element._limit == 5 * 4
+    # ...and are ranked by the full-precision expression the vector index covers.
+    assert [str(clause) for clause in stmt._order_by_clauses] == [
+        "(CAST(items.embedding AS VECTOR(384)) <=> :param_1) ASC"
+    ]
+    assert stmt._limit == 5
+
+
+@pytest.mark.parametrize(("mode", "ef_search"), [("full", "40"), ("binary", "160")])
+async def test_ann_walk_covers_the_compact_candidate_set(monkeypatch, mode, ef_search):
+    monkeypatch.setattr(get_settings(), "vector_index_mode", mode)
+    monkeypatch.setattr(get_settings(), "vector_rescore_oversample", 4)
+    executed = []
+
+    class FakeSession:
+        async def execute(self, stmt):
+            executed.append(stmt)
+
+    await repositories._prepare_ann_search(FakeSession(), "default", 40, None, "fast")
+
+    params = list(executed[0].compile().params.values())
+    gucs = dict(zip(params[0::3], params[1::3], strict=True))
+    assert gucs["hnsw.ef_search"] == ef_search
+
+
+def test_vector_index_mode_is_validated():
+    with pytest.raises(ValidationError):
+        Settings(VECTOR_INDEX_MODE="quarter")
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("mode", ["half", "binary"])
+async def test_compact_modes_match_full_precision_search(monkeypatch, mode):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    settings = get_settings()
+    dim = settings.embedding_dim
+    name = f"test_{uuid4().hex[:8]}"
+    rng = np.random.default_rng(11)
+    query = rng.normal(size=dim).astype(np.float32).tolist()
+    # Oversampling past the collection size makes every row a candidate, so rescoring
+    # must reproduce the exact ranking.
+    monkeypatch.setattr(settings, "vector_rescore_oversample", 10)
+    try:
+        async with get_session() as session:
+            await collections.create_collection(session, name, settings.embedding_model, dim)
+        async with get_session() as session:
+            rows = [
+                (uuid4(), f"doc {n}", {"source": "test"}, rng.normal(size=dim).astype(np.float32))
+                for n in range(30)
+            ]
+            await bulk_upsert_items(session, rows, None, name)
+            full = await vector_search(session, query, 5, None, exact=True, collection=name)
+            monkeypatch.setattr(settings, "vector_index_mode", mode)
+            compact = await vector_search(session, query, 5, None, collection=name)
+
+        assert [hit.id for hit, _ in compact] == [hit.id for hit, _ in full]
+        assert [score for _, score in compact] == pytest.approx([score for _, score in full])
+    finally:
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM items WHERE collection = :n"), {"n": name})
+            await session.execute(text(f"ALTER TABLE items DETACH PARTITION items_{name}"))
+            await session.execute(text(f"DROP TABLE IF EXISTS items_{name}"))
+            await session.execute(text("DELETE FROM collections WHERE name = :n"), {"n": name})
+            await session.commit()
+        collections.clear_collections()
+
+
+def test_search_batch_embeds_once_and_groups_results(client, monkeypatch):
+    ids = [uuid4(), uuid4()]
+    calls = {"embed": [], "search": []}
+
+    async def fake_embed_texts_async(texts):
+        calls["embed"].append(list(texts))
+        return [[float(index)] for index, _ in enumerate(texts)]
+
+    async def fake_batch_vector_search(
+        session, embeddings, top_k, filters, fields, include_vectors, accuracy, collection
+    ):
+        calls["search"].append((list(embeddings), top_k))
+        return [[(SearchHit(ids[i], f"doc {i}", None, None), 0.5)] for i in range(len(embeddings))]
+
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr(routes_search, "embed_texts_async", fake_embed_texts_async)
+    monkeypatch.setattr(routes_search, "batch_vector_search", fake_batch_vector_search)
+    monkeypatch.setattr(routes_search.get_settings(), "enable_rerank", False)
+    client.app.dependency_overrides[get_read_db_session] = fake_session
+
+    response = client.post("/v1/search:batch", json={"queries": ["a", "b"], "top_k": 3})
+
+    assert response.status_code == 200
+    assert calls == {"embed": [["a", "b"]], "search": [([[0.0], [1.0]], 3)]}
+    assert [[hit["id"] for hit in group["results"]] for group in response.json()["results"]] == [
+        [str(ids[0])],
+        [str(ids[1])],
+    ]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_batch_vector_search_matches_single_queries():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    rng = np.random.default_rng(21)
+    embedding_dim = get_settings().embedding_dim
+    marker = str(uuid4())
+    async with get_session() as session:
+        for index in range(4):
+            await upsert_item_with_embedding(
+                session,
+                uuid4(),
+                f"batch {index}",
+                {"marker": marker},
+                rng.normal(size=embedding_dim).astype(np.float32),
+            )
+        queries = [rng.normal(size=embedding_dim).tolist() for _ in range(3)]
+        batched = await batch_vector_search(session, queries, 2, {"marker": marker})
+        single = [await vector_search(session, query, 2, {"marker": marker}) for query in queries]
+
+    assert [[hit.id for hit, _ in hits] for hits in batched] == [
+        [hit.id for hit, _ in hits] for hits in single
+    ]
+    assert all(len(hits) == 2 for hits in batched)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def getex(self, key, ex=None):
+        return self.values.get(key)
+
+
+def test_search_cursor_materializes_once_and_streams_pages(client, monkeypatch):
+    ids = [uuid4() for _ in range(5)]
+    redis = FakeRedis()
+    calls = {"deep": 0, "pages": []}
+
+    async def fake_embed_texts_async(texts):
+        return [[0.0]]
+
+    async def fake_deep_vector_search(session, embedding, limit, filters, accuracy, collection):
+        calls["deep"] += 1
+        return [(item_id, 1.0 - index / 10) for index, item_id in enumerate(ids[:limit])]
+
+    async def fake_hydrate_hits(session, hits, fields, include_vectors, collection):
+        calls["pages"].append(len(hits))
+        return [(SearchHit(item_id, None, {"n": 1}, None), score) for item_id, score in hits]
+
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr(routes_search, "embed_texts_async", fake_embed_texts_async)
+    monkeypatch.setattr(routes_search, "deep_vector_search", fake_deep_vector_search)
+    monkeypatch.setattr(routes_search, "hydrate_hits", fake_hydrate_hits)
+    monkeypatch.setattr(routes_search, "get_redis", lambda: redis)
+    monkeypatch.setattr(routes_search, "get_read_session", lambda: _null_session())
+    monkeypatch.setattr(routes_search.get_settings(), "search_cursor_page_size", 2)
+    client.app.dependency_overrides[get_read_db_session] = fake_session
+
+    created = client.post(
+        "/v1/search:cursor", json={"query": "q", "max_results": 5, "fields": ["metadata"]}
+    )
+    assert created.status_code == 200
+    assert created.json()["total"] == 5
+
+    page = client.get(f"/v1/search:cursor/{created.json()['cursor']}?offset=1&limit=3")
+
+    assert page.status_code == 200
+    assert page.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in page.text.splitlines()]
+    assert [line["id"] for line in lines] == [str(item_id) for item_id in ids[1:4]]
+    assert lines[0]["score"] == pytest.approx(0.9)
+    assert calls == {"deep": 1, "pages": [2, 1]}
+    assert client.get("/v1/search:cursor/unknown").status_code == 404
+
+
+@asynccontextmanager
+async def _null_session():
+    yield None
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_deep_vector_search_ranks_past_top_k_limit():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    rng = np.random.default_rng(22)
+    embedding_dim = get_settings().embedding_dim
+    marker = str(uuid4())
+    async with get_session() as session:
+        for index in range(120):
+            await upsert_item_with_embedding(
+                session,
+                uuid4(),
+                f"deep {index}",
+                {"marker": marker},
+                rng.normal(size=embedding_dim).astype(np.float32),
+            )
+        ranked = await deep_vector_search(
+            session, rng.normal(size=embedding_dim).tolist(), 150, {"marker": marker}
+        )
+
+    assert len(ranked) == 120
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
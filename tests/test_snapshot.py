@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+
+from ai_accel_api_platform.db import repositories, snapshot
+from ai_accel_api_platform.db.repositories import SearchHit, upsert_item_with_embedding
+from ai_accel_api_platform.db.session import get_engine, get_session
+from ai_accel_api_platform.settings import Settings, get_settings
+
+EXPORTED_AT = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _write_snapshot(path, vectors, dtype="float32"):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [uuid4() for _ in vectors]
+    np.save(path / snapshot.VECTORS_FILE, vectors.astype(dtype))
+    np.save(path / snapshot.IDS_FILE, np.asarray([list(i.bytes) for i in ids], dtype=np.uint8))
+    manifest = {
+        "count": len(ids),
+        "dim": vectors.shape[1],
+        "dtype": dtype,
+        "max_updated_at": EXPORTED_AT.isoformat(),
+    }
+    (path / snapshot.MANIFEST_FILE).write_text(json.dumps(manifest))
+    return ids, vectors
+
+
+@pytest.mark.parametrize("dtype", snapshot.SNAPSHOT_DTYPES)
+def test_snapshot_blocked_search_matches_brute_force(tmp_path, dtype):
+    rng = np.random.default_rng(3)
+    ids, vectors = _write_snapshot(tmp_path, rng.normal(size=(50, 8)), dtype)
+    query = rng.normal(size=8)
+
+    hits = snapshot.load_snapshot(tmp_path).search(query, 5, block_rows=7)
+
+    expected = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:5]
+    assert [item_id for item_id, _ in hits] == [ids[row] for row in expected]
+    assert snapshot.recall_at_k([item_id for item_id, _ in hits], [ids[i] for i in expected]) == 1.0
+
+
+def test_snapshot_dtype_is_validated():
+    with pytest.raises(ValidationError):
+        Settings(SNAPSHOT_DTYPE="int8")
+
+
+def test_load_snapshot_rejects_mismatched_files(tmp_path):
+    _write_snapshot(tmp_path, np.eye(3))
+    (tmp_path / snapshot.MANIFEST_FILE).write_text(json.dumps({"count": 4, "dim": 3}))
+
+    with pytest.raises(ValueError):
+        snapshot.load_snapshot(tmp_path)
+
+
+def test_load_snapshot_rejects_other_models(tmp_path):
+    _write_snapshot(tmp_path, np.eye(3))
+    manifest = {"count": 3, "dim": 3, "dtype": "float32", "model": "previous-model"}
+    (tmp_path / snapshot.MANIFEST_FILE).write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="snapshot_model_mismatch"):
+        snapshot.load_snapshot(tmp_path)
+
+
+async def test_exact_vector_search_uses_snapshot(tmp_path, monkeypatch):
+    ids, _ = _write_snapshot(tmp_path, np.eye(3))
+    monkeypatch.setattr(get_settings(), "snapshot_path", str(tmp_path))
+    monkeypatch.setattr(snapshot, "_snapshot_mtime", None)
+
+    async def latest_update(session):
+        return EXPORTED_AT
+
+    monkeypatch.setattr(repositories, "_latest_item_update", latest_update)
+
+    results = await repositories.vector_search(None, [0, 0, 1], 1, None, fields=(), exact=True)
+
+    assert results == [(SearchHit(ids[2], None, None, None), pytest.approx(1.0))]
+
+
+def test_snapshot_is_stale_once_items_change_after_export(tmp_path):
+    _write_snapshot(tmp_path, np.eye(3))
+    exported = snapshot.load_snapshot(tmp_path)
+
+    assert exported.is_current(EXPORTED_AT)
+    assert exported.is_current(None)
+    assert not exported.is_current(EXPORTED_AT + timedelta(seconds=1))
+
+    manifest = {**exported.manifest}
+    del manifest["max_updated_at"]
+    assert not snapshot.VectorSnapshot(exported.vectors, exported.ids, manifest).is_current(None)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_export_snapshot_round_trip(tmp_path):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding = np.random.default_rng().normal(size=get_settings().embedding_dim)
+    item_id = uuid4()
+    try:
+        async with get_session() as session:
+            await upsert_item_with_embedding(
+                session, item_id, "snap", {"source": "snapshot"}, embedding
+            )
+        count = await snapshot.export_snapshot(tmp_path, "float16")
+    finally:
+        await get_engine().dispose()
+
+    exported = snapshot.load_snapshot(tmp_path)
+    assert len(exported) == count
+    assert exported.vectors.dtype == np.float16
+    assert exported.search(embedding, 1, block_rows=1024)[0][0] == item_id
+    try:
+        async with get_session() as session:
+            assert exported.is_current(await repositories._latest_item_update(session))
+            await upsert_item_with_embedding(
+                session, item_id, "changed", {"source": "snapshot"}, embedding
+            )
+            assert not exported.is_current(await repositories._latest_item_update(session))
+    finally:
+        await get_engine().dispose()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_write_from_a_transaction_older_than_the_export_makes_it_stale(tmp_path):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    embedding = np.random.default_rng().normal(size=get_settings().embedding_dim)
+    early, late = uuid4(), uuid4()
+    try:
+        async with get_session() as slow, get_session() as session:
+            # Opened before the export, like an item write that embeds mid-transaction.
+            await slow.execute(text("SELECT 1"))
+            await upsert_item_with_embedding(
+                session, early, "snap", {"source": "snapshot"}, embedding
+            )
+            await snapshot.export_snapshot(tmp_path)
+            await upsert_item_with_embedding(slow, late, "late", {"source": "snapshot"}, embedding)
+
+            exported = snapshot.load_snapshot(tmp_path)
+            assert not exported.is_current(await repositories._latest_item_update(session))
+            await session.execute(
+                text("DELETE FROM items WHERE id IN (:early, :late)"),
+                {"early": early, "late": late},
+            )
+            await session.commit()
+    finally:
+        await get_engine().dispose()